@@ -0,0 +1,46 @@
+import discord
+from discord.ext import commands
+import asyncio
+import os
+from utils.snapshot import create_snapshot
+
+OWNER_ID = 688983124868202496
+
+class Backup(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_check(self, ctx):
+        if ctx.author.id != OWNER_ID:
+            await ctx.send("You do not have permission to use this command.")
+            return False
+        return True
+
+    @commands.command(name='snapshot', hidden=True)
+    async def snapshot(self, ctx):
+        """
+        Takes a consistent snapshot of every database table.
+        Usage: ?snapshot
+        The archive is attached if it fits, otherwise it stays in data/backups/.
+        Restore from the shell with: python -m utils.snapshot restore <file>
+        """
+        msg = await ctx.send("📦 Creating database snapshot...")
+        path, manifest = await asyncio.to_thread(create_snapshot)
+
+        if not path:
+            await msg.edit(content="❌ Snapshot failed. Check the bot logs.")
+            return
+
+        total = sum(entry['rows'] for entry in manifest['tables'])
+        size = os.path.getsize(path)
+        summary = f"✅ Snapshot of **{len(manifest['tables'])}** tables ({total} rows, {size // 1024} KB) saved to `{path}`."
+
+        limit = ctx.guild.filesize_limit if ctx.guild else 8 * 1024 * 1024
+        if size <= limit:
+            await msg.edit(content=summary)
+            await ctx.send(file=discord.File(path, filename=os.path.basename(path)))
+        else:
+            await msg.edit(content=summary + "\nToo large to upload.")
+
+async def setup(bot):
+    await bot.add_cog(Backup(bot))
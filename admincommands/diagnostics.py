@@ -0,0 +1,223 @@
+import discord
+from discord.ext import commands
+import asyncio
+import datetime
+import io
+from utils import query_stats
+from utils.cog_state import stash_state, take_state
+from utils.memory import MemoryTracker, bot_caches
+from utils.profiler import SamplingProfiler, MAX_SECONDS
+
+OWNER_ID = 688983124868202496
+
+async def send_report(ctx, text, filename):
+    """Sends a report in a code block, or as a file when it is too long for one message."""
+    if len(text) <= 1900:
+        await ctx.send(f"```\n{text}\n```")
+    else:
+        await ctx.send(file=discord.File(io.BytesIO(text.encode('utf-8')), filename=filename))
+
+class Diagnostics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.profiler = None
+        self.memory = MemoryTracker()
+
+    async def cog_load(self):
+        state = take_state(self.bot, self)
+        if state:
+            # Keep the snapshots so a reload does not reset the comparison
+            self.memory = state['memory']
+
+    async def cog_unload(self):
+        if self.profiler:
+            self.profiler.stop()
+        stash_state(self.bot, self, {'memory': self.memory})
+
+    async def cog_check(self, ctx):
+        if ctx.author.id != OWNER_ID:
+            await ctx.send("You do not have permission to use this command.")
+            return False
+        return True
+
+    @commands.command(name='dbstats', hidden=True)
+    async def dbstats(self, ctx, sort: str = 'total', limit: int = 10):
+        """
+        Shows the most expensive database statements since startup.
+        Usage:
+        ?dbstats [total|calls|rows|p99|max] [limit] - Top statements, by total time by default.
+        ?dbstats slow - Recent statements over the slow query threshold.
+        ?dbstats reset - Clears the collected statistics.
+        """
+        sort = sort.lower()
+        if sort == 'reset':
+            query_stats.reset()
+            await ctx.send("✅ Database statistics cleared.")
+            return
+
+        if sort == 'slow':
+            if not query_stats.SLOW_QUERIES:
+                await ctx.send(f"No statements over {query_stats.SLOW_QUERY_MS:.0f}ms yet.")
+                return
+            lines = [f"Statements over {query_stats.SLOW_QUERY_MS:.0f}ms, newest first"]
+            for at, milliseconds, rows, origin, statement in reversed(query_stats.SLOW_QUERIES):
+                when = datetime.datetime.fromtimestamp(at).strftime('%H:%M:%S')
+                lines.append(f"{when} {milliseconds:>7.0f}ms {rows:>6} rows  {origin}\n    {statement[:300]}")
+            await send_report(ctx, "\n".join(lines), 'slow_queries.txt')
+            return
+
+        if sort not in query_stats.SORT_KEYS:
+            await ctx.send(f"Unknown sort `{sort}`. Use one of: {', '.join(query_stats.SORT_KEYS)}, slow, reset.")
+            return
+
+        entries = query_stats.top(max(1, min(limit, 50)), sort)
+        if not entries:
+            await ctx.send("No statements recorded yet.")
+            return
+
+        statements, calls, total = query_stats.summary()
+        lines = [f"{statements} statements (COPY included), {calls} calls, {total:.2f}s total - sorted by {sort}"]
+        for rank, (statement, stats) in enumerate(entries, 1):
+            origin, _ = stats.origins.most_common(1)[0]
+            lines.append(
+                f"#{rank} {stats.total * 1000:.0f}ms total | {stats.calls} calls"
+                + (f" ({stats.errors} failed)" if stats.errors else "")
+                + f" | p50 {stats.percentile(0.5) * 1000:.1f} p95 {stats.percentile(0.95) * 1000:.1f}"
+                + f" p99 {stats.percentile(0.99) * 1000:.1f} max {stats.slowest * 1000:.1f}ms"
+                + f" | {stats.rows} rows | {origin}"
+            )
+            lines.append(f"    {statement[:300]}")
+        await send_report(ctx, "\n".join(lines), 'dbstats.txt')
+
+    @commands.command(name='loopstats', hidden=True)
+    async def loopstats(self, ctx, action: str = None):
+        """
+        Shows event loop lag and what blocked the loop.
+        Usage:
+        ?loopstats - Lag percentiles and blocking calls grouped by command/listener.
+        ?loopstats stacks - Attaches the stacks captured for recent blocks.
+        ?loopstats reset - Clears the collected statistics.
+        """
+        monitor = getattr(self.bot, 'loop_monitor', None)
+        if not monitor or not monitor.task:
+            await ctx.send("The loop monitor is not running.")
+            return
+
+        if action == 'reset':
+            monitor.reset()
+            await ctx.send("✅ Loop statistics cleared.")
+            return
+
+        if action == 'stacks':
+            if not monitor.incidents:
+                await ctx.send("No blocking calls recorded.")
+                return
+            sections = []
+            for incident in reversed(monitor.incidents):
+                when = datetime.datetime.fromtimestamp(incident['at']).strftime('%H:%M:%S')
+                sections.append(
+                    f"{when} blocked {incident['duration'] * 1000:.0f}ms by {incident['origin']}"
+                    f" (task {incident['task']}) at {incident['location']}\n" + "".join(incident['stack'])
+                )
+            await ctx.send(file=discord.File(io.BytesIO("\n".join(sections).encode('utf-8')), filename='loop_blocks.txt'))
+            return
+
+        lines = [
+            f"Loop lag over {len(monitor.samples)} heartbeats: p50 {monitor.percentile(0.5) * 1000:.1f}ms"
+            f" p95 {monitor.percentile(0.95) * 1000:.1f}ms p99 {monitor.percentile(0.99) * 1000:.1f}ms"
+            f" max {max(monitor.samples, default=0) * 1000:.1f}ms",
+            f"Blocks over {monitor.threshold * 1000:.0f}ms: {sum(entry[0] for entry in monitor.by_origin.values())}",
+        ]
+        ranked = sorted(monitor.by_origin.items(), key=lambda item: item[1][1], reverse=True)
+        for origin, (count, total, longest) in ranked[:15]:
+            lines.append(f"{total * 1000:>8.0f}ms total {count:>4}x  longest {longest * 1000:>6.0f}ms  {origin}")
+        if monitor.incidents:
+            last = monitor.incidents[-1]
+            lines.append(f"Last: {last['duration'] * 1000:.0f}ms by {last['origin']} at {last['location']}")
+        await send_report(ctx, "\n".join(lines), 'loopstats.txt')
+
+    @commands.group(name='profile', hidden=True, invoke_without_command=True)
+    async def profile(self, ctx):
+        """
+        Samples the running bot to find where the event loop spends its time.
+        Usage:
+        ?profile start [seconds] [cog] - Profiles for up to 300 seconds (default 30), optionally only one cog.
+        ?profile stop - Stops early and posts the report.
+        """
+        await ctx.send("Usage: `?profile start [seconds] [cog]` or `?profile stop`")
+
+    @profile.command(name='start')
+    async def profile_start(self, ctx, seconds: int = 30, *, cog_name: str = None):
+        if self.profiler:
+            await ctx.send("A profile is already running. Use `?profile stop` first.")
+            return
+
+        cog = None
+        if cog_name:
+            cog = next((c for name, c in self.bot.cogs.items() if name.lower() == cog_name.lower()), None)
+            if not cog:
+                await ctx.send(f"Cog `{cog_name}` not found. Loaded cogs: {', '.join(sorted(self.bot.cogs))}")
+                return
+
+        seconds = max(1, min(seconds, MAX_SECONDS))
+        profiler = self.profiler = SamplingProfiler(asyncio.get_running_loop(), seconds, cog)
+        profiler.start()
+        await ctx.send(f"🔬 Profiling{f' `{cog.qualified_name}`' if cog else ''} for {seconds}s. `?profile stop` ends it early.")
+
+        try:
+            await profiler.wait()
+        finally:
+            if self.profiler is profiler:
+                self.profiler = None
+
+        report = profiler.report()
+        dump = discord.File(io.BytesIO(profiler.collapsed().encode('utf-8')), filename='profile.folded')
+        await ctx.send(f"```\n{report[:1900]}\n```", file=dump)
+
+    @profile.command(name='stop')
+    async def profile_stop(self, ctx):
+        if not self.profiler:
+            await ctx.send("No profile is running.")
+            return
+        # The start command posts the report once the sampler has finished
+        self.profiler.stop()
+
+    @commands.command(name='memory', hidden=True)
+    async def memory(self, ctx, action: str = 'snapshot', frames: int = 1):
+        """
+        Snapshots memory use and shows what grew since the last snapshot.
+        Usage:
+        ?memory - RSS, allocation sites and object types compared with the previous snapshot, plus cache sizes.
+        ?memory baseline - The same, compared with the first snapshot.
+        ?memory caches - Only the sizes of discord.py, cog and module caches.
+        ?memory start [frames] - Turns on tracemalloc allocation tracing (slows the bot down).
+        ?memory stop - Turns tracing off and drops the snapshots.
+        """
+        action = action.lower()
+        if action == 'start':
+            await asyncio.to_thread(self.memory.start, max(1, min(frames, 25)))
+            await ctx.send(f"✅ Allocation tracing on ({frames} frame{'s' if frames != 1 else ''}). Baseline snapshot taken.")
+            return
+        if action == 'stop':
+            self.memory.stop()
+            await ctx.send("✅ Allocation tracing off.")
+            return
+        if action not in ('snapshot', 'baseline', 'caches'):
+            await ctx.send("Usage: `?memory [snapshot|baseline|caches|start [frames]|stop]`")
+            return
+
+        sections = []
+        if action != 'caches':
+            msg = await ctx.send("📸 Taking memory snapshot...")
+            sections.append(await asyncio.to_thread(self.memory.compare, 15, 'baseline' if action == 'baseline' else 'previous'))
+            await msg.delete()
+
+        rows = sorted(bot_caches(self.bot), key=lambda row: (row[2] or 0, row[1]), reverse=True)
+        lines = ["Caches (entries, approximate size of what the container holds):"]
+        for name, entries, size in rows[:30]:
+            lines.append(f"{entries:>9} {f'{size / 1024:.1f} KB' if size is not None else '':>11}  {name}")
+        sections.append("\n".join(lines))
+        await send_report(ctx, "\n\n".join(sections), 'memory.txt')
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -6,6 +6,7 @@ import time
 from datetime import datetime, timedelta
 import db
 import string
+from utils.cog_state import stash_state, take_state
 
 def parse_duration(duration_str):
     time_units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
@@ -93,58 +94,33 @@ class EnterGiveawayView(discord.ui.View):
 class GiveawayCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.setup_db()
+        # message_id -> channel_id of giveaways with a registered view
+        self.active_giveaways = {}
         self.check_giveaways.start()
 
     def cog_unload(self):
         self.check_giveaways.cancel()
-
-    def setup_db(self):
-        conn = db.get_connection()
-        if conn:
-            try:
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        CREATE TABLE IF NOT EXISTS giveaways (
-                            message_id BIGINT PRIMARY KEY,
-                            channel_id BIGINT,
-                            guild_id BIGINT,
-                            host_id BIGINT,
-                            title TEXT,
-                            prize TEXT,
-                            winners INT,
-                            end_time BIGINT,
-                            status TEXT,
-                            gw_id TEXT UNIQUE
-                        )
-                    """)
-                    cur.execute("""
-                        CREATE TABLE IF NOT EXISTS giveaway_participants (
-                            message_id BIGINT,
-                            user_id BIGINT,
-                            PRIMARY KEY (message_id, user_id)
-                        )
-                    """)
-                conn.commit()
-            except Exception as e:
-                print(f"Error setting up giveaway tables: {e}")
-            finally:
-                conn.close()
+        stash_state(self.bot, self, {'active_giveaways': self.active_giveaways})
 
     async def cog_load(self):
+        state = take_state(self.bot, self)
+        if state:
+            self.active_giveaways = state['active_giveaways']
+        else:
+            conn = db.get_connection()
+            if conn:
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT message_id, channel_id FROM giveaways WHERE status = 'active'")
+                        self.active_giveaways = dict(cur.fetchall())
+                except Exception as e:
+                    print(f"Error loading giveaways on startup: {e}")
+                finally:
+                    conn.close()
+
         # Re-register views
-        conn = db.get_connection()
-        if conn:
-            try:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT message_id, channel_id FROM giveaways WHERE status = 'active'")
-                    rows = cur.fetchall()
-                    for row in rows:
-                        self.bot.add_view(EnterGiveawayView(message_id=row[0], channel_id=row[1]))
-            except Exception as e:
-                print(f"Error loading giveaways on startup: {e}")
-            finally:
-                conn.close()
+        for message_id, channel_id in self.active_giveaways.items():
+            self.bot.add_view(EnterGiveawayView(message_id=message_id, channel_id=channel_id))
 
     @commands.command(name='create_gw', hidden=True)
     @commands.has_permissions(administrator=True)
@@ -236,6 +212,7 @@ class GiveawayCog(commands.Cog):
             # Add View to message
             view = EnterGiveawayView(message_id=gw_message.id, channel_id=target_channel.id)
             await gw_message.edit(view=view)
+            self.active_giveaways[gw_message.id] = target_channel.id
             
             await ctx.send(f"✅ Giveaway created in {target_channel.mention}! ID: `{gw_id}`")
 
@@ -348,6 +325,7 @@ class GiveawayCog(commands.Cog):
             conn.close()
 
     async def end_giveaway(self, message_id, channel_id):
+        self.active_giveaways.pop(message_id, None)
         conn = db.get_connection()
         if not conn:
             return
@@ -1,6 +1,56 @@
 import discord
 from discord.ext import commands
 import typing
+import asyncio
+import re
+import db
+from utils.purge_engine import PurgeJob, PurgeArchive, build_check, clone_and_delete, BULK_DELETE_MAX_AGE
+
+def get_purge_log_channel(guild_id):
+    conn = db.get_connection()
+    if not conn:
+        return None
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT purge_log_channel_id FROM guild_config WHERE guild_id = %s", (guild_id,))
+        row = cur.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"Error getting purge log channel: {e}")
+        return None
+    finally:
+        conn.close()
+
+def set_purge_log_channel(guild_id, channel_id):
+    conn = db.get_connection()
+    if not conn:
+        return False
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO guild_config (guild_id, purge_log_channel_id)
+            VALUES (%s, %s)
+            ON CONFLICT (guild_id) DO UPDATE SET purge_log_channel_id = EXCLUDED.purge_log_channel_id
+        """, (guild_id, channel_id))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Error setting purge log channel: {e}")
+        return False
+    finally:
+        conn.close()
+
+class PurgeFlags(commands.FlagConverter, delimiter=':', prefix=''):
+    bots: bool = False
+    attachments: bool = False
+    contains: typing.Optional[str] = None
+    regex: typing.Optional[str] = None
+    before: typing.Optional[int] = None
+    after: typing.Optional[int] = None
+    archive: bool = False
+
+    def any_set(self):
+        return bool(self.bots or self.attachments or self.contains or self.regex or self.before or self.after)
 
 class Purge(commands.Cog):
     def __init__(self, bot):
@@ -8,29 +58,33 @@ class Purge(commands.Cog):
 
     @commands.command(name='purge', hidden=True)
     @commands.has_permissions(manage_messages=True)
-    async def purge(self, ctx, arg1: typing.Optional[str] = None, arg2: typing.Optional[int] = None):
+    async def purge(self, ctx, arg1: typing.Optional[str] = None, arg2: typing.Optional[int] = None, *, flags: PurgeFlags):
         """
         Purge messages from the channel.
         Usage:
         ?purge <amount> - Delete the last <amount> messages.
         ?purge all - Delete all messages in the channel.
-        ?purge @user <amount> - Delete up to <amount> messages from @user.
+        ?purge @user <amount> - Delete the last <amount> messages from @user.
+        Filters (after the amount): bots: yes, attachments: yes, contains: <text>,
+        regex: <pattern>, before: <message id>, after: <message id>
+        e.g. ?purge 50 bots: yes contains: giveaway
+        Add archive: yes to save the deleted messages to the purge log channel (?purge_log).
         """
         if arg1 is None:
-            await ctx.send("Usage: ?purge <amount> | ?purge all | ?purge @user [amount]", delete_after=3)
+            await ctx.send("Usage: ?purge <amount> | ?purge all | ?purge @user [amount] [filters]", delete_after=3)
             return
 
         limit = None
-        check = None
+        member = None
 
         # Logic to determine mode
         # Case 1: !purge all
         if arg1.lower() == 'all':
             limit = None # All messages
-        
+
         # Case 2: !purge <amount> (e.g. !purge 5)
         elif arg1.isdigit():
-            limit = int(arg1) + 1 # Include command message
+            limit = int(arg1)
 
         # Case 3: !purge @user <amount>
         # We need to manually convert the user string
@@ -38,33 +92,123 @@ class Purge(commands.Cog):
             try:
                 converter = commands.MemberConverter()
                 member = await converter.convert(ctx, arg1)
-                
-                # Check for amount in arg2
-                if arg2 is None:
-                    # Default scan limit if not provided
-                    scan_limit = 100 
-                else:
-                    scan_limit = arg2
-                
-                limit = scan_limit
-                check = lambda m: m.author.id == member.id
+                limit = arg2 if arg2 is not None else 100
             except commands.BadArgument:
                 await ctx.send(f"Invalid argument: {arg1}. Expected 'all', a number, or a user.", delete_after=3)
                 return
 
-        # Perform the purge
-        kwargs = {}
-        if limit is not None:
-            kwargs['limit'] = limit
-        if check is not None:
-            kwargs['check'] = check
-            
+        pattern = None
+        if flags.regex:
+            try:
+                pattern = re.compile(flags.regex)
+            except re.error as e:
+                await ctx.send(f"Invalid regex: {e}", delete_after=5)
+                return
+
+        log_channel = None
+        if flags.archive:
+            log_channel = ctx.guild.get_channel(get_purge_log_channel(ctx.guild.id) or 0)
+            if not log_channel:
+                await ctx.send("❌ Purge log channel not configured. Use ?purge_log <channel>.", delete_after=5)
+                return
+
+        check = build_check(author=member, bots=flags.bots, attachments=flags.attachments, contains=flags.contains, pattern=pattern)
+
         try:
-            deleted = await ctx.channel.purge(**kwargs)
-            await ctx.send(f"Purged {len(deleted) - 1 if check is None and limit else len(deleted)} messages.", delete_after=3)
+            await ctx.message.delete()
+        except discord.HTTPException:
+            pass
+
+        if limit is None and not flags.any_set() and not flags.archive and await self.offer_clone(ctx):
+            return
+
+        # Never scan past the command, so the progress message is not deleted
+        before = discord.Object(id=min(flags.before or ctx.message.id, ctx.message.id))
+        after = discord.Object(id=flags.after) if flags.after else None
+
+        status = await ctx.send("🧹 Purging...")
+
+        async def show_progress(job):
+            state = "✅ Purged" if job.done else "🧹 Purging..."
+            text = f"{state} **{job.deleted}** deleted, {job.scanned} scanned"
+            if job.failed:
+                text += f", {job.failed} failed"
+            await status.edit(content=text)
+
+        archive = PurgeArchive(ctx.channel) if log_channel else None
+        job = PurgeJob(ctx.channel, check=check, limit=limit, before=before, after=after,
+                       on_progress=show_progress, reason=f"Purge by {ctx.author}", archive=archive)
+        try:
+            await job.run()
+            await status.delete(delay=5)
         except Exception as e:
-            await ctx.send(f"Failed to purge: {e}", delete_after=5)
+            await status.edit(content=f"Failed to purge: {e} ({job.deleted} deleted)")
             print(f"Purge error: {e}")
+        finally:
+            if archive:
+                await self.send_archive(ctx, log_channel, archive, job)
+
+    async def send_archive(self, ctx, log_channel, archive, job):
+        size = archive.close()
+        embed = discord.Embed(
+            title="Messages Purged",
+            description=f"**{job.deleted}** messages deleted in {ctx.channel.mention} by {ctx.author.mention}",
+            color=discord.Color.orange(),
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="Archived", value=f"{archive.count} messages, {size // 1024} KB", inline=True)
+        if job.failed:
+            embed.add_field(name="Failed", value=str(job.failed), inline=True)
+
+        if size <= ctx.guild.filesize_limit:
+            await log_channel.send(embed=embed, file=discord.File(archive.path, filename=f"purge-{ctx.channel.name}.jsonl.gz"))
+        else:
+            embed.add_field(name="Stored at", value=f"`{archive.path}`", inline=False)
+            await log_channel.send(embed=embed)
+
+    @commands.command(name='purge_log', hidden=True)
+    @commands.has_permissions(administrator=True)
+    async def purge_log(self, ctx, channel: discord.TextChannel):
+        """Sets the channel that receives archives from ?purge ... archive: yes"""
+        if set_purge_log_channel(ctx.guild.id, channel.id):
+            await ctx.send(f"✅ Purge archives will be sent to {channel.mention}")
+        else:
+            await ctx.send("❌ DB Error.")
+
+    async def offer_clone(self, ctx):
+        """
+        If the channel has messages too old for bulk delete, offers to replace
+        it with an empty clone instead. Returns True if the channel was cloned.
+        """
+        oldest = [message async for message in ctx.channel.history(limit=1, oldest_first=True)]
+        if not oldest or oldest[0].created_at >= discord.utils.utcnow() - BULK_DELETE_MAX_AGE:
+            return False
+
+        prompt = await ctx.send("⚠️ This channel has messages older than 14 days, which are deleted one by one and can take hours.\n"
+                       "Reply `clone` to replace the channel with an empty copy instead, or `delete` to delete messages anyway.")
+
+        def check(m):
+            return m.author == ctx.author and m.channel == ctx.channel and m.content.lower() in ('clone', 'delete')
+
+        try:
+            reply = await self.bot.wait_for('message', check=check, timeout=30.0)
+        except asyncio.TimeoutError:
+            await prompt.delete()
+            await ctx.send("Confirmation timed out. Deleting messages instead.", delete_after=5)
+            return False
+
+        if reply.content.lower() != 'clone':
+            # Both are newer than the command, so the purge itself would skip them
+            await ctx.channel.delete_messages([prompt, reply])
+            return False
+
+        try:
+            new_channel = await clone_and_delete(ctx.channel, reason=f"Purge all by {ctx.author}")
+        except discord.HTTPException as e:
+            await ctx.send(f"Failed to clone channel: {e}", delete_after=5)
+            return False
+        await new_channel.send(f"🧹 Channel purged by {ctx.author.mention}.", delete_after=5)
+        return True
 
 async def setup(bot):
     await bot.add_cog(Purge(bot))
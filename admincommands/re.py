@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 import typing
 import asyncio
+import time
 
 class Recreate(commands.Cog):
     def __init__(self, bot):
@@ -63,59 +64,114 @@ class Recreate(commands.Cog):
              # Actually, if not category and > limit, we force confirm, so this block is redundant but safe.
              pass
 
-        await ctx.send(f"Recreating {len(channels_to_recreate)} channels...", delete_after=5)
-
-        recreated_count = 0
-        
-        for target_channel in channels_to_recreate:
-            # Save position to restore it
-            position = target_channel.position
-            new_channel = None
+        # The command channel goes last, so the status message survives as long as possible
+        channels_to_recreate.sort(key=lambda c: c.id == ctx.channel.id)
+        plan = RecreatePlan(self.bot, ctx.guild, channels_to_recreate)
+        status = await ctx.send(plan.describe())
 
+        async def show_progress():
             try:
-                # Clone the channel (copies permissions, category, topic, etc.)
-                # We explicitly pass the category (even if None) to ensure it's preserved exactly
-                new_channel = await target_channel.clone(
-                    reason="Channel recreation command",
-                    category=target_channel.category
-                )
-                
-                # Delete the old channel
-                await target_channel.delete(reason="Channel recreation command")
-                
-                # Ensure the new channel is at the correct position
-                await new_channel.edit(position=position)
-                
-                # Notify
-                if isinstance(new_channel, discord.TextChannel):
-                    await new_channel.send("Channel recreated successfully!", delete_after=10)
-                
-                print(f"Recreated channel: {target_channel.name}")
-                recreated_count += 1
-                
-                # Wait a bit before next one to be slow/safe
-                if len(channels_to_recreate) > 1:
-                    await asyncio.sleep(2)
-                
-            except Exception as e:
-                # Error handling
-                if new_channel and isinstance(new_channel, discord.TextChannel):
-                     await new_channel.send(f"Channel recreated but error occurred: {e}", delete_after=10)
-                elif not getattr(target_channel, 'deleted', False,):
-                     # Try to send to context if original target is still valid 
-                     # (and distinct logic if needed, but simple catch-all here)
-                     try:
-                        if target_channel != ctx.channel:
-                             await ctx.send(f"Failed to recreate {target_channel.name}: {e}", delete_after=10)
-                     except:
-                        pass
-                print(f"Recreate error for {target_channel.name}: {e}")
-
-        if recreated_count > 0:
-             try:
-                 await ctx.send(f"Completed recreation of {recreated_count} channels.", delete_after=10)
-             except:
-                 pass
+                await status.edit(content=plan.describe())
+            except discord.HTTPException:
+                pass
+
+        await plan.run(on_progress=show_progress)
+
+        # If the command channel was recreated, the status message went with it
+        replacement = plan.replacements.get(ctx.channel.id)
+        if replacement is not None:
+            if isinstance(replacement, discord.TextChannel):
+                await replacement.send(plan.describe(), delete_after=30)
+        else:
+            await show_progress()
+
+class RecreatePlan:
+    """
+    Clones and deletes channels with bounded concurrency, then restores every
+    position with one bulk channel update instead of an edit per channel.
+    discord.py already waits on the create/delete rate limit buckets; the
+    semaphore keeps us from queueing a burst that would trip the global limit.
+    """
+    CONCURRENCY = 3
+    PROGRESS_INTERVAL = 2
+
+    def __init__(self, bot, guild, channels):
+        self.bot = bot
+        self.guild = guild
+        self.channels = channels
+        # old channel ID -> new channel
+        self.replacements = {}
+        self.failures = []
+        self.positions_restored = None
+        self._last_progress = 0
+
+    def describe(self):
+        done = len(self.replacements) + len(self.failures)
+        if self.positions_restored is None:
+            text = f"♻️ Recreating channels: **{done}/{len(self.channels)}**"
+        else:
+            text = f"✅ Recreated **{len(self.replacements)}/{len(self.channels)}** channels."
+            if not self.positions_restored:
+                text += "\n⚠️ Could not restore channel positions."
+        if self.failures:
+            text += "\n" + "\n".join(f"❌ {name}: {error}" for name, error in self.failures[:10])
+            if len(self.failures) > 10:
+                text += f"\n...and {len(self.failures) - 10} more"
+        return text
+
+    async def run(self, on_progress=None):
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def recreate(channel):
+            async with semaphore:
+                try:
+                    # Clone the channel (copies permissions, category, topic, etc.)
+                    new_channel = await channel.clone(reason="Channel recreation command", category=channel.category)
+                except Exception as e:
+                    self.failures.append((channel.name, e))
+                    print(f"Recreate error for {channel.name}: {e}")
+                    return
+
+                try:
+                    await channel.delete(reason="Channel recreation command")
+                except Exception as e:
+                    # Keep the original; the clone is not needed
+                    self.failures.append((channel.name, e))
+                    print(f"Recreate error for {channel.name}: {e}")
+                    try:
+                        await new_channel.delete(reason="Channel recreation failed")
+                    except Exception as e:
+                        print(f"Could not delete the clone of {channel.name}: {e}")
+                    return
+
+                self.replacements[channel.id] = new_channel
+                print(f"Recreated channel: {channel.name}")
+
+            if on_progress and time.monotonic() - self._last_progress >= self.PROGRESS_INTERVAL:
+                self._last_progress = time.monotonic()
+                await on_progress()
+
+        # One failure (e.g. a progress edit) must not skip restoring the others' positions
+        results = await asyncio.gather(*(recreate(channel) for channel in self.channels), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Recreate error: {result}")
+        self.positions_restored = await self.restore_positions()
+
+    async def restore_positions(self):
+        payload = [
+            {'id': new_channel.id, 'position': old.position, 'parent_id': old.category_id, 'lock_permissions': False}
+            for old in self.channels
+            if (new_channel := self.replacements.get(old.id)) is not None
+        ]
+        if not payload:
+            return True
+        try:
+            await self.bot.http.bulk_channel_update(self.guild.id, payload, reason="Channel recreation command")
+            return True
+        except discord.HTTPException as e:
+            print(f"Failed to restore channel positions: {e}")
+            return False
 
 async def setup(bot):
     await bot.add_cog(Recreate(bot))
@@ -2,12 +2,19 @@ import discord
 from discord.ext import commands
 import os
 import sys
+import time
+from utils.cog_state import handoff
+from utils.reload_planner import ReloadPlanner
 
 OWNER_ID = 688983124868202496
 
 class Reload(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Kept on the bot so the baseline survives reloading this cog
+        if not hasattr(bot, 'reload_planner'):
+            bot.reload_planner = ReloadPlanner()
+        self.planner = bot.reload_planner
 
     async def cog_check(self, ctx):
         if ctx.author.id != OWNER_ID:
@@ -20,7 +27,8 @@ class Reload(commands.Cog):
         """
         Reloads a specific extension, all extensions, or restarts the bot.
         Usage: 
-        ?reload all - Reloads all cogs and utils.
+        ?reload all - Reloads modules changed on disk and everything that imports them.
+        ?reload force - Reloads every cog and project module.
         ?reload bot - Restarts the bot process.
         ?reload utils - Reloads utility modules only.
         ?reload <filename> - Reloads a specific cog.
@@ -45,37 +53,28 @@ class Reload(commands.Cog):
                 await ctx.send(f"Failed to reload utils: {e}")
             return
 
-        if target == 'all':
-            msg = await ctx.send("Reloading all extensions and utils...")
+        if target in ('all', 'force'):
+            msg = await ctx.send("Reloading changed modules..." if target == 'all' else "Reloading every module...")
+            start = time.perf_counter()
             try:
-                # 1. Reload Utils first
-                from utils.reloader import reload_modules
-                reloaded_utils = reload_modules()
-                
-                # 2. Reload Cogs from both directories
-                count = 0
-                directories = ['commands', 'admincommands']
-                
-                for directory in directories:
-                    if os.path.exists(f'./{directory}'):
-                        for filename in os.listdir(f'./{directory}'):
-                            if filename.endswith('.py'):
-                                ext_name = f'{directory}.{filename[:-3]}'
-                                try:
-                                    await self.bot.reload_extension(ext_name)
-                                    count += 1
-                                except commands.ExtensionNotLoaded:
-                                    try:
-                                        await self.bot.load_extension(ext_name)
-                                        count += 1
-                                    except Exception as e:
-                                        await ctx.send(f"Failed to load {ext_name}: {e}")
-                                except Exception as e:
-                                    await ctx.send(f"Failed to reload {ext_name}: {e}")
-                
-                await msg.edit(content=f"Reloaded **{len(reloaded_utils)} utils** and **{count} extensions**.")
+                with handoff(self.bot):
+                    results, removed = await self.planner.apply(self.bot, force=target == 'force')
             except Exception as e:
                 await msg.edit(content=f"Error reloading all: {e}")
+                return
+            elapsed = (time.perf_counter() - start) * 1000
+
+            if not results and not removed:
+                await msg.edit(content=f"Nothing changed ({elapsed:.0f}ms).")
+                return
+
+            lines = []
+            for name, seconds, error in results:
+                lines.append(f"{'❌' if error else '✅'} `{name}` {seconds * 1000:.0f}ms" + (f" - {error}" if error else ""))
+            lines.extend(f"🗑️ `{name}` removed" for name in removed)
+            failed = sum(1 for _, _, error in results if error)
+            summary = f"Reloaded **{len(results) - failed}** modules in {elapsed:.0f}ms" + (f", **{failed}** failed" if failed else "") + "."
+            await msg.edit(content=(summary + "\n" + "\n".join(lines))[:2000])
             return
 
         # Reload specific file
@@ -84,18 +83,22 @@ class Reload(commands.Cog):
         
         # Determine extension path
         ext_name = target
-        if not (target.startswith('commands.') or target.startswith('admincommands.')):
+        if not target.startswith(('commands.', 'admincommands.', 'functions.')):
             # Try to find where it is
             if os.path.exists(f'./commands/{target}.py'):
                 ext_name = f'commands.{target}'
             elif os.path.exists(f'./admincommands/{target}.py'):
                 ext_name = f'admincommands.{target}'
+            elif os.path.exists(f'./functions/{target}.py'):
+                ext_name = f'functions.{target}'
             else:
                 # Default fallback or error will be caught below
                 ext_name = f'commands.{target}' 
 
         try:
-            await self.bot.reload_extension(ext_name)
+            # Cogs hand their caches and unsaved buffers to their new instance
+            with handoff(self.bot):
+                await self.bot.reload_extension(ext_name)
             await ctx.send(f"Successfully reloaded `{ext_name}`.")
         except commands.ExtensionNotLoaded:
             try:
@@ -1,101 +1,332 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import db
 import asyncio
+import heapq
+import time
+from utils.cog_state import stash_state, take_state
+from utils.lazy_import import lazy_import
+from utils.transcript import write_transcript
+
+extras = lazy_import('psycopg2.extras')
 
 # Helper to get DB connection
 def get_connection():
     return db.get_connection()
 
-def load_tickets_config():
+TICKET_SETTINGS = ("category_id", "log_channel_id", "support_role_id", "inactivity_hours")
+CONFIG_COLUMNS = ", ".join(TICKET_SETTINGS)
+
+# Inactive tickets are warned this long before they are closed (at most a quarter of the timeout)
+INACTIVITY_WARNING_SECONDS = 3600
+ACTIVITY_FLUSH_MINUTES = 5
+
+# guild_id -> settings dict; every guild is read from the DB at most once
+# and the set_* commands update the cached entry together with the row.
+_config_cache = {}
+
+def _config_from_row(row):
+    return dict(zip(TICKET_SETTINGS, row))
+
+def load_all_ticket_configs():
+    conn = get_connection()
+    if not conn:
+        return
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT guild_id, {CONFIG_COLUMNS} FROM guild_ticket_config")
+        for row in cur.fetchall():
+            _config_cache[row[0]] = _config_from_row(row[1:])
+    except Exception as e:
+        print(f"Error loading ticket configs: {e}")
+    finally:
+        conn.close()
+
+def get_ticket_config(guild_id):
+    config = _config_cache.get(guild_id)
+    if config is not None:
+        return config
+
     conn = get_connection()
     if not conn:
         return {}
-    
     try:
         cur = conn.cursor()
-        cur.execute("SELECT category_id, log_channel_id, support_role_id FROM ticket_config WHERE uniq_id = 1")
+        cur.execute(f"SELECT {CONFIG_COLUMNS} FROM guild_ticket_config WHERE guild_id = %s", (guild_id,))
         row = cur.fetchone()
-        if row:
-            return {
-                "category_id": row[0],
-                "log_channel_id": row[1],
-                "support_role_id": row[2]
-            }
-        return {}
+        config = _config_from_row(row) if row else {}
+        _config_cache[guild_id] = config
+        return config
     except Exception as e:
         print(f"Error loading ticket config: {e}")
         return {}
     finally:
         conn.close()
 
-def save_tickets_config(data):
-    # This function is now slightly different, we update individual fields or upsert
+def set_ticket_setting(guild_id, key, value):
+    if key not in TICKET_SETTINGS:
+        raise ValueError(f"Unknown ticket setting: {key}")
+
     conn = get_connection()
     if not conn:
-        return
-
+        return False
     try:
         cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO ticket_config (uniq_id, category_id, log_channel_id, support_role_id)
-            VALUES (1, %s, %s, %s)
-            ON CONFLICT (uniq_id) DO UPDATE SET
-                category_id = EXCLUDED.category_id,
-                log_channel_id = EXCLUDED.log_channel_id,
-                support_role_id = EXCLUDED.support_role_id
-        """, (
-            data.get("category_id"),
-            data.get("log_channel_id"),
-            data.get("support_role_id")
-        ))
+        cur.execute(f"""
+            INSERT INTO guild_ticket_config (guild_id, {key})
+            VALUES (%s, %s)
+            ON CONFLICT (guild_id) DO UPDATE SET {key} = EXCLUDED.{key}
+            RETURNING {CONFIG_COLUMNS}
+        """, (guild_id, value))
+        _config_cache[guild_id] = _config_from_row(cur.fetchone())
         conn.commit()
+        return True
     except Exception as e:
+        _config_cache.pop(guild_id, None)
         print(f"Error saving ticket config: {e}")
+        return False
     finally:
         conn.close()
 
-def get_active_ticket(user_id):
+def adopt_legacy_config(guilds):
+    """
+    Moves the old single-guild ticket_config row to guild_ticket_config for
+    whichever guild owns its category (or log channel / support role), then
+    deletes it. Returns the adopting guild's ID, or None.
+    """
     conn = get_connection()
     if not conn:
         return None
-        
     try:
         cur = conn.cursor()
-        cur.execute("SELECT channel_id FROM active_tickets WHERE user_id = %s", (user_id,))
+        cur.execute("SELECT category_id, log_channel_id, support_role_id FROM ticket_config WHERE uniq_id = 1")
         row = cur.fetchone()
-        return row[0] if row else None
+        if not row:
+            return None
+
+        legacy = _config_from_row(row)
+        owner = None
+        for guild in guilds:
+            if (guild.get_channel(legacy["category_id"] or 0) or guild.get_channel(legacy["log_channel_id"] or 0)
+                    or guild.get_role(legacy["support_role_id"] or 0)):
+                owner = guild
+                break
+        if owner is None:
+            return None
+
+        # Settings already made per guild win over the legacy ones
+        cur.execute(f"""
+            INSERT INTO guild_ticket_config (guild_id, category_id, log_channel_id, support_role_id)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (guild_id) DO UPDATE SET
+                category_id = COALESCE(guild_ticket_config.category_id, EXCLUDED.category_id),
+                log_channel_id = COALESCE(guild_ticket_config.log_channel_id, EXCLUDED.log_channel_id),
+                support_role_id = COALESCE(guild_ticket_config.support_role_id, EXCLUDED.support_role_id)
+            RETURNING {CONFIG_COLUMNS}
+        """, (owner.id, legacy["category_id"], legacy["log_channel_id"], legacy["support_role_id"]))
+        _config_cache[owner.id] = _config_from_row(cur.fetchone())
+        cur.execute("DELETE FROM ticket_config WHERE uniq_id = 1")
+        conn.commit()
+        return owner.id
     except Exception as e:
-        print(f"Error getting active ticket: {e}")
+        conn.rollback()
+        print(f"Error migrating ticket config: {e}")
         return None
     finally:
         conn.close()
 
-def add_active_ticket(user_id, channel_id):
+# A pending claim (no channel yet) older than this is left over from a crash
+STALE_CLAIM_SECONDS = 120
+
+# (guild_id, user_id) -> [asyncio.Lock, clicks holding or waiting for it], so one user's
+# clicks are handled one at a time; the entry goes once nobody holds or waits for the lock
+_creation_locks = {}
+
+def claim_ticket(guild_id, user_id):
+    """
+    Inserts a pending active_tickets row for the user in one statement.
+    Returns (True, None) if the claim was made, or (False, existing_row) where
+    existing_row is (channel_id, claim_age_seconds), or None if that row
+    changed concurrently. Returns (None, None) on DB errors.
+    """
+    conn = get_connection()
+    if not conn:
+        return None, None
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            WITH claim AS (
+                INSERT INTO active_tickets (guild_id, user_id, channel_id, claimed_at)
+                VALUES (%s, %s, NULL, now())
+                ON CONFLICT (guild_id, user_id) DO NOTHING
+                RETURNING 1
+            )
+            SELECT TRUE, NULL::BIGINT, NULL::DOUBLE PRECISION FROM claim
+            UNION ALL
+            SELECT FALSE, channel_id, EXTRACT(EPOCH FROM now() - claimed_at)::DOUBLE PRECISION
+            FROM active_tickets
+            WHERE guild_id = %s AND user_id = %s AND NOT EXISTS (SELECT 1 FROM claim)
+        """, (guild_id, user_id, guild_id, user_id))
+        row = cur.fetchone()
+        conn.commit()
+        if row is None:
+            # The conflicting row was committed after this statement's snapshot
+            return False, None
+        if row[0]:
+            return True, None
+        return False, (row[1], row[2])
+    except Exception as e:
+        print(f"Error claiming ticket: {e}")
+        return None, None
+    finally:
+        conn.close()
+
+def take_over_claim(guild_id, user_id, channel_id):
+    """Re-claims a stale row, but only if it still points at `channel_id`. Returns True on success."""
+    conn = get_connection()
+    if not conn:
+        return False
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE active_tickets SET channel_id = NULL, claimed_at = now()
+            WHERE guild_id = %s AND user_id = %s AND channel_id IS NOT DISTINCT FROM %s
+        """, (guild_id, user_id, channel_id))
+        conn.commit()
+        return cur.rowcount == 1
+    except Exception as e:
+        print(f"Error re-claiming ticket: {e}")
+        return False
+    finally:
+        conn.close()
+
+def set_ticket_channel(guild_id, user_id, channel_id):
+    conn = get_connection()
+    if not conn:
+        return False
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE active_tickets SET channel_id = %s
+            WHERE guild_id = %s AND user_id = %s AND channel_id IS NULL
+        """, (channel_id, guild_id, user_id))
+        conn.commit()
+        return cur.rowcount == 1
+    except Exception as e:
+        print(f"Error saving ticket channel: {e}")
+        return False
+    finally:
+        conn.close()
+
+def release_claim(guild_id, user_id):
     conn = get_connection()
     if not conn:
         return
+    try:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM active_tickets WHERE guild_id = %s AND user_id = %s AND channel_id IS NULL", (guild_id, user_id))
+        conn.commit()
+    except Exception as e:
+        print(f"Error releasing ticket claim: {e}")
+    finally:
+        conn.close()
 
+def adopt_legacy_tickets(guilds):
+    """Assigns tickets created before per-guild claims (guild_id 0) to the guild that has their channel."""
+    conn = get_connection()
+    if not conn:
+        return
     try:
         cur = conn.cursor()
-        cur.execute("INSERT INTO active_tickets (user_id, channel_id) VALUES (%s, %s)", (user_id, channel_id))
+        cur.execute("SELECT channel_id FROM active_tickets WHERE guild_id = 0 AND channel_id IS NOT NULL")
+        channel_ids = [row[0] for row in cur.fetchall()]
+        for guild in guilds:
+            owned = [channel_id for channel_id in channel_ids if guild.get_channel(channel_id)]
+            if owned:
+                cur.execute("""
+                    UPDATE active_tickets SET guild_id = %s
+                    WHERE guild_id = 0 AND channel_id = ANY(%s)
+                    AND NOT EXISTS (SELECT 1 FROM active_tickets t WHERE t.guild_id = %s AND t.user_id = active_tickets.user_id)
+                """, (guild.id, owned, guild.id))
         conn.commit()
     except Exception as e:
-        print(f"Error adding active ticket: {e}")
+        conn.rollback()
+        print(f"Error migrating active tickets: {e}")
     finally:
         conn.close()
 
 def remove_active_ticket(channel_id):
+    """Deletes the ticket row for a channel and returns the ticket owner's user ID, if any."""
     conn = get_connection()
     if not conn:
-        return
+        return None
 
     try:
         cur = conn.cursor()
-        cur.execute("DELETE FROM active_tickets WHERE channel_id = %s", (channel_id,))
+        cur.execute("DELETE FROM active_tickets WHERE channel_id = %s RETURNING user_id", (channel_id,))
+        row = cur.fetchone()
         conn.commit()
+        return row[0] if row else None
     except Exception as e:
         print(f"Error removing active ticket: {e}")
+        return None
+    finally:
+        conn.close()
+
+def load_ticket_activity():
+    """Returns [(channel_id, guild_id, last_activity_epoch)] for every open ticket."""
+    conn = get_connection()
+    if not conn:
+        return []
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT channel_id, guild_id, EXTRACT(EPOCH FROM COALESCE(last_activity, claimed_at))::DOUBLE PRECISION
+            FROM active_tickets WHERE channel_id IS NOT NULL
+        """)
+        return cur.fetchall()
+    except Exception as e:
+        print(f"Error loading ticket activity: {e}")
+        return []
+    finally:
+        conn.close()
+
+def save_ticket_activity(activity):
+    """Writes {channel_id: last_activity_epoch} back in one statement. Returns False on failure."""
+    conn = get_connection()
+    if not conn:
+        return False
+    try:
+        cur = conn.cursor()
+        extras.execute_values(cur, """
+            UPDATE active_tickets SET last_activity = to_timestamp(v.ts)
+            FROM (VALUES %s) AS v (channel_id, ts)
+            WHERE active_tickets.channel_id = v.channel_id
+        """, list(activity.items()), template="(%s::BIGINT, %s::DOUBLE PRECISION)")
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Error saving ticket activity: {e}")
+        return False
+    finally:
+        conn.close()
+
+def save_transcript(channel, owner_id, closed_by, reason, transcript, log_message_id):
+    conn = get_connection()
+    if not conn:
+        return
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO ticket_transcripts (guild_id, channel_id, channel_name, owner_id, closed_by, reason,
+                message_count, first_message_at, last_message_at, path, size, log_message_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (channel.guild.id, channel.id, channel.name, owner_id, closed_by.id, reason,
+              transcript['message_count'], transcript['first_message_at'], transcript['last_message_at'],
+              transcript['path'], transcript['size'], log_message_id))
+        conn.commit()
+    except Exception as e:
+        print(f"Error saving ticket transcript: {e}")
     finally:
         conn.close()
 
@@ -114,22 +345,72 @@ def is_channel_ticket(channel_id):
     finally:
         conn.close()
 
-async def log_ticket_event(guild, title, description, color, fields=None):
-    config = load_tickets_config()
+async def log_ticket_event(guild, title, description, color, fields=None, file=None):
+    config = get_ticket_config(guild.id)
     log_channel_id = config.get("log_channel_id")
     if not log_channel_id:
-        return
+        return None
     
     log_channel = guild.get_channel(log_channel_id)
     if not log_channel:
-        return
+        return None
 
     embed = discord.Embed(title=title, description=description, color=color, timestamp=discord.utils.utcnow())
     if fields:
         for name, value, inline in fields:
             embed.add_field(name=name, value=value, inline=inline)
             
-    await log_channel.send(embed=embed)
+    return await log_channel.send(embed=embed, file=file)
+
+async def close_ticket_channel(channel, closed_by, reason):
+    """
+    Archives a ticket and deletes its channel. The transcript is streamed
+    during the 5 second countdown, then posted with the closure log entry.
+    """
+    transcript_task = asyncio.create_task(write_transcript(channel))
+    await asyncio.sleep(5)
+
+    try:
+        transcript = await transcript_task
+    except Exception as e:
+        print(f"Error writing transcript for {channel.name}: {e}")
+        transcript = None
+
+    fields = [("User", f"{closed_by} (`{closed_by.id}`)", True),
+              ("Channel", channel.name, True),
+              ("Reason", reason, False)]
+    file = None
+    if transcript:
+        fields.append(("Transcript", f"{transcript['message_count']} messages, {transcript['size'] // 1024} KB", True))
+        if transcript['size'] <= channel.guild.filesize_limit:
+            file = discord.File(transcript['path'], filename=f"{channel.name}.jsonl.gz")
+        else:
+            fields.append(("Stored at", f"`{transcript['path']}`", False))
+    else:
+        fields.append(("Transcript", "Failed to save", True))
+
+    # Log closure; a failed upload must not keep the ticket open
+    try:
+        log_message = await log_ticket_event(
+            channel.guild,
+            "Ticket Closed",
+            f"Ticket closed by {closed_by.mention}",
+            discord.Color.red(),
+            fields,
+            file=file
+        )
+    except Exception as e:
+        print(f"Error logging closure of {channel.name}: {e}")
+        log_message = None
+        if file:
+            file.close()
+
+    try:
+        owner_id = remove_active_ticket(channel.id)
+        if transcript:
+            save_transcript(channel, owner_id, closed_by, reason, transcript, log_message.id if log_message else None)
+    finally:
+        await channel.delete(reason=f"Ticket closed by {closed_by}: {reason}")
 
 class TicketLauncher(discord.ui.View):
     def __init__(self):
@@ -137,7 +418,7 @@ class TicketLauncher(discord.ui.View):
 
     @discord.ui.button(label="Create Ticket", style=discord.ButtonStyle.green, custom_id="ticket:create", emoji="🎫")
     async def create_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        config = load_tickets_config()
+        config = get_ticket_config(interaction.guild.id)
         category_id = config.get("category_id")
 
         if not category_id:
@@ -149,89 +430,102 @@ class TicketLauncher(discord.ui.View):
             await interaction.response.send_message("❌ Ticket category not found. Please contact an admin.", ephemeral=True)
             return
             
-        # Check active tickets
-        existing_channel_id = get_active_ticket(interaction.user.id)
-        
-        if existing_channel_id:
-            existing_channel = interaction.guild.get_channel(existing_channel_id)
-            
+        # Creating the channel can take a while; acknowledge the click right away
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        key = (interaction.guild.id, interaction.user.id)
+        entry = _creation_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await self._create_ticket(interaction, config, category)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _creation_locks.pop(key, None)
+
+    async def _create_ticket(self, interaction, config, category):
+        guild, user = interaction.guild, interaction.user
+
+        claimed, existing = claim_ticket(guild.id, user.id)
+        if claimed is None:
+            await interaction.followup.send("❌ Database error. Please try again later.", ephemeral=True)
+            return
+
+        if not claimed:
+            if existing is None:
+                await interaction.followup.send("❌ Could not create your ticket. Please try again.", ephemeral=True)
+                return
+            existing_channel_id, age = existing
+            existing_channel = guild.get_channel(existing_channel_id) if existing_channel_id else None
             if existing_channel:
-                await interaction.response.send_message(f"❌ You already have an open ticket: {existing_channel.mention}", ephemeral=True)
+                await interaction.followup.send(f"❌ You already have an open ticket: {existing_channel.mention}", ephemeral=True)
+                return
+            if existing_channel_id is None and age < STALE_CLAIM_SECONDS:
+                await interaction.followup.send("⏳ Your ticket is already being created.", ephemeral=True)
+                return
+            # The old channel was deleted by hand, or a creation never finished
+            if not take_over_claim(guild.id, user.id, existing_channel_id):
+                await interaction.followup.send("❌ Could not create your ticket. Please try again.", ephemeral=True)
                 return
-            else:
-                # Channel deleted manually? cleanup based on user id isn't direct in DB with helper, but add_active_ticket will fail if PK exists?
-                # Actually, if existing_channel is None, it means the channel is gone.
-                # But get_active_ticket returned an ID. So we should remove it.
-                # We need a remove by user_id or handle it. 
-                # Let's add that helper to be safe or just use raw delete here?
-                # For cleaner code, assume remove_active_ticket only takes channel_id as per API above.
-                # We can't remove by user_id with current helper.
-                # Let's just try to create and cleaner logic:
-                conn = get_connection()
-                try:
-                    cur = conn.cursor()
-                    cur.execute("DELETE FROM active_tickets WHERE user_id = %s", (interaction.user.id,))
-                    conn.commit()
-                except:
-                    pass
-                finally:
-                    if conn: conn.close()
 
         # Permissions
         overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            interaction.user: discord.PermissionOverwrite(read_messages=True, send_messages=True, attach_files=True),
-            interaction.guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+            user: discord.PermissionOverwrite(read_messages=True, send_messages=True, attach_files=True),
+            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
         }
         
         # Add support role
         support_role_id = config.get("support_role_id")
         support_role = None
         if support_role_id:
-            support_role = interaction.guild.get_role(support_role_id)
+            support_role = guild.get_role(support_role_id)
             if support_role:
                 overwrites[support_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
-        
-        try:
-            channel_name = f"ticket-{interaction.user.name}"
-            ticket_channel = await interaction.guild.create_text_channel(channel_name, category=category, overwrites=overwrites)
-            
-            # Save to DB
-            add_active_ticket(interaction.user.id, ticket_channel.id)
 
-            embed = discord.Embed(
-                title="🎫 Support Ticket",
-                description=f"Welcome {interaction.user.mention}!\nSupport will be with you shortly.",
-                color=discord.Color.green()
-            )
-            embed.set_footer(text="Click the button below to close this ticket.")
-            
-            # Message outside embed
-            mentions = [interaction.user.mention]
-            if support_role:
-                mentions.append(support_role.mention)
-            
-            await ticket_channel.send(content=" ".join(mentions), embed=embed, view=TicketControls())
-            
-            await interaction.response.send_message(f"✅ Ticket created: {ticket_channel.mention}", ephemeral=True)
-
-            # Log creation
-            await log_ticket_event(
-                interaction.guild,
-                "Ticket Created",
-                f"Ticket created by {interaction.user.mention}",
-                discord.Color.green(),
-                [("User", f"{interaction.user} (`{interaction.user.id}`)", True),
-                 ("Channel", ticket_channel.mention, True)]
-            )
-            
+        try:
+            ticket_channel = await guild.create_text_channel(f"ticket-{user.name}", category=category, overwrites=overwrites)
         except Exception as e:
-            await interaction.response.send_message(f"❌ Failed to create ticket: {e}", ephemeral=True)
-            # Cleanup if channel was created but DB failed (though DB failure is inside same block, so we might need check)
-            # If we are here, 'ticket_channel' might represent a created channel.
-            # However, 'ticket_channel' variable scope is tricky in python if exception happened before assignment.
-            # A cleaner way is to putting creation in specific try block or checks.
-            pass
+            release_claim(guild.id, user.id)
+            await interaction.followup.send(f"❌ Failed to create ticket: {e}", ephemeral=True)
+            return
+
+        if not set_ticket_channel(guild.id, user.id, ticket_channel.id):
+            await ticket_channel.delete(reason="Ticket could not be saved")
+            release_claim(guild.id, user.id)
+            await interaction.followup.send("❌ Database error. Please try again later.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="🎫 Support Ticket",
+            description=f"Welcome {user.mention}!\nSupport will be with you shortly.",
+            color=discord.Color.green()
+        )
+        embed.set_footer(text="Click the button below to close this ticket.")
+        
+        # Message outside embed
+        mentions = [user.mention]
+        if support_role:
+            mentions.append(support_role.mention)
+        
+        await ticket_channel.send(content=" ".join(mentions), embed=embed, view=TicketControls())
+
+        cog = interaction.client.get_cog('Tickets')
+        if cog:
+            cog.track_ticket(ticket_channel)
+        
+        await interaction.followup.send(f"✅ Ticket created: {ticket_channel.mention}", ephemeral=True)
+
+        # Log creation
+        await log_ticket_event(
+            guild,
+            "Ticket Created",
+            f"Ticket created by {user.mention}",
+            discord.Color.green(),
+            [("User", f"{user} (`{user.id}`)", True),
+             ("Channel", ticket_channel.mention, True)]
+        )
 
 
 class TicketCloseModal(discord.ui.Modal, title="Close Ticket"):
@@ -246,23 +540,7 @@ class TicketCloseModal(discord.ui.Modal, title="Close Ticket"):
     async def on_submit(self, interaction: discord.Interaction):
         reason_text = self.reason.value or 'No reason provided'
         await interaction.response.send_message(f"🔒 Ticket closing in 5 seconds...\nReason: {reason_text}")
-        
-        # Log closure
-        await log_ticket_event(
-            interaction.guild,
-            "Ticket Closed",
-            f"Ticket closed by {interaction.user.mention}",
-            discord.Color.red(),
-            [("User", f"{interaction.user} (`{interaction.user.id}`)", True),
-             ("Channel", interaction.channel.name, True),
-             ("Reason", reason_text, False)]
-        )
-
-        await asyncio.sleep(5)
-        
-        remove_active_ticket(interaction.channel.id)
-
-        await interaction.channel.delete(reason=f"Ticket closed by {interaction.user}: {reason_text}")
+        await close_ticket_channel(interaction.channel, interaction.user, reason_text)
 
 
 class TicketControls(discord.ui.View):
@@ -282,6 +560,182 @@ class TicketControls(discord.ui.View):
 class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # channel_id -> (guild_id, last activity as epoch seconds); updated on every message
+        self.activity = {}
+        # channel_id -> last activity not yet written to the DB
+        self.dirty_activity = {}
+        self.warned = set()
+        # Min-heap of (when, channel_id). Messages only touch self.activity; an entry
+        # is re-checked against it when it fires and re-pushed if the ticket was active.
+        self.deadlines = []
+        # channel_id -> time of its live heap entry; older entries are skipped when popped
+        self.scheduled = {}
+        self.wakeup = asyncio.Event()
+        self.scheduler_task = None
+        # Inactivity closures in progress; references keep the tasks alive
+        self.close_tasks = set()
+
+    async def cog_load(self):
+        _config_cache.clear()
+        state = take_state(self.bot, self)
+        if state:
+            # Hot reload: legacy data was already adopted by the previous instance
+            _config_cache.update(state['configs'])
+            self.activity = state['activity']
+            self.dirty_activity = state['dirty_activity']
+            self.warned = state['warned']
+        else:
+            load_all_ticket_configs()
+            for channel_id, guild_id, last_activity in load_ticket_activity():
+                self.activity[channel_id] = (guild_id, last_activity)
+        for channel_id in self.activity:
+            self.schedule(channel_id, time.time())
+        self.scheduler_task = asyncio.create_task(self.run_deadlines())
+        self.flush_activity_loop.start()
+        # On a reload the guilds are already known; otherwise wait for on_ready
+        if self.bot.is_ready() and not state:
+            adopt_legacy_tickets(self.bot.guilds)
+            adopt_legacy_config(self.bot.guilds)
+
+    async def cog_unload(self):
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+        self.flush_activity_loop.cancel()
+        if self.close_tasks:
+            # These tickets are no longer tracked, so let them finish closing
+            await asyncio.gather(*self.close_tasks, return_exceptions=True)
+        state = {
+            'configs': dict(_config_cache),
+            'activity': self.activity,
+            'dirty_activity': self.dirty_activity,
+            'warned': self.warned,
+        }
+        if stash_state(self.bot, self, state, on_abandon=lambda s: s['dirty_activity'] and save_ticket_activity(s['dirty_activity'])):
+            return
+        if self.dirty_activity:
+            save_ticket_activity(self.dirty_activity)
+
+    @tasks.loop(minutes=ACTIVITY_FLUSH_MINUTES)
+    async def flush_activity_loop(self):
+        if not self.dirty_activity:
+            return
+        # Swapped on the event loop, so on_message never writes into the dict being saved
+        pending, self.dirty_activity = self.dirty_activity, {}
+        if not await asyncio.to_thread(save_ticket_activity, pending):
+            for channel_id, ts in pending.items():
+                self.dirty_activity.setdefault(channel_id, ts)
+
+    def track_ticket(self, channel):
+        self.activity[channel.id] = (channel.guild.id, time.time())
+        self.schedule(channel.id, time.time())
+
+    def untrack_ticket(self, channel_id):
+        self.activity.pop(channel_id, None)
+        self.dirty_activity.pop(channel_id, None)
+        self.scheduled.pop(channel_id, None)
+        self.warned.discard(channel_id)
+
+    def schedule(self, channel_id, when):
+        self.scheduled[channel_id] = when
+        heapq.heappush(self.deadlines, (when, channel_id))
+        if self.deadlines[0] == (when, channel_id):
+            self.wakeup.set()
+
+    async def run_deadlines(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self.wakeup.clear()
+            delay = self.deadlines[0][0] - time.time() if self.deadlines else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            when, channel_id = heapq.heappop(self.deadlines)
+            if self.scheduled.get(channel_id) != when:
+                continue
+            del self.scheduled[channel_id]
+            try:
+                await self.check_inactivity(channel_id)
+            except Exception as e:
+                print(f"Error checking ticket inactivity: {e}")
+
+    async def check_inactivity(self, channel_id):
+        entry = self.activity.get(channel_id)
+        if entry is None:
+            return
+        guild_id, last_activity = entry
+
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            self.untrack_ticket(channel_id)
+            return
+        if guild_id != channel.guild.id:
+            # Ticket from before per-guild claims
+            self.activity[channel_id] = (channel.guild.id, last_activity)
+
+        hours = get_ticket_config(channel.guild.id).get("inactivity_hours")
+        if not hours:
+            # Disabled; set_ticket_timeout schedules the guild's tickets again
+            return
+
+        timeout = hours * 3600
+        deadline = last_activity + timeout
+        warn_at = deadline - min(INACTIVITY_WARNING_SECONDS, timeout / 4)
+        now = time.time()
+
+        if now < warn_at:
+            self.schedule(channel_id, warn_at)
+        elif channel_id not in self.warned and now < deadline:
+            self.warned.add(channel_id)
+            await channel.send(embed=discord.Embed(
+                description=f"⏰ This ticket has been inactive and will be closed <t:{int(deadline)}:R>. Send a message to keep it open.",
+                color=discord.Color.orange()
+            ))
+            self.schedule(channel_id, deadline)
+        elif now < deadline:
+            self.schedule(channel_id, deadline)
+        else:
+            # Untracked first: the deadline is gone, so a close that fails is not retried
+            self.untrack_ticket(channel_id)
+            try:
+                await channel.send(f"🔒 Ticket closing in 5 seconds...\nReason: No activity for {hours} hours")
+            except discord.HTTPException as e:
+                print(f"Error announcing closure of {channel.name}: {e}")
+            task = asyncio.create_task(close_ticket_channel(channel, channel.guild.me, f"No activity for {hours} hours"))
+            self.close_tasks.add(task)
+            task.add_done_callback(self.close_tasks.discard)
+            task.add_done_callback(self.report_close_error)
+
+    @staticmethod
+    def report_close_error(task):
+        if not task.cancelled() and task.exception():
+            print(f"Error closing inactive ticket: {task.exception()}")
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author.bot:
+            return
+        entry = self.activity.get(message.channel.id)
+        if entry is None:
+            return
+        now = time.time()
+        self.activity[message.channel.id] = (entry[0], now)
+        self.dirty_activity[message.channel.id] = now
+        self.warned.discard(message.channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.untrack_ticket(channel.id)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        adopt_legacy_tickets(self.bot.guilds)
+        guild_id = adopt_legacy_config(self.bot.guilds)
+        if guild_id:
+            print(f"Moved legacy ticket config to guild {guild_id}")
 
     @commands.command(name='set_ticket_category', hidden=True)
     @commands.has_permissions(administrator=True)
@@ -290,9 +744,9 @@ class Tickets(commands.Cog):
         Sets the category where tickets will be created. (Admin only)
         Usage: !set_ticket_category <category_id_or_name>
         """
-        data = load_tickets_config()
-        data["category_id"] = category.id
-        save_tickets_config(data)
+        if not set_ticket_setting(ctx.guild.id, "category_id", category.id):
+            await ctx.send("❌ DB Error.")
+            return
         await ctx.send(f"✅ Ticket category set to: {category.name}")
 
     @commands.command(name='set_ticketlog_channel', hidden=True)
@@ -302,9 +756,9 @@ class Tickets(commands.Cog):
         Sets the channel where ticket logs will be sent. (Admin only)
         Usage: ?set_ticketlog_channel <channel>
         """
-        data = load_tickets_config()
-        data["log_channel_id"] = channel.id
-        save_tickets_config(data)
+        if not set_ticket_setting(ctx.guild.id, "log_channel_id", channel.id):
+            await ctx.send("❌ DB Error.")
+            return
         await ctx.send(f"✅ Ticket log channel set to: {channel.mention}")
 
     @commands.command(name='set_support_role', hidden=True)
@@ -314,11 +768,34 @@ class Tickets(commands.Cog):
         Sets the support role that can access tickets. (Admin only)
         Usage: ?set_support_role <role>
         """
-        data = load_tickets_config()
-        data["support_role_id"] = role.id
-        save_tickets_config(data)
+        if not set_ticket_setting(ctx.guild.id, "support_role_id", role.id):
+            await ctx.send("❌ DB Error.")
+            return
         await ctx.send(f"✅ Support role set to: {role.name}")
 
+    @commands.command(name='set_ticket_timeout', hidden=True)
+    @commands.has_permissions(administrator=True)
+    async def set_ticket_timeout(self, ctx, hours: int):
+        """
+        Closes tickets automatically after this many hours without messages. (Admin only)
+        Usage: ?set_ticket_timeout <hours> (0 disables)
+        """
+        if hours < 0:
+            await ctx.send("❌ Hours must be 0 or more.")
+            return
+        if not set_ticket_setting(ctx.guild.id, "inactivity_hours", hours or None):
+            await ctx.send("❌ DB Error.")
+            return
+
+        if hours:
+            now = time.time()
+            for channel_id, (guild_id, _) in self.activity.items():
+                if guild_id == ctx.guild.id:
+                    self.schedule(channel_id, now)
+            await ctx.send(f"✅ Tickets will be closed after {hours} hours of inactivity.")
+        else:
+            await ctx.send("✅ Inactive tickets will no longer be closed automatically.")
+
     @commands.command(name='create_ticket', hidden=True)
     @commands.has_permissions(administrator=True)
     async def create_ticket(self, ctx):
@@ -346,23 +823,7 @@ class Tickets(commands.Cog):
             return
 
         await ctx.send(f"🔒 Ticket closing in 5 seconds...\nReason: {reason}")
-        
-        # Log closure
-        await log_ticket_event(
-            ctx.guild,
-            "Ticket Closed",
-            f"Ticket closed by {ctx.author.mention}",
-            discord.Color.red(),
-            [("User", f"{ctx.author} (`{ctx.author.id}`)", True),
-             ("Channel", ctx.channel.name, True),
-             ("Reason", reason, False)]
-        )
-
-        await asyncio.sleep(5)
-        
-        remove_active_ticket(ctx.channel.id)
-
-        await ctx.channel.delete(reason=f"Ticket closed by {ctx.author}: {reason}")
+        await close_ticket_channel(ctx.channel, ctx.author, reason)
 
 async def setup(bot):
     bot.add_view(TicketLauncher())
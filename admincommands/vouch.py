@@ -3,121 +3,436 @@ from discord.ext import commands
 import db
 import asyncio
 import os
+import re
+from utils.attachment_store import AttachmentStore, blob_path, get_blobs
+from utils.cog_state import stash_state, take_state
+
+REQUEST_COLUMNS = "requester_id, target_id, action, reason, proof_urls, guild_id, proof_blobs"
+HISTORY_PAGE_SIZE = 5
+
+def _request_from_row(row):
+    return {
+        'requester_id': row[0],
+        'target_id': row[1],
+        'action': row[2],
+        'reason': row[3],
+        'proof_urls': list(row[4] or []),
+        'guild_id': row[5],
+        'proof_blobs': list(row[6] or [])
+    }
+
+def _record_event(cur, guild_id, target_id, requester_id, moderator_id, action, reason, proof_urls, request_message_id=None, proof_blobs=()):
+    """Appends to vouch_events and updates the guild score in the caller's transaction. Returns the new score."""
+    delta = 1 if action == 'vouch' else -1
+    cur.execute("""
+        INSERT INTO vouch_events (guild_id, target_id, requester_id, moderator_id, action, delta, reason, proof_urls, request_message_id, proof_blobs)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (guild_id, target_id, requester_id, moderator_id, action, delta, reason, proof_urls, request_message_id, list(proof_blobs)))
+    cur.execute("""
+        INSERT INTO vouch_scores (guild_id, user_id, score)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (guild_id, user_id)
+        DO UPDATE SET score = vouch_scores.score + EXCLUDED.score
+        RETURNING score
+    """, (guild_id, target_id, delta))
+    return cur.fetchone()[0]
+
+def add_vouch_event(guild_id, target_id, requester_id, moderator_id, action, reason, proof_urls):
+    conn = db.get_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            new_score = _record_event(cur, guild_id, target_id, requester_id, moderator_id, action, reason, proof_urls)
+        conn.commit()
+        return new_score
+    except Exception as e:
+        conn.rollback()
+        print(f"DB Error recording vouch: {e}")
+        return None
+    finally:
+        conn.close()
+
+def get_score(guild_id, user_id):
+    conn = db.get_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT score FROM vouch_scores WHERE guild_id = %s AND user_id = %s", (guild_id, user_id))
+            row = cur.fetchone()
+            return row[0] if row else 0
+    finally:
+        conn.close()
+
+def get_history(guild_id, user_id, before=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Returns (events, has_more) newest first. `before` is the (created_at, id)
+    of the last event on the previous page, so each page is an index range scan.
+    """
+    conn = db.get_connection()
+    if not conn:
+        return [], False
+    try:
+        with conn.cursor() as cur:
+            if before is None:
+                cur.execute("""
+                    SELECT id, created_at, action, moderator_id, requester_id, reason
+                    FROM vouch_events
+                    WHERE guild_id = %s AND target_id = %s
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                """, (guild_id, user_id, limit + 1))
+            else:
+                cur.execute("""
+                    SELECT id, created_at, action, moderator_id, requester_id, reason
+                    FROM vouch_events
+                    WHERE guild_id = %s AND target_id = %s AND (created_at, id) < (%s, %s)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                """, (guild_id, user_id, before[0], before[1], limit + 1))
+            rows = cur.fetchall()
+        events = [{
+            'id': row[0],
+            'created_at': row[1],
+            'action': row[2],
+            'moderator_id': row[3],
+            'requester_id': row[4],
+            'reason': row[5]
+        } for row in rows[:limit]]
+        return events, len(rows) > limit
+    except Exception as e:
+        print(f"DB Error getting vouch history: {e}")
+        return [], False
+    finally:
+        conn.close()
+
+def get_top_scores(guild_id, limit=10):
+    conn = db.get_connection()
+    if not conn:
+        return []
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT user_id, score FROM vouch_scores
+                WHERE guild_id = %s AND score > 0
+                ORDER BY score DESC
+                LIMIT %s
+            """, (guild_id, limit))
+            return cur.fetchall()
+    except Exception as e:
+        print(f"DB Error getting vouch leaderboard: {e}")
+        return []
+    finally:
+        conn.close()
+
+def save_request(message, requester_id, target_id, action, reason, proof_urls, proof_blobs=()):
+    conn = db.get_connection()
+    if not conn:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO vouch_requests (message_id, guild_id, channel_id, requester_id, target_id, action, reason, proof_urls, proof_blobs)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (message.id, message.guild.id, message.channel.id, requester_id, target_id, action, reason, proof_urls, list(proof_blobs)))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"DB Error saving vouch request: {e}")
+        return False
+    finally:
+        conn.close()
+
+def approve_request(message_id, moderator_id):
+    """
+    Moves a pending request to 'approved' and applies its score change in one
+    transaction. The status check is part of the UPDATE, so concurrent clicks
+    can only approve once. Returns (request, new_score) or (None, None).
+    """
+    conn = db.get_connection()
+    if not conn:
+        return None, None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                UPDATE vouch_requests SET status = 'approved', decided_by = %s, decided_at = now()
+                WHERE message_id = %s AND status = 'pending'
+                RETURNING {REQUEST_COLUMNS}
+            """, (moderator_id, message_id))
+            row = cur.fetchone()
+            if not row:
+                conn.rollback()
+                return None, None
+
+            request = _request_from_row(row)
+            new_score = _record_event(
+                cur, request['guild_id'], request['target_id'], request['requester_id'], moderator_id,
+                request['action'], request['reason'], request['proof_urls'], request_message_id=message_id,
+                proof_blobs=request['proof_blobs']
+            )
+        conn.commit()
+        return request, new_score
+    except Exception as e:
+        conn.rollback()
+        print(f"DB Error approving vouch request: {e}")
+        return None, None
+    finally:
+        conn.close()
+
+def deny_request(message_id, moderator_id):
+    conn = db.get_connection()
+    if not conn:
+        return None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                UPDATE vouch_requests SET status = 'denied', decided_by = %s, decided_at = now()
+                WHERE message_id = %s AND status = 'pending'
+                RETURNING {REQUEST_COLUMNS}
+            """, (moderator_id, message_id))
+            row = cur.fetchone()
+        conn.commit()
+        return _request_from_row(row) if row else None
+    except Exception as e:
+        print(f"DB Error denying vouch request: {e}")
+        return None
+    finally:
+        conn.close()
+
+def parse_legacy_request(embed):
+    """
+    Reads a request from the embed of a message posted before requests were
+    stored (migration 0003). Returns a request dict without guild_id, or None.
+    """
+    if not embed or not embed.description or not embed.title:
+        return None
+    requester_match = re.search(r"Requester:\*\* .* \(`(\d+)`\)", embed.description)
+    target_match = re.search(r"Target:\*\* .* \(`(\d+)`\)", embed.description)
+    if not requester_match or not target_match:
+        return None
+
+    request = {
+        'requester_id': int(requester_match.group(1)),
+        'target_id': int(target_match.group(1)),
+        'action': 'vouch' if 'Vouch' in embed.title else 'unvouch',
+        'reason': "No reason provided",
+        'proof_urls': []
+    }
+    for field in embed.fields:
+        if field.name == "Reason":
+            request['reason'] = field.value
+        elif field.name == "Proof":
+            request['proof_urls'] = field.value.split('\n')
+    return request
+
+def adopt_legacy_request(message):
+    """
+    Stores a pending row for a request message that has none, parsed from its
+    embed, so it can go through the normal approve/deny transition.
+    Returns True if a row was added.
+    """
+    request = parse_legacy_request(message.embeds[0] if message.embeds else None)
+    if not request:
+        return False
+
+    conn = db.get_connection()
+    if not conn:
+        return False
+    try:
+        with conn.cursor() as cur:
+            # Concurrent clicks on the same message adopt it once
+            cur.execute("""
+                INSERT INTO vouch_requests (message_id, guild_id, channel_id, requester_id, target_id, action, reason, proof_urls)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (message_id) DO NOTHING
+            """, (message.id, message.guild.id, message.channel.id, request['requester_id'], request['target_id'],
+                  request['action'], request['reason'], request['proof_urls']))
+            added = cur.rowcount == 1
+        conn.commit()
+        return added
+    except Exception as e:
+        print(f"DB Error adopting legacy vouch request: {e}")
+        return False
+    finally:
+        conn.close()
+
+def describe_missing_request(message_id):
+    # Only reached when the atomic transition did not match a pending request
+    conn = db.get_connection()
+    if not conn:
+        return "Database error processing request."
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT status FROM vouch_requests WHERE message_id = %s", (message_id,))
+            row = cur.fetchone()
+        if row:
+            return f"❌ This request has already been {row[0]}."
+        return "❌ No stored data for this request."
+    finally:
+        conn.close()
+
+# Logging and DMs run after the interaction is answered; references keep the tasks alive
+_followup_tasks = set()
+
+def run_followup(coro):
+    task = asyncio.create_task(coro)
+    _followup_tasks.add(task)
+    task.add_done_callback(_followup_tasks.discard)
+    task.add_done_callback(_report_followup_error)
+    return task
+
+def _report_followup_error(task):
+    if not task.cancelled() and task.exception():
+        print(f"Error in vouch follow-up: {task.exception()}")
 
 class VouchRequestView(discord.ui.View):
     def __init__(self, bot):
         self.bot = bot
         super().__init__(timeout=None)
 
-    def get_info_from_embed(self, embed):
-        if not embed or not embed.description:
-            return None, None, None, None, []
-        
-        import re
-        requester_match = re.search(r"Requester:\*\* .* \(`(\d+)`\)", embed.description)
-        target_match = re.search(r"Target:\*\* .* \(`(\d+)`\)", embed.description)
-        
-        requester_id = int(requester_match.group(1)) if requester_match else None
-        target_id = int(target_match.group(1)) if target_match else None
-        
-        action = 'vouch' if 'Vouch' in embed.title else 'unvouch'
-        
-        reason = "No reason provided"
-        proof_urls = []
-        
-        for field in embed.fields:
-            if field.name == "Reason":
-                reason = field.value
-            elif field.name == "Proof":
-                proof_urls = field.value.split('\n')
-                
-        return requester_id, target_id, action, reason, proof_urls
-
-    async def update_score(self, guild_id, target_id, value):
-        conn = db.get_connection()
-        if not conn:
-            return None
-        try:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO vouches (user_id, score) 
-                VALUES (%s, %s) 
-                ON CONFLICT (user_id) 
-                DO UPDATE SET score = vouches.score + %s 
-                RETURNING score
-            """, (target_id, value, value))
-            new_score = cur.fetchone()[0]
-            conn.commit()
-            return new_score
-        except Exception as e:
-            print(f"DB Error: {e}")
-            return None
-        finally:
-            conn.close()
-
     @discord.ui.button(label="Approve", style=discord.ButtonStyle.green, custom_id="vouch_approve")
     async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message(embed=discord.Embed(description="❌ Only admins can assume this action.", color=discord.Color.red()), ephemeral=True)
             return
 
-        embed = interaction.message.embeds[0]
-        requester_id, target_id, action, reason, proof_urls = self.get_info_from_embed(embed)
-        
-        if not requester_id or not target_id:
-            await interaction.response.send_message(embed=discord.Embed(description="❌ Error parsing request data.", color=discord.Color.red()), ephemeral=True)
+        request, new_score = approve_request(interaction.message.id, interaction.user.id)
+        if request is None and adopt_legacy_request(interaction.message):
+            request, new_score = approve_request(interaction.message.id, interaction.user.id)
+        if request is None:
+            await interaction.response.send_message(embed=discord.Embed(description=describe_missing_request(interaction.message.id), color=discord.Color.red()), ephemeral=True)
             return
 
-        value = 1 if action == 'vouch' else -1
-        new_score = await self.update_score(interaction.guild_id, target_id, value)
-        
-        if new_score is None:
-            await interaction.response.send_message(embed=discord.Embed(description="Database error processing request.", color=discord.Color.red()), ephemeral=True)
-            return
+        # Answer within the interaction window first; the log re-uploads proof files and can take a while
+        view = VouchRequestView(self.bot)
+        for item in view.children:
+            item.disabled = True
+        await interaction.response.edit_message(content=f"✅ Request APPROVED by {interaction.user.mention}", view=view)
+
+        run_followup(self.announce_approval(interaction.guild, interaction.user, request, new_score))
+
+    async def announce_approval(self, guild, moderator, request, new_score):
+        requester_id, target_id, action = request['requester_id'], request['target_id'], request['action']
+        reason, proof_urls = request['reason'], request['proof_urls']
 
         # Log via Cog method
         target_user = await self.bot.fetch_user(target_id)
         requester = await self.bot.fetch_user(requester_id)
-        await Vouches.log_action(self.bot, interaction.guild, target_user, requester, action, new_score, reason, proof_urls, interaction.user)
-        
+        await Vouches.log_action(self.bot, guild, target_user, requester, action, new_score, reason, proof_urls, moderator, proof_blobs=request['proof_blobs'])
+
         # Notify Requester
         try:
             await requester.send(embed=discord.Embed(description=f"✅ Your {action} request for user ID {target_id} has been approved.", color=discord.Color.green()))
         except:
             pass
 
-        # Disable buttons
-        view = VouchRequestView(self.bot)
-        for item in view.children:
-            item.disabled = True
-        
-        await interaction.response.edit_message(content=f"✅ Request APPROVED by {interaction.user.mention}", view=view)
-
     @discord.ui.button(label="Deny", style=discord.ButtonStyle.red, custom_id="vouch_deny")
     async def deny(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message(embed=discord.Embed(description="❌ Only admins can assume this action.", color=discord.Color.red()), ephemeral=True)
             return
 
-        embed = interaction.message.embeds[0]
-        requester_id, target_id, action, _, _ = self.get_info_from_embed(embed)
+        request = deny_request(interaction.message.id, interaction.user.id)
+        if request is None and adopt_legacy_request(interaction.message):
+            request = deny_request(interaction.message.id, interaction.user.id)
+        if request is None:
+            await interaction.response.send_message(embed=discord.Embed(description=describe_missing_request(interaction.message.id), color=discord.Color.red()), ephemeral=True)
+            return
+
+        view = VouchRequestView(self.bot)
+        for item in view.children:
+            item.disabled = True
+        await interaction.response.edit_message(content=f"❌ Request DENIED by {interaction.user.mention}", view=view)
+
+        run_followup(self.notify_denial(request))
 
+    async def notify_denial(self, request):
+        requester_id, target_id, action = request['requester_id'], request['target_id'], request['action']
         try:
             user = await self.bot.fetch_user(requester_id)
             await user.send(embed=discord.Embed(description=f"❌ Your {action} request for user ID {target_id} has been denied.", color=discord.Color.red()))
         except:
             pass
-            
-        view = VouchRequestView(self.bot)
-        for item in view.children:
-            item.disabled = True
-            
-        await interaction.response.edit_message(content=f"❌ Request DENIED by {interaction.user.mention}", view=view)
+
+class VouchHistoryView(discord.ui.View):
+    def __init__(self, ctx, user, score):
+        super().__init__(timeout=120)
+        self.ctx = ctx
+        self.user = user
+        self.score = score
+        # Keyset cursor for every page visited so far; None is the newest page
+        self.cursors = [None]
+        self.page = 0
+        self.events = []
+        self.has_more = False
+        self.load_page()
+
+    def load_page(self):
+        self.events, self.has_more = get_history(self.ctx.guild.id, self.user.id, before=self.cursors[self.page])
+        self.newer.disabled = self.page == 0
+        self.older.disabled = not self.has_more
+
+    def get_embed(self):
+        score = self.score
+        color = discord.Color.green() if score > 0 else discord.Color.red() if score < 0 else discord.Color.blue()
+        embed = discord.Embed(title="Vouch Status", description=f"{self.user.mention} has **{score}** vouches.", color=color)
+        embed.set_thumbnail(url=self.user.display_avatar.url)
+
+        if self.events:
+            lines = []
+            for event in self.events:
+                icon = "✅" if event['action'] == 'vouch' else "🔻"
+                reason = (event['reason'] or "No reason provided").replace("\n", " ")
+                if len(reason) > 60:
+                    reason = reason[:57] + "..."
+                by = f"<@{event['moderator_id']}>" if event['moderator_id'] else "Unknown"
+                lines.append(f"{icon} <t:{int(event['created_at'].timestamp())}:d> by {by} - {reason}")
+            embed.add_field(name="History", value="\n".join(lines), inline=False)
+            embed.set_footer(text=f"Page {self.page + 1}")
+        else:
+            embed.add_field(name="History", value="No vouch history yet.", inline=False)
+        return embed
+
+    @discord.ui.button(label="< Newer", style=discord.ButtonStyle.secondary)
+    async def newer(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page > 0:
+            self.page -= 1
+            self.load_page()
+        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+
+    @discord.ui.button(label="Older >", style=discord.ButtonStyle.secondary)
+    async def older(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.has_more:
+            last = self.events[-1]
+            if self.page + 1 == len(self.cursors):
+                self.cursors.append((last['created_at'], last['id']))
+            self.page += 1
+            self.load_page()
+        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user != self.ctx.author:
+            await interaction.response.send_message("This menu is controlled by the command author.", ephemeral=True)
+            return False
+        return True
 
 class Vouches(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.bot.add_view(VouchRequestView(bot))
+        self.attachments = AttachmentStore()
+
+    async def cog_load(self):
+        state = take_state(self.bot, self)
+        if state:
+            # Archives still downloading finish on the store that started them
+            self.attachments = state['attachments']
+
+    async def cog_unload(self):
+        state = {'attachments': self.attachments}
+        if not stash_state(self.bot, self, state, on_abandon=lambda s: asyncio.create_task(s['attachments'].close())):
+            await self.attachments.close()
 
     def get_config(self, guild_id):
         conn = db.get_connection()
@@ -158,7 +473,7 @@ class Vouches(commands.Cog):
             conn.close()
 
     @staticmethod
-    async def log_action(bot, guild, target_user, requester, action, new_score, reason, proof_urls, moderator):
+    async def log_action(bot, guild, target_user, requester, action, new_score, reason, proof_urls, moderator, proof_blobs=None):
         # We need an instance to access DB, but this is static.
         # Let's just create a quick DB connection here since it's cleaner than passing self everywhere if not available.
         conn = db.get_connection()
@@ -199,12 +514,27 @@ class Vouches(commands.Cog):
                 )
                 embed.add_field(name="Reason", value=reason, inline=False)
                 embed.set_footer(text=f"Approved/Executed by {moderator.display_name}")
-                if proof_urls:
+
+                # Archived copies are re-uploaded with the log, since CDN links expire
+                files = []
+                budget = guild.filesize_limit
+                for blob in get_blobs(proof_blobs or [])[:10]:
+                    path = blob_path(blob['sha256'])
+                    if blob['size'] > budget or not os.path.exists(path):
+                        continue
+                    budget -= blob['size']
+                    files.append(discord.File(path, filename=f"{blob['sha256'][:12]}-{blob['filename']}"))
+
+                if files:
+                    embed.add_field(name="Proof", value=f"{len(files)} archived attachment(s) below.", inline=False)
+                    if files[0].filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
+                        embed.set_image(url=f"attachment://{files[0].filename}")
+                elif proof_urls:
                     embed.add_field(name="Proof", value="\n".join(proof_urls), inline=False)
                     if proof_urls[0].lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
                         embed.set_image(url=proof_urls[0])
                 
-                await channel.send(embed=embed)
+                await channel.send(embed=embed, files=files)
 
     @commands.command(name='vouch_log', hidden=True)
     @commands.has_permissions(administrator=True)
@@ -227,59 +557,54 @@ class Vouches(commands.Cog):
     @commands.command(name='vouch')
     async def vouch(self, ctx, user: discord.User):
         if ctx.author.guild_permissions.administrator:
-            conn = db.get_connection()
-            if not conn:
+            new_score = add_vouch_event(ctx.guild.id, user.id, ctx.author.id, ctx.author.id, 'vouch', "Admin Command Usage", [])
+            if new_score is None:
                 await ctx.send(embed=discord.Embed(description="❌ Database Error.", color=discord.Color.red()))
                 return
-            try:
-                cur = conn.cursor()
-                cur.execute("INSERT INTO vouches (user_id, score) VALUES (%s, 1) ON CONFLICT (user_id) DO UPDATE SET score = vouches.score + 1 RETURNING score", (user.id,))
-                new_score = cur.fetchone()[0]
-                conn.commit()
-                
-                await ctx.send(embed=discord.Embed(title="✅ User Vouched", description=f"Vouched for {user.mention}. Score: **{new_score}**", color=discord.Color.green()))
-                await self.log_action(self.bot, ctx.guild, user, ctx.author, 'vouch', new_score, "Admin Command Usage", [], ctx.author)
-            finally:
-                conn.close()
+
+            await ctx.send(embed=discord.Embed(title="✅ User Vouched", description=f"Vouched for {user.mention}. Score: **{new_score}**", color=discord.Color.green()))
+            await self.log_action(self.bot, ctx.guild, user, ctx.author, 'vouch', new_score, "Admin Command Usage", [], ctx.author)
         else:
             await self.handle_request_flow(ctx, user, 'req_channel', 'vouch')
 
     @commands.command(name='unvouch')
     async def unvouch(self, ctx, user: discord.User):
         if ctx.author.guild_permissions.administrator:
-            conn = db.get_connection()
-            if not conn:
+            new_score = add_vouch_event(ctx.guild.id, user.id, ctx.author.id, ctx.author.id, 'unvouch', "Admin Command Usage", [])
+            if new_score is None:
                 await ctx.send(embed=discord.Embed(description="❌ Database Error.", color=discord.Color.red()))
                 return
-            try:
-                cur = conn.cursor()
-                cur.execute("INSERT INTO vouches (user_id, score) VALUES (%s, -1) ON CONFLICT (user_id) DO UPDATE SET score = vouches.score - 1 RETURNING score", (user.id,))
-                new_score = cur.fetchone()[0]
-                conn.commit()
-                
-                await ctx.send(embed=discord.Embed(title="🔻 User Unvouched", description=f"Unvouched {user.mention}. Score: **{new_score}**", color=discord.Color.red()))
-                await self.log_action(self.bot, ctx.guild, user, ctx.author, 'unvouch', new_score, "Admin Command Usage", [], ctx.author)
-            finally:
-                conn.close()
+
+            await ctx.send(embed=discord.Embed(title="🔻 User Unvouched", description=f"Unvouched {user.mention}. Score: **{new_score}**", color=discord.Color.red()))
+            await self.log_action(self.bot, ctx.guild, user, ctx.author, 'unvouch', new_score, "Admin Command Usage", [], ctx.author)
         else:
             await self.handle_request_flow(ctx, user, 'req_channel', 'unvouch')
 
     @commands.command(name='vouch_status', aliases=['v_st'])
     async def vouch_status(self, ctx, user: discord.User = None):
+        """
+        Shows a user's vouch score and history in this server.
+        Usage: ?vouch_status [user]
+        """
         if user is None: user = ctx.author
-        conn = db.get_connection()
-        if not conn: return
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT score FROM vouches WHERE user_id = %s", (user.id,))
-                row = cur.fetchone()
-                score = row[0] if row else 0
-                color = discord.Color.green() if score > 0 else discord.Color.red() if score < 0 else discord.Color.blue()
-                embed = discord.Embed(title="Vouch Status", description=f"{user.mention} has **{score}** vouches.", color=color)
-                embed.set_thumbnail(url=user.display_avatar.url)
-                await ctx.send(embed=embed)
-        finally:
-            conn.close()
+        score = get_score(ctx.guild.id, user.id)
+        if score is None:
+            return
+
+        view = VouchHistoryView(ctx, user, score)
+        await ctx.send(embed=view.get_embed(), view=view)
+
+    @commands.command(name='vouch_top', aliases=['v_top'])
+    async def vouch_top(self, ctx):
+        """Shows the most vouched users in this server."""
+        rows = get_top_scores(ctx.guild.id)
+        if not rows:
+            await ctx.send("No vouches in this server yet.")
+            return
+
+        embed = discord.Embed(title=f"Vouch Leaderboard - {ctx.guild.name}", color=discord.Color.gold())
+        embed.description = "\n".join(f"**{idx + 1}.** <@{user_id}> - {score} vouches" for idx, (user_id, score) in enumerate(rows))
+        await ctx.send(embed=embed)
 
     async def handle_request_flow(self, ctx, target_user, link_channel_key, action_name):
         if target_user.id == ctx.author.id:
@@ -307,6 +632,8 @@ class Vouches(commands.Cog):
 
         evidence_msgs = []
         proof_urls = []
+        # Attachments are archived in the background while the user keeps typing
+        archive_tasks = []
         
         def check(m): return m.author == ctx.author and m.channel == dm
 
@@ -319,12 +646,17 @@ class Vouches(commands.Cog):
                         return
                     break
                 if msg.content: evidence_msgs.append(msg.content)
-                for att in msg.attachments: proof_urls.append(att.url)
+                for att in msg.attachments:
+                    proof_urls.append(att.url)
+                    archive_tasks.append(asyncio.create_task(self.attachments.store(att)))
                 await msg.add_reaction('✅')
             except asyncio.TimeoutError:
                 await dm.send(embed=discord.Embed(description="Timed out.", color=discord.Color.red()))
                 return
 
+        blobs = await asyncio.gather(*archive_tasks)
+        proof_blobs = list(dict.fromkeys(blob['sha256'] for blob in blobs if blob))
+
         reason_text = "\n".join(evidence_msgs) if evidence_msgs else "No text provided"
         
         embed = discord.Embed(
@@ -340,7 +672,11 @@ class Vouches(commands.Cog):
                 embed.set_image(url=proof_urls[0])
         
         view = VouchRequestView(self.bot)
-        await req_channel.send(embed=embed, view=view)
+        req_msg = await req_channel.send(embed=embed, view=view)
+        if not save_request(req_msg, ctx.author.id, target_user.id, action_name, reason_text, proof_urls, proof_blobs):
+            await req_msg.delete()
+            await dm.send(embed=discord.Embed(description="❌ Database error. Your request was not submitted.", color=discord.Color.red()))
+            return
         await dm.send(embed=discord.Embed(description="✅ Request submitted successfully!", color=discord.Color.green()))
 
     @commands.command(name='vouch_req_log', hidden=True)
@@ -0,0 +1,87 @@
+"""
+Measures bot cold start and fails if it exceeds a time budget.
+
+Starts `python -X importtime bot.py` with STARTUP_BENCHMARK set, so the bot
+exits as soon as it reaches the requested stage:
+    loaded - every extension is loaded (no Discord connection or token needed)
+    ready  - on_ready fired (needs DISCORD_TOKEN)
+
+Prints the wall time and the slowest top-level imports, and exits with
+status 1 if the stage was not reached within the budget.
+
+Usage: python benchmark_startup.py [--stage loaded|ready] [--budget SECONDS] [--top N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+MARKER = 'startup-benchmark:'
+DEFAULT_BUDGETS = {'loaded': 5.0, 'ready': 15.0}
+
+def parse_importtime(stderr):
+    """Returns [(cumulative_us, module)] for top-level imports from -X importtime output."""
+    results = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+        except ValueError:
+            continue
+        # Nested imports are indented under the module that triggered them
+        if not name.startswith('  '):
+            results.append((int(cumulative), name.strip()))
+    results.sort(reverse=True)
+    return results
+
+def run(stage, timeout):
+    env = dict(os.environ, STARTUP_BENCHMARK=stage)
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', 'bot.py'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env
+    )
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        stdout, stderr = proc.communicate()
+    elapsed = time.perf_counter() - start
+
+    reached = None
+    for line in stdout.splitlines():
+        if line.startswith(MARKER):
+            reached = float(line.split()[-1].rstrip('s'))
+    return elapsed, reached, stdout, stderr
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bot cold start against a time budget.")
+    parser.add_argument('--stage', choices=sorted(DEFAULT_BUDGETS), default='loaded')
+    parser.add_argument('--budget', type=float, help="Seconds allowed (default: 5 for loaded, 15 for ready).")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to show.")
+    args = parser.parse_args()
+
+    budget = args.budget if args.budget is not None else DEFAULT_BUDGETS[args.stage]
+    elapsed, reached, stdout, stderr = run(args.stage, timeout=budget * 3)
+
+    imports = parse_importtime(stderr)
+    total_imports = sum(us for us, _ in imports) / 1e6
+    print(f"Top-level imports: {total_imports:.2f}s")
+    for us, name in imports[:args.top]:
+        print(f"  {us / 1000:>8.1f}ms  {name}")
+
+    if reached is None:
+        print(stdout[-2000:])
+        print(f"FAIL: bot did not reach '{args.stage}' ({elapsed:.2f}s elapsed)")
+        sys.exit(1)
+
+    print(f"Reached '{args.stage}' in {reached:.2f}s in-process, {elapsed:.2f}s wall (budget {budget:.2f}s)")
+    if elapsed > budget:
+        print("FAIL: startup exceeded budget")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
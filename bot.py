@@ -1,13 +1,30 @@
 import os
+import time
 import asyncio
 import discord
-from discord.ext import commands
 from dotenv import load_dotenv
+from utils import metrics
+from utils.instrumented_bot import InstrumentedBot
+from utils.extension_loader import load_extensions, format_report, parse_patterns
+from utils.loop_monitor import LoopMonitor
 
 # Load environment variables
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 
+# Optional comma-separated extension names or patterns, e.g.
+# EXTENSIONS_DENY=functions.welcome to run without Pillow
+EXTENSIONS_ALLOW = parse_patterns(os.getenv('EXTENSIONS_ALLOW'))
+EXTENSIONS_DENY = parse_patterns(os.getenv('EXTENSIONS_DENY'))
+
+# Set by benchmark_startup.py: 'loaded' exits once extensions are loaded, 'ready' after on_ready
+STARTUP_BENCHMARK = os.getenv('STARTUP_BENCHMARK')
+
+# Prometheus metrics on http://METRICS_HOST:METRICS_PORT/metrics; METRICS_PORT=0 turns it off
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+PROCESS_START = time.perf_counter()
+
 # Define intents
 intents = discord.Intents.default()
 intents.message_content = True
@@ -17,7 +34,11 @@ intents.members = True
 os.makedirs('data', exist_ok=True)
 
 # Initialize bot with prefix
-bot = commands.Bot(command_prefix='?', intents=intents)
+bot = InstrumentedBot(command_prefix='?', intents=intents)
+# Event loop lag and blocking-call watchdog, started in main(); see ?loopstats
+bot.loop_monitor = LoopMonitor()
+# ?reload all loads enabled extensions that are not loaded (e.g. failed at startup)
+bot.extension_filters = (EXTENSIONS_ALLOW, EXTENSIONS_DENY)
 
 @bot.event
 async def on_ready():
@@ -32,33 +53,44 @@ async def on_ready():
     else:
         print("❌ Failed to connect to Database!")
 
+    if STARTUP_BENCHMARK == 'ready':
+        print(f"startup-benchmark: ready {time.perf_counter() - PROCESS_START:.3f}s", flush=True)
+        await bot.close()
+
 async def main():
+    # Bring the database schema up to date before any cog touches it
+    import migrations
+    if migrations.run_migrations() is None:
+        if STARTUP_BENCHMARK != 'loaded':
+            # Cogs would run against an outdated schema and fail at runtime instead
+            print("❌ Database migrations failed; not starting the bot.")
+            return
+        # Like the token, the database is optional when only measuring extension loading
+        print("Database migrations failed; continuing for the startup benchmark only.")
+
     async with bot:
-        # Load extensions from commands
-        if os.path.exists('./commands'):
-            for filename in os.listdir('./commands'):
-                if filename.endswith('.py'):
-                    await bot.load_extension(f'commands.{filename[:-3]}')
-                    print(f'Loaded extension: commands.{filename}')
-
-        # Load extensions from admincommands
-        if os.path.exists('./admincommands'):
-            for filename in os.listdir('./admincommands'):
-                if filename.endswith('.py'):
-                    await bot.load_extension(f'admincommands.{filename[:-3]}')
-                    print(f'Loaded extension: admincommands.{filename}')
-
-        # Load extensions from functions
-        if os.path.exists('./functions'):
-            for filename in os.listdir('./functions'):
-                if filename.endswith('.py'):
-                    await bot.load_extension(f'functions.{filename[:-3]}')
-                    print(f'Loaded extension: functions.{filename}')
-        
+        # Load extensions from commands, admincommands and functions
+        start = time.perf_counter()
+        report = await load_extensions(bot, allow=EXTENSIONS_ALLOW, deny=EXTENSIONS_DENY)
+        print(format_report(report, time.perf_counter() - start))
+
+        if STARTUP_BENCHMARK == 'loaded':
+            print(f"startup-benchmark: loaded {time.perf_counter() - PROCESS_START:.3f}s", flush=True)
+            return
+
+        if METRICS_PORT:
+            try:
+                bot.metrics_server = await metrics.start_server(METRICS_HOST, METRICS_PORT)
+                print(f"Metrics served on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except OSError as e:
+                print(f"Could not start metrics server: {e}")
+
+        bot.loop_monitor.start()
+
         await bot.start(TOKEN)
 
 if __name__ == "__main__":
-    if not TOKEN or TOKEN == "your_token_here":
+    if (not TOKEN or TOKEN == "your_token_here") and STARTUP_BENCHMARK != 'loaded':
         print("Error: DISCORD_TOKEN not found in .env or is still default.")
     else:
         try:
@@ -1,11 +1,34 @@
 import discord
 from discord.ext import commands
 import random
+from utils.announce_queue import AnnouncementQueue
+from utils.cog_state import stash_state, take_state
 from utils.leveling_handler import update_user_xp, get_user_data, get_rank, get_leaderboard, calculate_xp_for_level, set_levelup_channel, get_levelup_channel
 
 class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.announcements = AnnouncementQueue(header="🎉 **Level ups!**")
+        # guild_id -> level-up channel ID (None when not set); filled on first level-up
+        self.levelup_channels = {}
+
+    async def cog_load(self):
+        state = take_state(self.bot, self)
+        if state:
+            # Keep the running queue so batched announcements are not lost
+            self.announcements.close()
+            self.announcements = state['announcements']
+            self.levelup_channels = state['levelup_channels']
+
+    def cog_unload(self):
+        state = {'announcements': self.announcements, 'levelup_channels': self.levelup_channels}
+        if not stash_state(self.bot, self, state, on_abandon=lambda s: s['announcements'].close()):
+            self.announcements.close()
+
+    def get_levelup_channel_id(self, guild_id):
+        if guild_id not in self.levelup_channels:
+            self.levelup_channels[guild_id] = get_levelup_channel(guild_id)
+        return self.levelup_channels[guild_id]
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -20,11 +43,13 @@ class Leveling(commands.Cog):
         new_level, leveled_up = update_user_xp(message.guild.id, message.author.id, xp_amount)
         
         if leveled_up:
-            channel_id = get_levelup_channel(message.guild.id)
+            channel_id = self.get_levelup_channel_id(message.guild.id)
             if channel_id:
                 channel = self.bot.get_channel(int(channel_id))
                 if channel:
-                    await channel.send(f"Congratulations {message.author.mention}! You have leveled up to level {new_level}!")
+                    # Queued and batched with other level-ups; never waits on Discord
+                    self.announcements.post(channel, message.author.id,
+                                            f"Congratulations {message.author.mention}! You have leveled up to level {new_level}!")
             else:
                  # Optional: Send in the same channel if no log channel set, or just don't send anything.
                  # User request says: "send mssg when someone level ups". 
@@ -91,6 +116,7 @@ class Leveling(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def set_levelup_log(self, ctx, channel: discord.TextChannel):
         set_levelup_channel(ctx.guild.id, channel.id)
+        self.levelup_channels[ctx.guild.id] = channel.id
         await ctx.send(f"Level-up notifications will now be sent to {channel.mention}")
 
     @set_levelup_log.error
@@ -1,7 +1,17 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
 import datetime
+import gzip
+import io
+import tempfile
 import db
+from utils.cog_state import stash_state, take_state
+from utils.tag_usage import write_usage_counts, get_usage_stats, get_stored_uses, delete_usage, TOP_TAGS_LIMIT
+from utils.tag_transfer import export_tags, import_tags, detect_format, FORMATS
+
+# Seconds between batched writes of tag usage counters
+USAGE_FLUSH_INTERVAL = 60
 
 class TagPaginationView(discord.ui.View):
     def __init__(self, ctx, data, title, per_page=15):
@@ -73,20 +83,108 @@ class TagPaginationView(discord.ui.View):
 class Tags(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # (guild_id, name) -> uses not yet written to tag_usage
+        self.pending_usage = {}
+        # guild_id -> {'top': [(name, uses), ...], 'total': int, 'distinct': int}
+        self.usage_stats = {}
+        # (guild_id, name) -> uses in tag_usage, learned from flushes and lookups;
+        # covers pending tags outside the cached top-N without a query per command
+        self.stored_uses = {}
+        self.flush_usage_loop.start()
+
+    async def cog_load(self):
+        state = take_state(self.bot, self)
+        if state:
+            for key, uses in state['pending_usage'].items():
+                self.pending_usage[key] = self.pending_usage.get(key, 0) + uses
+            self.usage_stats = state['usage_stats']
+            self.stored_uses = state.get('stored_uses', {})
+        else:
+            self.usage_stats = get_usage_stats()
+
+    def cog_unload(self):
+        self.flush_usage_loop.cancel()
+        state = {'pending_usage': self.pending_usage, 'usage_stats': self.usage_stats, 'stored_uses': self.stored_uses}
+        if not stash_state(self.bot, self, state, on_abandon=lambda s: s['pending_usage'] and write_usage_counts(s['pending_usage'])):
+            self.flush_usage()
 
     def get_connection(self):
         return db.get_connection()
 
+    def record_usage(self, guild_id, name):
+        key = (guild_id, name)
+        self.pending_usage[key] = self.pending_usage.get(key, 0) + 1
+
+    def flush_usage(self):
+        if not self.pending_usage:
+            return
+
+        pending, self.pending_usage = self.pending_usage, {}
+        stored = write_usage_counts(pending)
+        if stored is None:
+            # Keep the counts so they are retried on the next flush
+            for key, uses in pending.items():
+                self.pending_usage[key] = self.pending_usage.get(key, 0) + uses
+            return
+
+        self.stored_uses.update(stored)
+        # Refresh the precomputed top tags for the guilds that changed
+        self.usage_stats.update(get_usage_stats({guild_id for guild_id, _ in pending}))
+
+    async def merged_usage(self, guild_id):
+        """
+        Returns (counts, new_tags): the cached top-N plus every tag with pending
+        uses, each counted as stored + pending, and how many of the pending tags
+        have no stored uses yet. Stored counts come from memory; only tags not
+        seen since startup are looked up, once, off the event loop.
+        """
+        counts = dict(self.usage_stats.get(guild_id, {}).get('top', []))
+        missing = [name for (g, name) in self.pending_usage if g == guild_id and name not in counts]
+        unknown = [name for name in missing if (guild_id, name) not in self.stored_uses]
+        if unknown:
+            found = await asyncio.to_thread(get_stored_uses, guild_id, unknown)
+            if found is not None:
+                for name in unknown:
+                    self.stored_uses.setdefault((guild_id, name), found.get(name, 0))
+
+        new_tags = 0
+        for name in missing:
+            stored = self.stored_uses.get((guild_id, name))
+            if stored is not None:
+                counts[name] = stored
+            if stored == 0:
+                new_tags += 1
+        # Read after the lookup so uses recorded meanwhile are included
+        for (g, name), uses in self.pending_usage.items():
+            if g == guild_id:
+                counts[name] = counts.get(name, 0) + uses
+        return counts, new_tags
+
+    async def get_top_tags(self, guild_id, limit=TOP_TAGS_LIMIT):
+        counts, _ = await self.merged_usage(guild_id)
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def forget_usage(self, name):
+        delete_usage(name)
+        self.pending_usage = {key: uses for key, uses in self.pending_usage.items() if key[1] != name}
+        self.stored_uses = {key: uses for key, uses in self.stored_uses.items() if key[1] != name}
+        for stats in self.usage_stats.values():
+            stats['top'] = [entry for entry in stats['top'] if entry[0] != name]
+
+    @tasks.loop(seconds=USAGE_FLUSH_INTERVAL)
+    async def flush_usage_loop(self):
+        self.flush_usage()
+
     @commands.group(invoke_without_command=True)
     async def tag(self, ctx, *, name: str = None):
         """
         Tag management system.
         Usage: ?tag <name> to view a tag.
-        Subcommands: create, list, delete, search, raw, info, adelete.
+        Subcommands: create, list, delete, search, raw, info, top, stats, adelete.
         """
         if name is None:
             embed = discord.Embed(title="Tag Help", color=discord.Color.blue())
-            embed.add_field(name="Commands", value="`create`, `list`, `delete`, `search`, `raw`, `info`, `adelete`")
+            embed.add_field(name="Commands", value="`create`, `list`, `delete`, `search`, `raw`, `info`, `top`, `stats`, `adelete`")
             embed.add_field(name="Usage", value="`?tag <name>` to view a tag.")
             await ctx.send(embed=embed)
             return
@@ -103,6 +201,7 @@ class Tags(commands.Cog):
             
             if row:
                 await ctx.send(row[0])
+                self.record_usage(ctx.guild.id if ctx.guild else 0, name)
             else:
                 # Fuzzy search for suggestions
                 cur.execute("SELECT name FROM tags WHERE name ILIKE %s LIMIT 5", (f"%{name}%",))
@@ -191,6 +290,7 @@ class Tags(commands.Cog):
                 
             cur.execute("DELETE FROM tags WHERE name = %s", (name,))
             conn.commit()
+            self.forget_usage(name)
             await ctx.send(embed=discord.Embed(title="Success", description=f"Tag `{name}` deleted.", color=discord.Color.green()))
         except Exception as e:
             await ctx.send(f"Error deleting tag: {e}")
@@ -216,6 +316,7 @@ class Tags(commands.Cog):
                 await ctx.send(embed=discord.Embed(title="Error", description="Tag not found.", color=discord.Color.red()))
             else:
                 conn.commit()
+                self.forget_usage(name)
                 await ctx.send(embed=discord.Embed(title="Success", description=f"Tag `{name}` deleted (Admin).", color=discord.Color.green()))
         except Exception as e:
             await ctx.send(f"Error deleting tag: {e}")
@@ -297,5 +398,104 @@ class Tags(commands.Cog):
         finally:
             conn.close()
 
+    @tag.command()
+    async def top(self, ctx):
+        """Show the most used tags in this server."""
+        guild_id = ctx.guild.id if ctx.guild else 0
+        top_tags = await self.get_top_tags(guild_id)
+        lines = [f"**{idx + 1}.** {name} - {uses} uses" for idx, (name, uses) in enumerate(top_tags)]
+
+        view = TagPaginationView(ctx, lines, "Top Tags", per_page=TOP_TAGS_LIMIT)
+        await ctx.send(embed=view.get_embed(), view=view)
+
+    @tag.command()
+    async def stats(self, ctx):
+        """Show tag usage statistics for this server."""
+        guild_id = ctx.guild.id if ctx.guild else 0
+        counts, new_tags = await self.merged_usage(guild_id)
+        stats = self.usage_stats.get(guild_id, {})
+        total = stats.get('total', 0) + sum(uses for (g, _), uses in self.pending_usage.items() if g == guild_id)
+        top_tags = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:3]
+
+        embed = discord.Embed(title="Tag Stats", color=discord.Color.blue())
+        embed.add_field(name="Total Uses", value=str(total), inline=True)
+        embed.add_field(name="Tags Used", value=str(stats.get('distinct', 0) + new_tags), inline=True)
+        if top_tags:
+            embed.add_field(name="Most Used", value="\n".join(f"{name} ({uses})" for name, uses in top_tags), inline=False)
+        await ctx.send(embed=embed)
+
+    @tag.command(name='export', hidden=True)
+    @commands.has_permissions(administrator=True)
+    async def export_cmd(self, ctx, fmt: str = 'jsonl'):
+        """
+        (Admin) Export all tags as a gzip-compressed file.
+        Usage: ?tag export [jsonl|csv]
+        """
+        fmt = fmt.lower()
+        if fmt not in FORMATS:
+            await ctx.send(embed=discord.Embed(title="Error", description="Format must be `jsonl` or `csv`.", color=discord.Color.red()))
+            return
+
+        # Spool to disk so large exports never sit in memory
+        with tempfile.TemporaryFile() as spool:
+            with gzip.GzipFile(fileobj=spool, mode='wb') as gz:
+                count = await asyncio.to_thread(export_tags, gz, fmt)
+
+            if count is None:
+                await ctx.send("Database error.")
+                return
+
+            size = spool.tell()
+            limit = ctx.guild.filesize_limit if ctx.guild else 8 * 1024 * 1024
+            if size > limit:
+                await ctx.send(embed=discord.Embed(title="Error", description=f"Export is {size // 1024} KB, over the upload limit. Use `python -m utils.tag_transfer export` instead.", color=discord.Color.red()))
+                return
+
+            spool.seek(0)
+            filename = f"tags-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}.gz"
+            await ctx.send(content=f"Exported **{count}** tags.", file=discord.File(spool, filename=filename))
+
+    @tag.command(name='import', hidden=True)
+    @commands.has_permissions(administrator=True)
+    async def import_cmd(self, ctx, mode: str = None):
+        """
+        (Admin) Import tags from an attached .jsonl/.csv file (optionally .gz).
+        Usage: ?tag import [overwrite]
+        Existing tags are kept unless `overwrite` is given.
+        """
+        if not ctx.message.attachments:
+            await ctx.send(embed=discord.Embed(title="Error", description="Attach a `.jsonl`, `.csv` or `.gz` export.", color=discord.Color.red()))
+            return
+
+        attachment = ctx.message.attachments[0]
+        fmt = detect_format(attachment.filename)
+        if fmt is None:
+            await ctx.send(embed=discord.Embed(title="Error", description="Unsupported file type. Use `.jsonl` or `.csv` (optionally `.gz`).", color=discord.Color.red()))
+            return
+
+        overwrite = mode is not None and mode.lower() == 'overwrite'
+
+        with tempfile.TemporaryFile() as spool:
+            await attachment.save(spool)
+            spool.seek(0)
+            result = await asyncio.to_thread(import_tags, spool, fmt, overwrite)
+
+        if result is None:
+            await ctx.send(embed=discord.Embed(title="Error", description="Import failed. Check the file format.", color=discord.Color.red()))
+            return
+
+        conflicts = result['conflicts']
+        embed = discord.Embed(title="Tag Import", color=discord.Color.green())
+        embed.add_field(name="Read", value=str(result['staged']), inline=True)
+        embed.add_field(name="Inserted", value=str(result['inserted']), inline=True)
+        embed.add_field(name="Updated", value=str(result['updated']), inline=True)
+        embed.add_field(name="Conflicts", value=f"{len(conflicts)} ({'overwritten' if overwrite else 'kept existing'})", inline=False)
+
+        file = None
+        if conflicts:
+            report = "\n".join(conflicts).encode()
+            file = discord.File(io.BytesIO(report), filename="conflicts.txt")
+        await ctx.send(embed=embed, file=file)
+
 async def setup(bot):
     await bot.add_cog(Tags(bot))
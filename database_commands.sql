@@ -2,6 +2,15 @@
 
 -- Schema Creation
 
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Migration 0001_initial
+-- Initial schema (previously schema.sql)
+
 CREATE TABLE IF NOT EXISTS levels (
     guild_id BIGINT,
     user_id BIGINT,
@@ -42,6 +51,225 @@ CREATE TABLE IF NOT EXISTS tempbans (
     end_time DOUBLE PRECISION
 );
 
+CREATE TABLE IF NOT EXISTS vouches (
+    user_id BIGINT PRIMARY KEY,
+    score INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS giveaways (
+    message_id BIGINT PRIMARY KEY,
+    channel_id BIGINT,
+    guild_id BIGINT,
+    host_id BIGINT,
+    title TEXT,
+    prize TEXT,
+    winners INT,
+    end_time BIGINT,
+    status TEXT,
+    gw_id TEXT UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS giveaway_participants (
+    message_id BIGINT,
+    user_id BIGINT,
+    PRIMARY KEY (message_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS autoroles (
+    guild_id BIGINT PRIMARY KEY,
+    role_id BIGINT
+);
+
+CREATE TABLE IF NOT EXISTS welcome_config (
+    guild_id BIGINT PRIMARY KEY,
+    channel_id BIGINT
+);
+
+CREATE TABLE IF NOT EXISTS vouch_config (
+    guild_id BIGINT PRIMARY KEY,
+    log_channel BIGINT,
+    req_channel BIGINT,
+    vouch_log_channel BIGINT,
+    unvouch_log_channel BIGINT
+);
+
+CREATE TABLE IF NOT EXISTS tag_usage (
+    guild_id BIGINT,
+    name TEXT,
+    uses BIGINT DEFAULT 0,
+    last_used DOUBLE PRECISION,
+    PRIMARY KEY (guild_id, name)
+);
+
+INSERT INTO schema_version (version, name) VALUES (1, 'initial') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0002_performance_indexes
+-- Indexes for the hot read paths
+
+-- ?rank / ?leaderboard order by level, xp within a guild
+CREATE INDEX IF NOT EXISTS levels_rank_idx ON levels (guild_id, level DESC, xp DESC);
+
+-- check_giveaways polls active giveaways past their deadline every few seconds
+CREATE INDEX IF NOT EXISTS giveaways_active_deadline_idx ON giveaways (end_time) WHERE status = 'active';
+
+-- check_temp_bans polls for expired bans every minute
+CREATE INDEX IF NOT EXISTS tempbans_end_time_idx ON tempbans (end_time);
+
+-- ?tag list filters by owner
+CREATE INDEX IF NOT EXISTS tags_author_idx ON tags (author_id);
+
+-- Tag deletion clears usage rows by name across guilds
+CREATE INDEX IF NOT EXISTS tag_usage_name_idx ON tag_usage (name);
+
+INSERT INTO schema_version (version, name) VALUES (2, 'performance_indexes') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0003_vouch_requests
+-- Structured storage for vouch/unvouch requests, keyed by the request message
+
+CREATE TABLE IF NOT EXISTS vouch_requests (
+    message_id BIGINT PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    channel_id BIGINT NOT NULL,
+    requester_id BIGINT NOT NULL,
+    target_id BIGINT NOT NULL,
+    action TEXT NOT NULL,
+    reason TEXT,
+    proof_urls TEXT[] NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending',
+    decided_by BIGINT,
+    decided_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO schema_version (version, name) VALUES (3, 'vouch_requests') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0004_vouch_ledger
+-- Append-only vouch history and per-guild scores maintained alongside it
+
+CREATE TABLE IF NOT EXISTS vouch_events (
+    id BIGSERIAL PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    target_id BIGINT NOT NULL,
+    requester_id BIGINT,
+    moderator_id BIGINT,
+    action TEXT NOT NULL,
+    delta INTEGER NOT NULL,
+    reason TEXT,
+    proof_urls TEXT[] NOT NULL DEFAULT '{}',
+    request_message_id BIGINT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- History pages are read newest first with a (created_at, id) keyset
+CREATE INDEX IF NOT EXISTS vouch_events_target_idx ON vouch_events (guild_id, target_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS vouch_scores (
+    guild_id BIGINT,
+    user_id BIGINT,
+    score INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS vouch_scores_leaderboard_idx ON vouch_scores (guild_id, score DESC);
+
+-- Scores used to be global; carry them over to every guild that has vouching configured
+INSERT INTO vouch_scores (guild_id, user_id, score)
+SELECT c.guild_id, v.user_id, v.score
+FROM vouches v CROSS JOIN vouch_config c
+ON CONFLICT (guild_id, user_id) DO NOTHING;
+
+INSERT INTO schema_version (version, name) VALUES (4, 'vouch_ledger') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0005_attachment_store
+-- Locally archived proof attachments, stored by content hash under data/attachments/
+
+CREATE TABLE IF NOT EXISTS attachment_blobs (
+    sha256 TEXT PRIMARY KEY,
+    size BIGINT NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Discord attachment ID -> blob, so the same upload is never downloaded twice
+CREATE TABLE IF NOT EXISTS attachment_sources (
+    attachment_id BIGINT PRIMARY KEY,
+    sha256 TEXT NOT NULL REFERENCES attachment_blobs (sha256)
+);
+
+ALTER TABLE vouch_requests ADD COLUMN IF NOT EXISTS proof_blobs TEXT[] NOT NULL DEFAULT '{}';
+ALTER TABLE vouch_events ADD COLUMN IF NOT EXISTS proof_blobs TEXT[] NOT NULL DEFAULT '{}';
+
+INSERT INTO schema_version (version, name) VALUES (5, 'attachment_store') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0006_guild_ticket_config
+-- Ticket settings per guild. The old singleton ticket_config row has no guild,
+-- so the Tickets cog moves it here for the guild that owns its category.
+
+CREATE TABLE IF NOT EXISTS guild_ticket_config (
+    guild_id BIGINT PRIMARY KEY,
+    category_id BIGINT,
+    log_channel_id BIGINT,
+    support_role_id BIGINT
+);
+
+INSERT INTO schema_version (version, name) VALUES (6, 'guild_ticket_config') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0007_ticket_claims
+-- Tickets are claimed per (guild, user) before their channel exists.
+-- channel_id stays NULL while the channel is being created.
+-- Rows from before this migration get guild_id 0 until the Tickets cog
+-- finds the guild that owns their channel.
+
+ALTER TABLE active_tickets ADD COLUMN IF NOT EXISTS guild_id BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE active_tickets ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE active_tickets DROP CONSTRAINT IF EXISTS active_tickets_pkey;
+ALTER TABLE active_tickets ADD PRIMARY KEY (guild_id, user_id);
+
+-- Close/delete paths look tickets up by channel
+CREATE INDEX IF NOT EXISTS active_tickets_channel_idx ON active_tickets (channel_id);
+
+INSERT INTO schema_version (version, name) VALUES (7, 'ticket_claims') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0008_ticket_transcripts
+-- Transcripts written when a ticket is closed; the file lives under data/transcripts/
+
+CREATE TABLE IF NOT EXISTS ticket_transcripts (
+    id BIGSERIAL PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    channel_id BIGINT NOT NULL,
+    channel_name TEXT NOT NULL,
+    owner_id BIGINT,
+    closed_by BIGINT NOT NULL,
+    reason TEXT,
+    message_count INTEGER NOT NULL,
+    first_message_at TIMESTAMPTZ,
+    last_message_at TIMESTAMPTZ,
+    path TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    log_message_id BIGINT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ticket_transcripts_owner_idx ON ticket_transcripts (guild_id, owner_id, created_at DESC);
+
+INSERT INTO schema_version (version, name) VALUES (8, 'ticket_transcripts') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0009_ticket_inactivity
+-- Optional per-guild inactivity timeout for tickets (NULL disables auto-close)
+ALTER TABLE guild_ticket_config ADD COLUMN IF NOT EXISTS inactivity_hours INTEGER;
+
+-- Last message in each ticket, written back lazily by the Tickets cog
+ALTER TABLE active_tickets ADD COLUMN IF NOT EXISTS last_activity TIMESTAMPTZ;
+
+INSERT INTO schema_version (version, name) VALUES (9, 'ticket_inactivity') ON CONFLICT (version) DO NOTHING;
+
+-- Migration 0010_purge_log_channel
+-- Channel that receives ?purge archives
+ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS purge_log_channel_id BIGINT;
+
+INSERT INTO schema_version (version, name) VALUES (10, 'purge_log_channel') ON CONFLICT (version) DO NOTHING;
+
 
 -- Data Migration
 INSERT INTO guild_config (guild_id, levelup_channel_id) VALUES (1342481669747245109, 1342481670674190389) ON CONFLICT (guild_id) DO UPDATE SET levelup_channel_id = EXCLUDED.levelup_channel_id;
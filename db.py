@@ -1,4 +1,10 @@
-import psycopg2
+import time
+from utils import metrics
+from utils import query_stats
+from utils.lazy_import import lazy_import
+
+# Imported on the first connection, so tools that never connect skip psycopg2
+psycopg2 = lazy_import('psycopg2')
 
 DB_HOST = "localhost"
 DB_NAME = "postgres"
@@ -6,17 +12,60 @@ DB_USER = "postgres"
 DB_PASS = "Meowing"
 DB_PORT = 5432
 
+_cursor_class = None
+
+def _instrumented_cursor():
+    """
+    Cursor class handed to every connection, so each cur.execute() in the
+    cogs is timed and recorded in utils.query_stats. Built on first use
+    because psycopg2 is only imported then.
+    """
+    global _cursor_class
+    if _cursor_class is None:
+        class InstrumentedCursor(psycopg2.extensions.cursor):
+            def _timed(self, method, query, *args):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    result = method(query, *args)
+                    failed = False
+                    return result
+                finally:
+                    try:
+                        query_stats.record(query, time.perf_counter() - start, self.rowcount, self, failed)
+                    except Exception as e:
+                        # Never let the bookkeeping replace the query's own result or error
+                        print(f"Error recording query statistics: {e}")
+
+            def execute(self, query, vars=None):
+                return self._timed(super().execute, query, vars)
+
+            def executemany(self, query, vars_list):
+                return self._timed(super().executemany, query, vars_list)
+
+            def copy_expert(self, sql, file, size=8192):
+                return self._timed(super().copy_expert, sql, file, size)
+
+        _cursor_class = InstrumentedCursor
+    return _cursor_class
+
 def get_connection():
     """Returns a new database connection."""
+    start = time.perf_counter()
     try:
         conn = psycopg2.connect(
             host=DB_HOST,
             database=DB_NAME,
             user=DB_USER,
             password=DB_PASS,
-            port=DB_PORT
+            port=DB_PORT,
+            cursor_factory=_instrumented_cursor()
         )
+        metrics.DB_CONNECTIONS.inc('ok')
         return conn
     except Exception as e:
+        metrics.DB_CONNECTIONS.inc('error')
         print(f"Error connecting to PostgreSQL: {e}")
         return None
+    finally:
+        metrics.DB_CONNECT_SECONDS.observe(time.perf_counter() - start)
@@ -1,9 +1,16 @@
 import discord
 from discord.ext import commands
-from PIL import Image, ImageDraw, ImageFont, ImageOps, ImageFilter
+from utils.lazy_import import lazy_import
 from io import BytesIO
 import db
 
+# Pillow is only needed when a member joins, so it is not imported at startup
+Image = lazy_import('PIL.Image')
+ImageDraw = lazy_import('PIL.ImageDraw')
+ImageFont = lazy_import('PIL.ImageFont')
+ImageOps = lazy_import('PIL.ImageOps')
+ImageFilter = lazy_import('PIL.ImageFilter')
+
 class Welcome(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -1,61 +1,49 @@
+import argparse
 import json
 import os
+import sys
+import time
+from contextlib import contextmanager
+from utils.json_stream import JsonStream
+import migrations
 
 OUTPUT_FILE = "database_commands.sql"
 
 def get_schema():
-    return """
--- Schema Creation
-
-CREATE TABLE IF NOT EXISTS levels (
-    guild_id BIGINT,
-    user_id BIGINT,
-    xp BIGINT DEFAULT 0,
-    level INTEGER DEFAULT 1,
-    last_xp DOUBLE PRECISION DEFAULT 0,
-    PRIMARY KEY (guild_id, user_id)
-);
-
-CREATE TABLE IF NOT EXISTS guild_config (
-    guild_id BIGINT PRIMARY KEY,
-    levelup_channel_id BIGINT
-);
-
-CREATE TABLE IF NOT EXISTS tags (
-    name TEXT PRIMARY KEY,
-    content TEXT,
-    author_id BIGINT,
-    created_at TEXT
-);
-
-CREATE TABLE IF NOT EXISTS ticket_config (
-    uniq_id INTEGER PRIMARY KEY DEFAULT 1 CHECK (uniq_id = 1),
-    category_id BIGINT,
-    log_channel_id BIGINT,
-    support_role_id BIGINT
-);
-
-CREATE TABLE IF NOT EXISTS active_tickets (
-    user_id BIGINT PRIMARY KEY,
-    channel_id BIGINT
-);
-
-CREATE TABLE IF NOT EXISTS tempbans (
-    id SERIAL PRIMARY KEY,
-    user_id BIGINT,
-    guild_id BIGINT,
-    end_time DOUBLE PRECISION
-);
-
-"""
+    # The schema lives in the migrations package; include it so the output can be replayed on an empty database
+    return "\n-- Schema Creation\n" + migrations.render_sql() + "\n"
 
 def escape_string(s):
     if s is None:
         return "NULL"
-    if isinstance(s, (int, float)):
+    if isinstance(s, bool):
+        return "TRUE" if s else "FALSE"
+    if isinstance(s, int):
         return str(s)
-    # Basic SQL escaping for single quotes
-    return "'" + str(s).replace("'", "''") + "'"
+    if isinstance(s, float):
+        if s != s or s in (float('inf'), float('-inf')):
+            return f"'{s}'::DOUBLE PRECISION".replace('inf', 'Infinity').replace('nan', 'NaN')
+        return repr(s)
+    # Postgres text cannot hold NUL; with standard_conforming_strings only quotes need doubling
+    return "'" + str(s).replace("\x00", "").replace("'", "''") + "'"
+
+def copy_value(value):
+    """Formats a value for COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, float):
+        return repr(value).replace('inf', 'Infinity').replace('nan', 'NaN')
+    return (str(value)
+            .replace("\x00", "")
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+def copy_line(row):
+    return "\t".join(copy_value(v) for v in row) + "\n"
 
 def generate_levels(f):
     print("Processing levels.json...")
@@ -136,7 +124,7 @@ def generate_tickets(f):
                 info = json.load(json_file)
                 active_tickets = info.get('active_tickets', {})
                 for user_id_str, channel_id in active_tickets.items():
-                    f.write(f"INSERT INTO active_tickets (user_id, channel_id) VALUES ({user_id_str}, {channel_id}) ON CONFLICT (user_id) DO NOTHING;\n")
+                    f.write(f"INSERT INTO active_tickets (user_id, channel_id) VALUES ({user_id_str}, {channel_id}) ON CONFLICT (guild_id, user_id) DO NOTHING;\n")
             except json.JSONDecodeError:
                 f.write("-- ticketinfo.json invalid\n")
 
@@ -161,18 +149,263 @@ def generate_tempbans(f):
         end_time = ban.get('end_time', 'NULL')
         f.write(f"INSERT INTO tempbans (user_id, guild_id, end_time) VALUES ({user_id}, {guild_id}, {end_time});\n")
 
+# --- Streaming mode ---
+# Parses each JSON file incrementally and writes batched INSERTs, COPY blocks,
+# or loads straight into the database, so memory use is independent of file size.
+
+# table -> (columns, merge clause)
+TABLES = {
+    'guild_config': (('guild_id', 'levelup_channel_id'),
+                     "ON CONFLICT (guild_id) DO UPDATE SET levelup_channel_id = EXCLUDED.levelup_channel_id"),
+    'levels': (('guild_id', 'user_id', 'xp', 'level', 'last_xp'),
+               "ON CONFLICT (guild_id, user_id) DO NOTHING"),
+    'tags': (('name', 'content', 'author_id', 'created_at'),
+             "ON CONFLICT (name) DO NOTHING"),
+    'ticket_config': (('category_id', 'log_channel_id', 'support_role_id'),
+                      "ON CONFLICT (uniq_id) DO UPDATE SET category_id = EXCLUDED.category_id, log_channel_id = EXCLUDED.log_channel_id, support_role_id = EXCLUDED.support_role_id"),
+    'active_tickets': (('user_id', 'channel_id'),
+                       "ON CONFLICT (guild_id, user_id) DO NOTHING"),
+    'tempbans': (('user_id', 'guild_id', 'end_time'), ""),
+}
+
+def to_int(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def to_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def iter_level_rows(stream, guild_configs):
+    # levelup_channel entries are few (one per guild) and are collected for a second pass
+    for guild_key in stream.iter_object():
+        guild_id = to_int(guild_key)
+        if guild_id is None or stream.peek() != '{':
+            stream.read_value()
+            continue
+        for user_key in stream.iter_object():
+            value = stream.read_value()
+            if user_key == 'levelup_channel':
+                if value:
+                    guild_configs.append((guild_id, to_int(value)))
+            elif isinstance(value, dict):
+                user_id = to_int(user_key)
+                if user_id is not None:
+                    yield (guild_id, user_id, to_int(value.get('xp', 0)), to_int(value.get('level', 1)), to_float(value.get('last_xp', 0)))
+
+def iter_tag_rows(stream):
+    for name, tag_data in stream.items():
+        if isinstance(tag_data, dict):
+            yield (name, tag_data.get('content', ''), to_int(tag_data.get('author_id')), tag_data.get('created_at', ''))
+
+def iter_ticket_config_rows(stream):
+    config = stream.read_value()
+    if config:
+        yield (to_int(config.get('category_id')), to_int(config.get('log_channel_id')), to_int(config.get('support_role_id')))
+
+def iter_active_ticket_rows(stream):
+    for key in stream.iter_object():
+        if key != 'active_tickets':
+            stream.read_value()
+            continue
+        for user_id_str, channel_id in stream.items():
+            yield (to_int(user_id_str), to_int(channel_id))
+
+def iter_tempban_rows(stream):
+    for key in stream.iter_object():
+        if key != 'bans':
+            stream.read_value()
+            continue
+        for ban in stream.values():
+            yield (to_int(ban.get('user_id')), to_int(ban.get('guild_id')), to_float(ban.get('end_time')))
+
+def with_progress(table, rows, every):
+    start = time.monotonic()
+    count = 0
+    for row in rows:
+        count += 1
+        if every and count % every == 0:
+            rate = count / max(time.monotonic() - start, 1e-9)
+            print(f"  {table}: {count} rows ({rate:.0f} rows/s)", file=sys.stderr)
+        yield row
+    print(f"  {table}: {count} rows in {time.monotonic() - start:.1f}s", file=sys.stderr)
+
+class InsertSink:
+    """Writes multi-row INSERT statements of up to batch_size rows."""
+    def __init__(self, f, batch_size):
+        self.f = f
+        self.batch_size = batch_size
+
+    def note(self, text):
+        self.f.write(f"-- {text}\n")
+
+    def write_table(self, table, rows):
+        columns, conflict = TABLES[table]
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._write_batch(table, columns, conflict, batch)
+                    batch = []
+        finally:
+            if batch:
+                self._write_batch(table, columns, conflict, batch)
+
+    def _write_batch(self, table, columns, conflict, batch):
+        values = ",\n".join("(" + ", ".join(escape_string(v) for v in row) + ")" for row in batch)
+        suffix = f"\n{conflict}" if conflict else ""
+        self.f.write(f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n{values}{suffix};\n")
+
+class CopySink:
+    """Writes COPY ... FROM stdin blocks into a staging table followed by a merge (for psql -f)."""
+    def __init__(self, f):
+        self.f = f
+
+    def note(self, text):
+        self.f.write(f"-- {text}\n")
+
+    def write_table(self, table, rows):
+        columns, conflict = TABLES[table]
+        cols = ", ".join(columns)
+        stage = f"{table}_stage"
+        started = False
+        try:
+            for row in rows:
+                if not started:
+                    self.f.write(f"CREATE TEMP TABLE {stage} AS SELECT {cols} FROM {table} WITH NO DATA;\n")
+                    self.f.write(f"COPY {stage} ({cols}) FROM stdin;\n")
+                    started = True
+                self.f.write(copy_line(row))
+        finally:
+            if started:
+                self.f.write("\\.\n")
+                self.f.write(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage} {conflict}".rstrip() + ";\n")
+                self.f.write(f"DROP TABLE {stage};\n")
+
+class CopyReader:
+    """File-like object that renders rows as COPY text on demand for cursor.copy_expert."""
+    def __init__(self, rows):
+        self.lines = (copy_line(row) for row in rows)
+        self.pending = ""
+
+    def read(self, size=-1):
+        parts = [self.pending]
+        length = len(self.pending)
+        while size < 0 or length < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0:
+            self.pending = ""
+            return data
+        self.pending = data[size:]
+        return data[:size]
+
+
+class LoadSink:
+    """Streams rows straight into the database with COPY, one transaction per table."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def note(self, text):
+        print(text, file=sys.stderr)
+
+    def write_table(self, table, rows):
+        columns, conflict = TABLES[table]
+        cols = ", ".join(columns)
+        stage = f"{table}_stage"
+        cur = self.conn.cursor()
+        try:
+            cur.execute(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT {cols} FROM {table} WITH NO DATA")
+            cur.copy_expert(f"COPY {stage} ({cols}) FROM STDIN", CopyReader(rows))
+            cur.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage} {conflict}")
+            merged = cur.rowcount
+            self.conn.commit()
+            print(f"  {table}: {merged} rows merged", file=sys.stderr)
+        except Exception:
+            self.conn.rollback()
+            raise
+
+@contextmanager
+def open_source(sink, filename):
+    path = os.path.join('data', filename)
+    if not os.path.exists(path):
+        sink.note(f"{filename} not found")
+        yield None
+        return
+    with open(path, 'r', encoding='utf-8') as json_file:
+        yield JsonStream(json_file)
+
+def stream_migration(sink, progress_every):
+    guild_configs = []
+    sources = [
+        ('levels.json', 'levels', lambda stream: iter_level_rows(stream, guild_configs)),
+        ('tags.json', 'tags', iter_tag_rows),
+        ('tickets.json', 'ticket_config', iter_ticket_config_rows),
+        ('ticketinfo.json', 'active_tickets', iter_active_ticket_rows),
+        ('tempbans.json', 'tempbans', iter_tempban_rows),
+    ]
+
+    for filename, table, make_rows in sources:
+        print(f"Processing {filename}...", file=sys.stderr)
+        with open_source(sink, filename) as stream:
+            if stream is None:
+                continue
+            try:
+                sink.write_table(table, with_progress(table, make_rows(stream), progress_every))
+            except (ValueError, AttributeError) as e:
+                sink.note(f"{filename} invalid: {e}")
+
+        if table == 'levels':
+            sink.write_table('guild_config', with_progress('guild_config', guild_configs, progress_every))
+
 def main():
-    with open(OUTPUT_FILE, 'w') as f:
+    parser = argparse.ArgumentParser(description="Migrate the legacy data/*.json files to PostgreSQL.")
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f"SQL file to write (default: {OUTPUT_FILE}).")
+    parser.add_argument('--stream', action='store_true', help="Parse JSON incrementally and write batched statements.")
+    parser.add_argument('--format', choices=('inserts', 'copy'), default='inserts',
+                        help="Streaming output: multi-row INSERT batches or COPY blocks for psql.")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows per INSERT batch in streaming mode.")
+    parser.add_argument('--load', action='store_true',
+                        help="Stream straight into the database with COPY instead of writing a file.")
+    parser.add_argument('--progress-every', type=int, default=100000, help="Report progress every N rows (0 to disable).")
+    args = parser.parse_args()
+
+    if args.load:
+        import db
+        conn = db.get_connection()
+        if not conn:
+            sys.exit(1)
+        try:
+            stream_migration(LoadSink(conn), args.progress_every)
+        finally:
+            conn.close()
+        print("Finished loading data into the database")
+        return
+
+    with open(args.output, 'w', encoding='utf-8') as f:
         f.write("-- Generated Database Commands\n")
         f.write(get_schema())
         f.write("\n-- Data Migration\n")
-        
-        generate_levels(f)
-        generate_tags(f)
-        generate_tickets(f)
-        generate_tempbans(f)
-        
-    print(f"Successfully created {OUTPUT_FILE}")
+
+        if args.stream:
+            sink = CopySink(f) if args.format == 'copy' else InsertSink(f, max(1, args.batch_size))
+            stream_migration(sink, args.progress_every)
+        else:
+            generate_levels(f)
+            generate_tags(f)
+            generate_tickets(f)
+            generate_tempbans(f)
+
+    print(f"Successfully created {args.output}")
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,4 @@
--- Create tables for SquirtleData
+-- Initial schema (previously schema.sql)
 
 CREATE TABLE IF NOT EXISTS levels (
     guild_id BIGINT,
@@ -81,3 +81,11 @@ CREATE TABLE IF NOT EXISTS vouch_config (
     vouch_log_channel BIGINT,
     unvouch_log_channel BIGINT
 );
+
+CREATE TABLE IF NOT EXISTS tag_usage (
+    guild_id BIGINT,
+    name TEXT,
+    uses BIGINT DEFAULT 0,
+    last_used DOUBLE PRECISION,
+    PRIMARY KEY (guild_id, name)
+);
@@ -0,0 +1,16 @@
+-- Indexes for the hot read paths
+
+-- ?rank / ?leaderboard order by level, xp within a guild
+CREATE INDEX IF NOT EXISTS levels_rank_idx ON levels (guild_id, level DESC, xp DESC);
+
+-- check_giveaways polls active giveaways past their deadline every few seconds
+CREATE INDEX IF NOT EXISTS giveaways_active_deadline_idx ON giveaways (end_time) WHERE status = 'active';
+
+-- check_temp_bans polls for expired bans every minute
+CREATE INDEX IF NOT EXISTS tempbans_end_time_idx ON tempbans (end_time);
+
+-- ?tag list filters by owner
+CREATE INDEX IF NOT EXISTS tags_author_idx ON tags (author_id);
+
+-- Tag deletion clears usage rows by name across guilds
+CREATE INDEX IF NOT EXISTS tag_usage_name_idx ON tag_usage (name);
@@ -0,0 +1,16 @@
+-- Structured storage for vouch/unvouch requests, keyed by the request message
+
+CREATE TABLE IF NOT EXISTS vouch_requests (
+    message_id BIGINT PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    channel_id BIGINT NOT NULL,
+    requester_id BIGINT NOT NULL,
+    target_id BIGINT NOT NULL,
+    action TEXT NOT NULL,
+    reason TEXT,
+    proof_urls TEXT[] NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending',
+    decided_by BIGINT,
+    decided_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
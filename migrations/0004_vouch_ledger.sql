@@ -0,0 +1,33 @@
+-- Append-only vouch history and per-guild scores maintained alongside it
+
+CREATE TABLE IF NOT EXISTS vouch_events (
+    id BIGSERIAL PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    target_id BIGINT NOT NULL,
+    requester_id BIGINT,
+    moderator_id BIGINT,
+    action TEXT NOT NULL,
+    delta INTEGER NOT NULL,
+    reason TEXT,
+    proof_urls TEXT[] NOT NULL DEFAULT '{}',
+    request_message_id BIGINT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- History pages are read newest first with a (created_at, id) keyset
+CREATE INDEX IF NOT EXISTS vouch_events_target_idx ON vouch_events (guild_id, target_id, created_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS vouch_scores (
+    guild_id BIGINT,
+    user_id BIGINT,
+    score INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS vouch_scores_leaderboard_idx ON vouch_scores (guild_id, score DESC);
+
+-- Scores used to be global; carry them over to every guild that has vouching configured
+INSERT INTO vouch_scores (guild_id, user_id, score)
+SELECT c.guild_id, v.user_id, v.score
+FROM vouches v CROSS JOIN vouch_config c
+ON CONFLICT (guild_id, user_id) DO NOTHING;
@@ -0,0 +1,18 @@
+-- Locally archived proof attachments, stored by content hash under data/attachments/
+
+CREATE TABLE IF NOT EXISTS attachment_blobs (
+    sha256 TEXT PRIMARY KEY,
+    size BIGINT NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Discord attachment ID -> blob, so the same upload is never downloaded twice
+CREATE TABLE IF NOT EXISTS attachment_sources (
+    attachment_id BIGINT PRIMARY KEY,
+    sha256 TEXT NOT NULL REFERENCES attachment_blobs (sha256)
+);
+
+ALTER TABLE vouch_requests ADD COLUMN IF NOT EXISTS proof_blobs TEXT[] NOT NULL DEFAULT '{}';
+ALTER TABLE vouch_events ADD COLUMN IF NOT EXISTS proof_blobs TEXT[] NOT NULL DEFAULT '{}';
@@ -0,0 +1,9 @@
+-- Ticket settings per guild. The old singleton ticket_config row has no guild,
+-- so the Tickets cog moves it here for the guild that owns its category.
+
+CREATE TABLE IF NOT EXISTS guild_ticket_config (
+    guild_id BIGINT PRIMARY KEY,
+    category_id BIGINT,
+    log_channel_id BIGINT,
+    support_role_id BIGINT
+);
@@ -0,0 +1,12 @@
+-- Tickets are claimed per (guild, user) before their channel exists.
+-- channel_id stays NULL while the channel is being created.
+-- Rows from before this migration get guild_id 0 until the Tickets cog
+-- finds the guild that owns their channel.
+
+ALTER TABLE active_tickets ADD COLUMN IF NOT EXISTS guild_id BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE active_tickets ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE active_tickets DROP CONSTRAINT IF EXISTS active_tickets_pkey;
+ALTER TABLE active_tickets ADD PRIMARY KEY (guild_id, user_id);
+
+-- Close/delete paths look tickets up by channel
+CREATE INDEX IF NOT EXISTS active_tickets_channel_idx ON active_tickets (channel_id);
@@ -0,0 +1,20 @@
+-- Transcripts written when a ticket is closed; the file lives under data/transcripts/
+
+CREATE TABLE IF NOT EXISTS ticket_transcripts (
+    id BIGSERIAL PRIMARY KEY,
+    guild_id BIGINT NOT NULL,
+    channel_id BIGINT NOT NULL,
+    channel_name TEXT NOT NULL,
+    owner_id BIGINT,
+    closed_by BIGINT NOT NULL,
+    reason TEXT,
+    message_count INTEGER NOT NULL,
+    first_message_at TIMESTAMPTZ,
+    last_message_at TIMESTAMPTZ,
+    path TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    log_message_id BIGINT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ticket_transcripts_owner_idx ON ticket_transcripts (guild_id, owner_id, created_at DESC);
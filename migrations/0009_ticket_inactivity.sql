@@ -0,0 +1,5 @@
+-- Optional per-guild inactivity timeout for tickets (NULL disables auto-close)
+ALTER TABLE guild_ticket_config ADD COLUMN IF NOT EXISTS inactivity_hours INTEGER;
+
+-- Last message in each ticket, written back lazily by the Tickets cog
+ALTER TABLE active_tickets ADD COLUMN IF NOT EXISTS last_activity TIMESTAMPTZ;
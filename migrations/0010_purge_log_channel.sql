@@ -0,0 +1,2 @@
+-- Channel that receives ?purge archives
+ALTER TABLE guild_config ADD COLUMN IF NOT EXISTS purge_log_channel_id BIGINT;
@@ -0,0 +1,86 @@
+import os
+import re
+import time
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+# Arbitrary key for pg_advisory_xact_lock so two bot processes never apply the same migration
+MIGRATION_LOCK_ID = 0x5351_5254
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+def load_migrations():
+    """Returns [(version, name, sql)] for every migration file, ordered by version."""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, filename), 'r', encoding='utf-8') as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort()
+    return migrations
+
+def run_migrations():
+    """
+    Applies every migration that is not recorded in schema_version, in order,
+    each in its own transaction. When the schema is current this is just two
+    cheap SELECTs. Returns the list of applied (version, name), or None on failure.
+    """
+    import db
+    conn = db.get_connection()
+    if not conn:
+        return None
+
+    applied = []
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        if cur.fetchone()[0]:
+            cur.execute("SELECT version FROM schema_version")
+            done = {row[0] for row in cur.fetchall()}
+        else:
+            cur.execute(SCHEMA_VERSION_TABLE)
+            done = set()
+        conn.commit()
+
+        for version, name, statements in load_migrations():
+            if version in done:
+                continue
+
+            start = time.monotonic()
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            # Another process may have applied it while we waited for the lock
+            cur.execute("SELECT 1 FROM schema_version WHERE version = %s", (version,))
+            if cur.fetchone():
+                conn.commit()
+                continue
+
+            cur.execute(statements)
+            cur.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            applied.append((version, name))
+            print(f"Applied migration {version:04d}_{name} ({(time.monotonic() - start) * 1000:.0f}ms)")
+
+        return applied
+    except Exception as e:
+        conn.rollback()
+        print(f"Error running migrations: {e}")
+        return None
+    finally:
+        conn.close()
+
+def render_sql():
+    """Returns every migration as one SQL script that also records schema_version."""
+    parts = [SCHEMA_VERSION_TABLE]
+    for version, name, statements in load_migrations():
+        parts.append(f"-- Migration {version:04d}_{name}\n{statements.strip()}\n")
+        parts.append(f"INSERT INTO schema_version (version, name) VALUES ({version}, '{name}') ON CONFLICT (version) DO NOTHING;\n")
+    return "\n".join(parts)
@@ -0,0 +1,17 @@
+import io
+import pytest
+from utils.json_stream import JsonStream
+
+DOCUMENT = '{"a": 1.5, "b": [1,2], "c": -12e-3, "d": true, "e": "x y", "f": {"g": null, "h": 100}}'
+
+@pytest.mark.parametrize('chunk_size', range(1, 9))
+def test_values_split_across_chunks(chunk_size):
+    stream = JsonStream(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+    assert dict(stream.items()) == {"a": 1.5, "b": [1, 2], "c": -12e-3, "d": True, "e": "x y", "f": {"g": None, "h": 100}}
+    assert stream.peek() == ''
+
+@pytest.mark.parametrize('chunk_size', range(1, 9))
+def test_number_at_end_of_file(chunk_size):
+    stream = JsonStream(io.StringIO('[10, 2.25]'), chunk_size=chunk_size)
+    assert list(stream.values()) == [10, 2.25]
+    assert JsonStream(io.StringIO('3.75'), chunk_size=chunk_size).read_value() == 3.75
@@ -0,0 +1,42 @@
+import io
+import json
+import pytest
+import db
+from utils.tag_transfer import import_tags
+
+PREFIX = 'test-import-'
+
+@pytest.fixture
+def conn():
+    conn = db.get_connection()
+    if not conn:
+        pytest.skip("PostgreSQL is not available")
+    yield conn
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM tags WHERE name LIKE %s", (PREFIX + '%',))
+    conn.commit()
+    conn.close()
+
+def stored(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT name, content FROM tags WHERE name LIKE %s ORDER BY name", (PREFIX + '%',))
+        return cur.fetchall()
+
+def test_jsonl_import_skips_bad_rows(conn):
+    lines = [
+        json.dumps({'name': PREFIX + 'a', 'content': 'first', 'author_id': 1, 'created_at': '2024-01-01'}),
+        json.dumps({'name': None, 'content': 'no name'}),
+        '',
+        json.dumps({'name': PREFIX + 'b', 'content': 'second', 'author_id': 2, 'created_at': '2024-01-02'}),
+    ]
+    result = import_tags(io.BytesIO("\n".join(lines).encode('utf-8') + b"\n"))
+    assert result is not None
+    assert result['staged'] == 2
+    assert stored(conn) == [(PREFIX + 'a', 'first'), (PREFIX + 'b', 'second')]
+
+def test_csv_import_skips_bad_rows(conn):
+    data = f"name,content,author_id,created_at\n{PREFIX}a,first,1,2024-01-01\n,no name,2,2024-01-02\n"
+    result = import_tags(io.BytesIO(data.encode('utf-8')), fmt='csv')
+    assert result is not None
+    assert result['staged'] == 1
+    assert stored(conn) == [(PREFIX + 'a', 'first')]
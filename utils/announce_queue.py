@@ -0,0 +1,79 @@
+import asyncio
+import discord
+
+BATCH_WINDOW = 2
+MAX_BATCH = 25
+MAX_MESSAGE_LENGTH = 2000
+
+class AnnouncementQueue:
+    """
+    Coalesces announcements per channel so bursts go out as one message.
+
+    post() never awaits: it records the line and, if the channel has no
+    sender running, starts one. The sender waits BATCH_WINDOW seconds, sends
+    everything that arrived as a single message, and repeats until the
+    channel is idle. Sends for one channel are strictly sequential, so
+    while discord.py is waiting on a rate limit bucket new announcements
+    pile up and are merged into the next message instead of queueing
+    separate sends. Repeated keys replace their earlier line, and past
+    MAX_BATCH distinct keys only the count of distinct keys is kept.
+    """
+    def __init__(self, header, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.header = header
+        self.window = window
+        self.max_batch = max_batch
+        # channel_id -> {'lines': {key: text}, 'overflow': {keys past max_batch}}
+        self.pending = {}
+        # channel_id -> sender task
+        self.senders = {}
+
+    def post(self, channel, key, text):
+        batch = self.pending.setdefault(channel.id, {'lines': {}, 'overflow': set()})
+        lines = batch['lines']
+        if key in lines or len(lines) < self.max_batch:
+            lines[key] = text
+        else:
+            batch['overflow'].add(key)
+
+        if channel.id not in self.senders:
+            self.senders[channel.id] = asyncio.create_task(self._send_loop(channel))
+
+    def close(self):
+        # Cancelled senders remove themselves later; iterate over a copy
+        for task in list(self.senders.values()):
+            task.cancel()
+        self.senders.clear()
+        self.pending.clear()
+
+    def render(self, batch):
+        lines = list(batch['lines'].values())
+        if len(lines) == 1 and not batch['overflow']:
+            return lines[0]
+
+        text = self.header
+        shown = 0
+        for line in lines:
+            if len(text) + len(line) + 40 > MAX_MESSAGE_LENGTH:
+                break
+            text += "\n" + line
+            shown += 1
+        hidden = len(lines) - shown + len(batch['overflow'])
+        if hidden:
+            text += f"\n...and {hidden} more"
+        return text
+
+    async def _send_loop(self, channel):
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                batch = self.pending.pop(channel.id, None)
+                if not batch:
+                    return
+                try:
+                    await channel.send(self.render(batch))
+                except discord.HTTPException as e:
+                    print(f"Error sending announcement to {channel.id}: {e}")
+        finally:
+            # close() may already have removed it, and a new sender may have taken its place
+            if self.senders.get(channel.id) is asyncio.current_task():
+                del self.senders[channel.id]
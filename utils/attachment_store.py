@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import aiohttp
+import db
+
+STORE_DIR = os.path.join('data', 'attachments')
+MAX_ATTACHMENT_BYTES = 25 * 1024 * 1024
+MAX_CONCURRENT_DOWNLOADS = 4
+CHUNK_SIZE = 64 * 1024
+
+def get_connection():
+    return db.get_connection()
+
+def blob_path(digest, root=STORE_DIR):
+    # Two-level fan-out keeps directories small
+    return os.path.join(root, digest[:2], digest)
+
+def _blob_from_row(row):
+    return {'sha256': row[0], 'size': row[1], 'filename': row[2], 'content_type': row[3]}
+
+def lookup_source(attachment_id):
+    """Returns the stored blob for a Discord attachment ID, if it was archived before."""
+    conn = get_connection()
+    if not conn:
+        return None
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT b.sha256, b.size, b.filename, b.content_type
+            FROM attachment_sources s JOIN attachment_blobs b ON b.sha256 = s.sha256
+            WHERE s.attachment_id = %s
+        """, (attachment_id,))
+        row = cur.fetchone()
+        return _blob_from_row(row) if row else None
+    except Exception as e:
+        print(f"Error looking up attachment: {e}")
+        return None
+    finally:
+        conn.close()
+
+def record_blob(attachment_id, blob):
+    conn = get_connection()
+    if not conn:
+        return
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO attachment_blobs (sha256, size, filename, content_type)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (sha256) DO NOTHING
+        """, (blob['sha256'], blob['size'], blob['filename'], blob['content_type']))
+        cur.execute("""
+            INSERT INTO attachment_sources (attachment_id, sha256)
+            VALUES (%s, %s)
+            ON CONFLICT (attachment_id) DO NOTHING
+        """, (attachment_id, blob['sha256']))
+        conn.commit()
+    except Exception as e:
+        print(f"Error recording attachment: {e}")
+    finally:
+        conn.close()
+
+def get_blobs(digests):
+    """Returns blob metadata for the given hashes, in the same order, skipping unknown ones."""
+    if not digests:
+        return []
+    conn = get_connection()
+    if not conn:
+        return []
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT sha256, size, filename, content_type FROM attachment_blobs
+            WHERE sha256 = ANY(%s)
+        """, (list(digests),))
+        found = {row[0]: _blob_from_row(row) for row in cur.fetchall()}
+        return [found[digest] for digest in digests if digest in found]
+    except Exception as e:
+        print(f"Error getting attachments: {e}")
+        return []
+    finally:
+        conn.close()
+
+class AttachmentStore:
+    """
+    Content-addressed local copies of Discord attachments.
+
+    Files are streamed to disk while being hashed and stored as
+    data/attachments/<aa>/<sha256>, so identical evidence is kept once.
+    Attachments that were archived before (by Discord attachment ID) are not
+    downloaded again, and at most MAX_CONCURRENT_DOWNLOADS run at a time.
+    """
+    def __init__(self, root=STORE_DIR, max_bytes=MAX_ATTACHMENT_BYTES, concurrency=MAX_CONCURRENT_DOWNLOADS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = None
+        # attachment ID -> download task, so parallel requests for one file share a download
+        self.inflight = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def path(self, digest):
+        return blob_path(digest, self.root)
+
+    async def store(self, attachment):
+        """Archives a discord.Attachment and returns its blob metadata, or None if skipped/failed."""
+        if attachment.size > self.max_bytes:
+            return None
+
+        known = lookup_source(attachment.id)
+        if known and os.path.exists(self.path(known['sha256'])):
+            return known
+
+        task = self.inflight.get(attachment.id)
+        if task is None:
+            task = asyncio.ensure_future(self._download(attachment))
+            self.inflight[attachment.id] = task
+            task.add_done_callback(lambda _: self.inflight.pop(attachment.id, None))
+
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            print(f"Error archiving attachment {attachment.filename}: {e}")
+            return None
+
+    async def _download(self, attachment):
+        async with self.semaphore:
+            if self.session is None or self.session.closed:
+                self.session = aiohttp.ClientSession()
+
+            fd, partial = tempfile.mkstemp(dir=self.root, prefix='.partial-')
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    async with self.session.get(attachment.url) as resp:
+                        resp.raise_for_status()
+                        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                            size += len(chunk)
+                            if size > self.max_bytes:
+                                raise ValueError(f"larger than {self.max_bytes} bytes")
+                            digest.update(chunk)
+                            f.write(chunk)
+
+                sha256 = digest.hexdigest()
+                path = self.path(sha256)
+                if os.path.exists(path):
+                    os.remove(partial)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(partial, path)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+
+        blob = {
+            'sha256': sha256,
+            'size': size,
+            'filename': attachment.filename,
+            'content_type': attachment.content_type
+        }
+        record_blob(attachment.id, blob)
+        return blob
@@ -0,0 +1,54 @@
+import contextlib
+
+HANDOFF_ATTR = 'cog_state_handoff'
+
+@contextlib.contextmanager
+def handoff(bot):
+    """
+    Lets cogs pass in-memory state from the old instance to the new one while
+    extensions are reloaded inside this block:
+
+        with handoff(bot):
+            await bot.reload_extension('commands.tag')
+
+    In cog_unload a cog calls stash_state(); if that returns False (a plain
+    unload or shutdown) it should persist its state as usual. In cog_load it
+    calls take_state() and only warms up from the database when that returns
+    None. State nobody picked up by the end of the block (e.g. the new version
+    failed to load) is passed to its on_abandon callback, so buffered writes
+    are never dropped.
+    """
+    if getattr(bot, HANDOFF_ATTR, None) is not None:
+        # Already inside a handoff (e.g. ?reload all reloading several extensions)
+        yield
+        return
+
+    setattr(bot, HANDOFF_ATTR, {})
+    try:
+        yield
+    finally:
+        leftover = getattr(bot, HANDOFF_ATTR)
+        setattr(bot, HANDOFF_ATTR, None)
+        for name, (state, on_abandon) in leftover.items():
+            if on_abandon is None:
+                continue
+            try:
+                on_abandon(state)
+            except Exception as e:
+                print(f"Error persisting abandoned state of {name}: {e}")
+
+def stash_state(bot, cog, state, on_abandon=None):
+    """Offers state to the cog's next instance. Returns False if no reload is in progress."""
+    pending = getattr(bot, HANDOFF_ATTR, None)
+    if pending is None:
+        return False
+    pending[cog.qualified_name] = (state, on_abandon)
+    return True
+
+def take_state(bot, cog):
+    """Returns the state stashed by the previous instance of this cog, or None."""
+    pending = getattr(bot, HANDOFF_ATTR, None)
+    if not pending:
+        return None
+    entry = pending.pop(cog.qualified_name, None)
+    return entry[0] if entry else None
@@ -0,0 +1,110 @@
+import ast
+import asyncio
+import fnmatch
+import importlib
+import os
+import time
+
+EXTENSION_PACKAGES = ('commands', 'admincommands', 'functions')
+PREWARM_THREADS = 4
+
+def discover_extensions(packages=EXTENSION_PACKAGES):
+    """Returns extension module names (e.g. 'commands.tag') in load order."""
+    names = []
+    for package in packages:
+        if not os.path.isdir(package):
+            continue
+        for filename in sorted(os.listdir(package)):
+            if filename.endswith('.py') and not filename.startswith('_'):
+                names.append(f'{package}.{filename[:-3]}')
+    return names
+
+def parse_patterns(value):
+    """Splits a comma-separated list such as 'functions.welcome, admincommands.*'."""
+    if not value:
+        return []
+    return [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+
+def _matches(name, patterns):
+    short = name.rsplit('.', 1)[-1]
+    return any(fnmatch.fnmatchcase(name, p) or fnmatch.fnmatchcase(short, p) for p in patterns)
+
+def is_enabled(name, allow=(), deny=()):
+    """An extension loads if it matches the allow list (when one is given) and not the deny list."""
+    if allow and not _matches(name, allow):
+        return False
+    return not _matches(name, deny)
+
+def extension_imports(name):
+    """Top-level absolute imports of an extension's source, found without executing it."""
+    path = os.path.join(*name.split('.')) + '.py'
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError):
+        return []
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.append(node.module)
+    return modules
+
+def _prewarm(name):
+    start = time.perf_counter()
+    for module in extension_imports(name):
+        try:
+            importlib.import_module(module)
+        except Exception:
+            # Left for load_extension to report from the main thread
+            pass
+    return time.perf_counter() - start
+
+async def load_extensions(bot, names=None, allow=(), deny=()):
+    """
+    Loads extensions and returns a startup profile.
+
+    discord.py executes each extension module itself, so the modules are not
+    imported twice. What is safe to do concurrently is importing their
+    dependencies (discord, PIL, psycopg2, utils.*): that happens in a small
+    thread pool first, so the slow imports overlap. The extensions are then
+    loaded one by one on the event loop in their usual order, because setup()
+    and add_cog() are not thread safe.
+
+    Returns [{'name', 'import', 'setup', 'error'}] with times in seconds;
+    skipped extensions have 'error' set to 'skipped'.
+    """
+    names = discover_extensions() if names is None else names
+    enabled = [name for name in names if is_enabled(name, allow, deny)]
+    semaphore = asyncio.Semaphore(PREWARM_THREADS)
+
+    async def prewarm(name):
+        async with semaphore:
+            return await asyncio.to_thread(_prewarm, name)
+
+    import_times = await asyncio.gather(*(prewarm(name) for name in enabled))
+
+    report = [{'name': name, 'import': 0.0, 'setup': 0.0, 'error': 'skipped'} for name in names if name not in enabled]
+    for name, import_time in zip(enabled, import_times):
+        entry = {'name': name, 'import': import_time, 'setup': 0.0, 'error': None}
+        start = time.perf_counter()
+        try:
+            await bot.load_extension(name)
+        except Exception as e:
+            entry['error'] = str(e.__cause__ or e)
+            print(f'Failed to load extension {name}: {entry["error"]}')
+        entry['setup'] = time.perf_counter() - start
+        report.append(entry)
+    return report
+
+def format_report(report, wall_time=None):
+    """Renders the startup profile as a table, slowest extension first."""
+    loaded = [entry for entry in report if entry['error'] is None]
+    lines = [f"Loaded {len(loaded)}/{len(report)} extensions" + (f" in {wall_time:.2f}s" if wall_time is not None else "")]
+    lines.append(f"{'extension':<28} {'imports':>9} {'setup':>9}  status")
+    for entry in sorted(report, key=lambda e: e['import'] + e['setup'], reverse=True):
+        status = 'ok' if entry['error'] is None else entry['error']
+        lines.append(f"{entry['name']:<28} {entry['import'] * 1000:>7.0f}ms {entry['setup'] * 1000:>7.0f}ms  {status}")
+    return "\n".join(lines)
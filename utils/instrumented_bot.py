@@ -0,0 +1,96 @@
+import re
+import time
+import aiohttp
+from discord.ext import commands
+from utils import metrics
+
+# Listener timing overrides Client._run_event, the one place discord.py runs every
+# listener. It is private, so requirements.txt keeps discord.py on 2.x and this
+# fails loudly instead of silently recording nothing if it ever goes away.
+if not hasattr(commands.Bot, '_run_event'):
+    raise ImportError("discord.py no longer has Client._run_event; update utils/instrumented_bot.py")
+
+_API_PREFIX = re.compile(r'^/api/v\d+')
+# Webhook and interaction tokens are secrets and would make every request a new label
+_TOKEN = re.compile(r'/(webhooks|interactions)/(\d+)/[^/]+')
+_EMOJI = re.compile(r'/reactions/[^/]+')
+_SNOWFLAKE = re.compile(r'/\d{15,}(?=/|$)')
+
+def route_label(path):
+    """'/api/v10/channels/123.../messages' -> '/channels/{id}/messages', so label values stay few."""
+    path = _API_PREFIX.sub('', path)
+    path = _TOKEN.sub(r'/\1/\2/{token}', path)
+    path = _EMOJI.sub('/reactions/{emoji}', path)
+    return _SNOWFLAKE.sub('/{id}', path)
+
+def http_trace():
+    """An aiohttp TraceConfig recording every Discord API request (not the gateway or CDN)."""
+    trace = aiohttp.TraceConfig()
+
+    def record(context, method, url, status):
+        if not url.path.startswith('/api/'):
+            return
+        route = route_label(url.path)
+        metrics.HTTP_SECONDS.observe(time.perf_counter() - context.start, method, route)
+        metrics.HTTP_REQUESTS.inc(method, route, status)
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        status = params.response.status
+        record(context, params.method, params.url, 'ok' if status < 400 else str(status))
+
+    async def on_request_exception(session, context, params):
+        record(context, params.method, params.url, 'error')
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+class InstrumentedBot(commands.Bot):
+    """
+    commands.Bot that records commands, listeners, gateway events and
+    Discord API calls into utils.metrics.
+    """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('http_trace', http_trace())
+        super().__init__(*args, **kwargs)
+        self.before_invoke(self.start_command_timer)
+        self.after_invoke(self.record_command)
+
+    async def start_command_timer(self, ctx):
+        ctx.metrics_start = time.perf_counter()
+        # Runs in the command's own task, so this stays set for the rest of the command
+        metrics.set_origin(f"{ctx.cog.qualified_name}.{ctx.command.qualified_name}" if ctx.cog else ctx.command.qualified_name)
+
+    async def record_command(self, ctx):
+        # after_invoke also runs when the command raised
+        name = ctx.command.qualified_name
+        metrics.COMMAND_SECONDS.observe(time.perf_counter() - getattr(ctx, 'metrics_start', time.perf_counter()), name)
+        metrics.COMMANDS.inc(name, 'error' if ctx.command_failed else 'ok')
+
+    async def on_socket_event_type(self, event_type):
+        metrics.GATEWAY_EVENTS.inc(event_type)
+
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        # Every listener (bot.event, cog listeners, add_listener) runs through here, and
+        # exceptions are swallowed into on_error, so the coroutine itself is wrapped
+        if event_name == 'on_socket_event_type':
+            # Fires for every gateway event; already counted, not worth timing
+            return await super()._run_event(coro, event_name, *args, **kwargs)
+        listener = getattr(coro, '__qualname__', event_name)
+
+        async def timed(*args, **kwargs):
+            metrics.set_origin(listener)
+            start = time.perf_counter()
+            status = 'error'
+            try:
+                await coro(*args, **kwargs)
+                status = 'ok'
+            finally:
+                metrics.EVENT_SECONDS.observe(time.perf_counter() - start, listener)
+                metrics.EVENTS.inc(listener, status)
+
+        await super()._run_event(timed, event_name, *args, **kwargs)
@@ -0,0 +1,117 @@
+import json
+
+WHITESPACE = ' \t\r\n'
+NUMBER_CHARS = '0123456789+-.eE'
+
+class JsonStream:
+    """
+    Incremental JSON reader for files too large for json.load.
+
+    Objects and arrays can be walked one member at a time with iter_object()
+    and iter_array(); everything else is decoded with read_value(). Only the
+    member currently being decoded is held in memory.
+    """
+    def __init__(self, fp, chunk_size=1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'EOF'!r}")
+        self.pos += 1
+
+    def read_value(self):
+        """Decodes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # The value is probably cut off by the chunk boundary
+                if self._fill():
+                    continue
+                raise
+            # A number cut off by the chunk boundary decodes early ("1." as 1),
+            # so refill while only number characters follow it
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and not self.buf[end:].strip(NUMBER_CHARS) and self._fill()):
+                continue
+            self.pos = end
+            return value
+
+    def iter_object(self):
+        """
+        Yields the keys of the next JSON object. The caller must consume each
+        value (read_value, iter_object or iter_array) before asking for the next key.
+        """
+        self._expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key but found {key!r}")
+            self._expect(':')
+            yield key
+            if self._end_member('}') == '}':
+                return
+
+    def iter_array(self):
+        """
+        Yields the index of each element of the next JSON array. The caller must
+        consume each element before asking for the next one.
+        """
+        self._expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._end_member(']') == ']':
+                return
+
+    def _end_member(self, closer):
+        found = self.peek()
+        if found not in (',', closer):
+            raise ValueError(f"Expected ',' or {closer!r} but found {found or 'EOF'!r}")
+        self.pos += 1
+        return found
+
+    def items(self):
+        """Yields (key, value) pairs of the next JSON object."""
+        for key in self.iter_object():
+            yield key, self.read_value()
+
+    def values(self):
+        """Yields the elements of the next JSON array."""
+        for _ in self.iter_array():
+            yield self.read_value()
@@ -0,0 +1,40 @@
+import importlib
+import sys
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+    def __init__(self, name):
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_lazy_name'])
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module {self.__dict__['_lazy_name']!r} ({state})>"
+
+def lazy_import(name):
+    """
+    Returns the module if it is already imported, otherwise a LazyModule that
+    imports it the first time one of its attributes is used. Use it for heavy
+    dependencies that only some code paths need, e.g.
+        Image = lazy_import('PIL.Image')
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
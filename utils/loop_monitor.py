@@ -0,0 +1,139 @@
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+from utils import metrics
+
+# A heartbeat this much later than scheduled counts as the loop being blocked
+BLOCK_THRESHOLD = float(os.getenv('LOOP_BLOCK_MS', '100')) / 1000
+# Seconds of lag history kept for the percentiles
+LAG_WINDOW = 600
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOOP_LAG = metrics.Histogram(
+    'bot_event_loop_lag_seconds', "How late the event loop heartbeat ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+LOOP_BLOCKS = metrics.Counter('bot_event_loop_blocks_total', "Times the event loop was blocked past the threshold.", ('origin',))
+LOOP_BLOCKED_SECONDS = metrics.Counter('bot_event_loop_blocked_seconds_total', "Time the event loop spent blocked.", ('origin',))
+
+class LoopMonitor:
+    """
+    Measures event loop lag and catches whatever is blocking it.
+
+    A heartbeat coroutine sleeps half the threshold and records how late it
+    woke up, so any block of 1.5x the threshold or more delays a heartbeat
+    past it. A watchdog thread checks the heartbeat; once it is overdue by
+    the threshold, the loop thread is stuck in synchronous code, so the
+    watchdog grabs that thread's stack and the running task right then,
+    while the offender is still on it. When the heartbeat finally runs, the
+    incident gets its real duration and is attributed to the command or
+    listener the task was running (see metrics.set_origin), or failing
+    that to the innermost project frame.
+    """
+    def __init__(self, threshold=BLOCK_THRESHOLD):
+        self.threshold = threshold
+        self.interval = threshold / 2
+        self.samples = collections.deque(maxlen=int(LAG_WINDOW / self.interval))
+        self.incidents = collections.deque(maxlen=50)
+        # origin -> [count, total seconds, longest seconds]
+        self.by_origin = {}
+        self.current = None
+        self.last_beat = None
+        self.loop = None
+        self.loop_thread = None
+        self.task = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Starts monitoring the running loop. Call from inside it."""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stopped.clear()
+        self.task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name='loop-watchdog', daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.task:
+            self.task.cancel()
+
+    def reset(self):
+        self.samples.clear()
+        self.incidents.clear()
+        self.by_origin.clear()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.last_beat = now
+            self.samples.append(lag)
+            LOOP_LAG.observe(lag)
+
+            incident, self.current = self.current, None
+            if incident:
+                self._finish(incident, lag)
+
+    def _finish(self, incident, duration):
+        incident['duration'] = duration
+        origin = incident['origin']
+        self.incidents.append(incident)
+        entry = self.by_origin.setdefault(origin, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += duration
+        entry[2] = max(entry[2], duration)
+        LOOP_BLOCKS.inc(origin)
+        LOOP_BLOCKED_SECONDS.inc(origin, amount=duration)
+        print(f"Event loop blocked for {duration * 1000:.0f}ms by {origin} at {incident['location']}")
+
+    def _watch(self):
+        while not self.stopped.wait(self.threshold / 2):
+            if self.current is not None:
+                continue
+            overdue = time.monotonic() - self.last_beat - self.interval
+            if overdue < self.threshold:
+                continue
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            try:
+                self.current = self._capture(frame)
+            except Exception as e:
+                print(f"Loop watchdog failed to capture a stack: {e}")
+            finally:
+                del frame
+
+    def _capture(self, frame):
+        # Reading the loop's current task from this thread is fine: it is one dict lookup
+        task = asyncio.current_task(self.loop)
+        origin = metrics.task_origin(task) if task is not None else None
+
+        location = None
+        walk = frame
+        while walk is not None:
+            filename = os.path.abspath(walk.f_code.co_filename)
+            if filename.startswith(PROJECT_ROOT + os.sep) and 'site-packages' not in filename:
+                location = f"{walk.f_globals.get('__name__', filename)}:{walk.f_code.co_name}:{walk.f_lineno}"
+                break
+            walk = walk.f_back
+
+        return {
+            'at': time.time(),
+            'origin': origin or (location.rsplit(':', 1)[0] if location else 'unknown'),
+            'location': location or 'outside project code',
+            'task': task.get_name() if task is not None else None,
+            'stack': traceback.format_stack(frame),
+        }
+
+    def percentile(self, fraction):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[int(fraction * (len(ordered) - 1))]
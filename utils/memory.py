@@ -0,0 +1,186 @@
+import collections
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from utils import metrics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Objects visited per container when estimating its size
+SIZE_VISIT_LIMIT = 100000
+CONTAINERS = (dict, list, set, frozenset, collections.deque)
+
+def rss_bytes():
+    """Resident set size of this process, or None where /proc is not available."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+PROCESS_RSS = metrics.Gauge('bot_process_resident_bytes', "Resident memory of the bot process.", function=lambda: rss_bytes() or 0)
+
+def approx_size(obj, limit=SIZE_VISIT_LIMIT):
+    """
+    sys.getsizeof of a container and everything reachable through nested
+    containers, strings and numbers. Other objects count only their own
+    size, so this measures what a cache holds rather than the whole graph
+    behind e.g. a discord.Member. Stops after `limit` objects.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < limit:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, collections.deque)):
+            stack.extend(item)
+    return total
+
+def type_name(cls):
+    module = getattr(cls, '__module__', 'builtins')
+    return cls.__qualname__ if module == 'builtins' else f"{module}.{cls.__qualname__}"
+
+def count_types():
+    """Counts live objects tracked by the garbage collector, by type."""
+    counts = collections.Counter()
+    for obj in gc.get_objects():
+        counts[type(obj)] += 1
+    return counts
+
+def _is_project_module(module):
+    path = getattr(module, '__file__', None)
+    return bool(path) and os.path.abspath(path).startswith(PROJECT_ROOT + os.sep) and 'site-packages' not in path
+
+def bot_caches(bot):
+    """Returns [(name, entries, approx bytes or None)] for discord.py's caches, cog attributes and module-level containers."""
+    guilds = bot.guilds
+    rows = [
+        ('discord: guilds', len(guilds), None),
+        ('discord: members', sum(len(guild.members) for guild in guilds), None),
+        ('discord: users', len(bot.users), None),
+        ('discord: channels', sum(len(guild.channels) for guild in guilds), None),
+        ('discord: roles', sum(len(guild.roles) for guild in guilds), None),
+        ('discord: messages', len(bot.cached_messages), None),
+        ('discord: persistent views', len(bot.persistent_views), None),
+    ]
+
+    for cog_name, cog in bot.cogs.items():
+        for attr, value in vars(cog).items():
+            if isinstance(value, CONTAINERS):
+                rows.append((f"{cog_name}.{attr}", len(value), approx_size(value)))
+
+    for module_name, module in list(sys.modules.items()):
+        if not _is_project_module(module):
+            continue
+        for attr, value in list(vars(module).items()):
+            if isinstance(value, CONTAINERS) and not attr.startswith('__') and value:
+                rows.append((f"{module_name}.{attr}", len(value), approx_size(value)))
+    return rows
+
+class MemoryTracker:
+    """
+    Takes memory snapshots and compares each one with the previous one.
+
+    A snapshot always has the RSS and live object counts per type;
+    tracemalloc allocation sites are added while tracing is on. Tracing is
+    off by default because it slows every allocation down, so start() it,
+    let the bot run, and take snapshots some time apart to see what grows.
+    """
+    def __init__(self):
+        self.baseline = None
+        self.previous = None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = self.previous = self.snapshot()
+
+    def stop(self):
+        tracemalloc.stop()
+        self.baseline = self.previous = None
+
+    def snapshot(self):
+        trace = None
+        if tracemalloc.is_tracing():
+            trace = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+                tracemalloc.Filter(False, '<unknown>'),
+            ))
+        return {'at': time.time(), 'rss': rss_bytes(), 'types': count_types(), 'trace': trace}
+
+    def compare(self, limit=15, against='previous'):
+        """Takes a new snapshot and returns a text report of what changed since the previous (or baseline) one."""
+        current = self.snapshot()
+        old = self.baseline if against == 'baseline' else self.previous
+        self.previous = current
+        if self.baseline is None:
+            self.baseline = current
+
+        lines = []
+        rss = current['rss']
+        if rss is not None:
+            growth = f" ({(rss - old['rss']) / 2**20:+.1f} MB)" if old and old['rss'] is not None else ""
+            lines.append(f"RSS {rss / 2**20:.1f} MB{growth}")
+        if old:
+            lines.append(f"Compared with the {against} snapshot from {time.time() - old['at']:.0f}s ago")
+
+        if current['trace'] is not None:
+            traced, peak = tracemalloc.get_traced_memory()
+            lines.append(f"\nTraced {traced / 2**20:.1f} MB (peak {peak / 2**20:.1f} MB); allocation sites by growth:")
+            if old and old['trace'] is not None:
+                stats = current['trace'].compare_to(old['trace'], 'lineno')
+                for stat in stats[:limit]:
+                    frame = stat.traceback[0]
+                    lines.append(f"{stat.size_diff / 1024:>+9.1f} KB {stat.count_diff:>+7} blocks  {self.short_path(frame.filename)}:{frame.lineno}")
+            else:
+                for stat in current['trace'].statistics('lineno')[:limit]:
+                    frame = stat.traceback[0]
+                    lines.append(f"{stat.size / 1024:>9.1f} KB {stat.count:>7} blocks  {self.short_path(frame.filename)}:{frame.lineno}")
+        else:
+            lines.append("\nAllocation tracing is off (`?memory start` turns it on).")
+
+        # Views that are never stopped (or persistent ones added twice) stay in discord.py's view store
+        view_class = getattr(sys.modules.get('discord.ui'), 'View', None)
+        if view_class is not None:
+            views = {cls: count for cls, count in current['types'].items() if isinstance(cls, type) and issubclass(cls, view_class)}
+            if views:
+                detail = ", ".join(f"{cls.__name__} {count}" for cls, count in sorted(views.items(), key=lambda item: -item[1]))
+                lines.append(f"\nLive views: {sum(views.values())} ({detail})")
+
+        lines.append("\nLive objects by type" + (" (change)" if old else "") + ":")
+        if old:
+            changes = current['types'].copy()
+            changes.subtract(old['types'])
+            ranked = sorted(changes.items(), key=lambda item: abs(item[1]), reverse=True)
+            for cls, change in ranked[:limit]:
+                if change:
+                    lines.append(f"{change:>+9} {current['types'][cls]:>9}  {type_name(cls)}")
+        else:
+            for cls, count in current['types'].most_common(limit):
+                lines.append(f"{count:>9}  {type_name(cls)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def short_path(filename):
+        if 'site-packages' in filename:
+            return filename.split('site-packages' + os.sep, 1)[1]
+        if filename.startswith(PROJECT_ROOT + os.sep):
+            return os.path.relpath(filename, PROJECT_ROOT)
+        return filename
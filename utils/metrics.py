@@ -0,0 +1,170 @@
+import asyncio
+import bisect
+import contextvars
+import threading
+import weakref
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# What the current task is running for ('Cog.command' or a listener's qualified name),
+# so lower layers such as db can attribute their work; None outside commands and listeners
+current_origin = contextvars.ContextVar('current_origin', default=None)
+# task -> origin, for readers outside the task (a task's context is not public before 3.12)
+_task_origins = weakref.WeakKeyDictionary()
+
+def set_origin(origin):
+    current_origin.set(origin)
+    task = asyncio.current_task()
+    if task is not None:
+        _task_origins[task] = origin
+
+def task_origin(task):
+    try:
+        return _task_origins.get(task)
+    except RuntimeError:
+        # Changed size while read from another thread
+        return None
+
+# Every metric created below, in the order it is rendered
+REGISTRY = []
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+class Counter:
+    """A monotonically increasing value per label combination."""
+    kind = 'counter'
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        # label values tuple -> value; db records from worker threads, so changes hold the lock
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labels, labels)} {value}"
+
+class Gauge(Counter):
+    """A value that can go up and down. If `function` is given it is read at scrape time."""
+    kind = 'gauge'
+
+    def __init__(self, name, description, labels=(), function=None):
+        super().__init__(name, description, labels)
+        self.function = function
+
+    def set(self, value, *labels):
+        with self.lock:
+            self.values[labels] = value
+
+    def samples(self):
+        if self.function:
+            try:
+                values = {(): self.function()} if not self.labels else dict(self.function())
+                with self.lock:
+                    self.values = values
+            except Exception as e:
+                print(f"Error reading gauge {self.name}: {e}")
+        yield from super().samples()
+
+class Histogram:
+    """
+    Observations counted into fixed buckets. Buckets are stored
+    non-cumulatively so an observation is one bisect and two additions;
+    they are summed up only when rendered.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label values tuple -> [count per bucket..., count above the last bucket]
+        self.counts = {}
+        self.sums = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.counts.get(labels)
+            if counts is None:
+                counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+                self.sums[labels] = 0.0
+            counts[bucket] += 1
+            self.sums[labels] += value
+
+    def samples(self):
+        with self.lock:
+            items = sorted((labels, list(counts), self.sums[labels]) for labels, counts in self.counts.items())
+        for labels, counts, observed in items:
+            total = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                total += count
+                yield f"{self.name}_bucket{_format_labels(self.labels + ('le',), labels + (bound,))} {total}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {observed}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {total}"
+
+def render():
+    """Returns every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+COMMANDS = Counter('bot_commands_total', "Commands invoked.", ('command', 'status'))
+COMMAND_SECONDS = Histogram('bot_command_duration_seconds', "Command run time.", ('command',))
+EVENTS = Counter('bot_listener_calls_total', "Event listener calls.", ('listener', 'status'))
+EVENT_SECONDS = Histogram('bot_listener_duration_seconds', "Event listener run time.", ('listener',))
+GATEWAY_EVENTS = Counter('bot_gateway_events_total', "Gateway events received.", ('event',))
+HTTP_REQUESTS = Counter('bot_http_requests_total', "Discord API requests.", ('method', 'route', 'status'))
+HTTP_SECONDS = Histogram('bot_http_request_duration_seconds', "Discord API request time; each rate limit retry is its own request.", ('method', 'route'))
+DB_CONNECTIONS = Counter('bot_db_connections_total', "Database connections opened.", ('status',))
+DB_CONNECT_SECONDS = Histogram('bot_db_connect_duration_seconds', "Time to open a database connection.")
+DB_QUERIES = Counter('bot_db_queries_total', "Database statements executed.", ('operation', 'status'))
+DB_QUERY_SECONDS = Histogram('bot_db_query_duration_seconds', "Database statement time.", ('operation',))
+
+async def start_server(host, port):
+    """
+    Serves render() on http://host:port/metrics. A bare asyncio server is
+    enough for a scraper hitting it every few seconds and adds no dependency.
+    """
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=5)
+            parts = request.split(b' ', 2)
+            path = parts[1].split(b'?')[0] if len(parts) > 1 else b''
+            if path in (b'/', b'/metrics'):
+                status, body = '200 OK', render().encode()
+            else:
+                status, body = '404 Not Found', b'Not found\n'
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,137 @@
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+from utils import metrics
+
+DEFAULT_INTERVAL = 0.005
+MAX_SECONDS = 300
+# Sampling never takes more than this share of the time it covers
+MAX_OVERHEAD = 0.02
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def frame_label(code):
+    filename = code.co_filename
+    if 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    elif filename.startswith(PROJECT_ROOT + os.sep):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Samples the event loop thread's stack from a background thread.
+
+    Nothing is installed on the loop itself, so profiled code runs at full
+    speed; the cost is the time the sampler holds the GIL, and the interval
+    is stretched whenever that would exceed MAX_OVERHEAD. Samples taken
+    while the loop waits in select() are counted as idle. With `cog`, only
+    samples whose stack runs through the cog's module or whose task serves
+    one of its commands/listeners are kept. Stops by itself after `seconds`.
+    Create it from the event loop thread.
+    """
+    def __init__(self, loop, seconds, cog=None, interval=DEFAULT_INTERVAL):
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.seconds = min(seconds, MAX_SECONDS)
+        self.interval = interval
+        self.cog_name = cog.qualified_name if cog else None
+        module = sys.modules.get(cog.__module__) if cog else None
+        self.cog_file = os.path.abspath(module.__file__) if module and getattr(module, '__file__', None) else None
+
+        # stack of code objects, outermost first -> samples
+        self.stacks = collections.Counter()
+        self.total = 0
+        self.idle = 0
+        self.filtered = 0
+        self.overhead = 0.0
+        self.started = None
+        self.ended = None
+        self.stopped = threading.Event()
+        self.done = threading.Event()
+
+    def start(self):
+        self.started = time.perf_counter()
+        threading.Thread(target=self._run, name='profiler', daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    async def wait(self):
+        await asyncio.to_thread(self.done.wait)
+
+    def _run(self):
+        deadline = self.started + self.seconds
+        try:
+            while not self.stopped.wait(self.interval) and time.perf_counter() < deadline:
+                start = time.perf_counter()
+                self._sample()
+                cost = time.perf_counter() - start
+                self.overhead += cost
+                self.interval = max(self.interval, cost / MAX_OVERHEAD)
+        finally:
+            self.ended = time.perf_counter()
+            self.done.set()
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.loop_thread)
+        if frame is None:
+            return
+        self.total += 1
+        if frame.f_code.co_filename.endswith('selectors.py'):
+            self.idle += 1
+            return
+
+        stack = []
+        in_cog = False
+        while frame is not None:
+            stack.append(frame.f_code)
+            if self.cog_file and frame.f_code.co_filename == self.cog_file:
+                in_cog = True
+            frame = frame.f_back
+
+        if self.cog_name and not in_cog:
+            task = asyncio.current_task(self.loop)
+            origin = metrics.task_origin(task) if task is not None else None
+            if not origin or not origin.startswith(self.cog_name + '.'):
+                self.filtered += 1
+                return
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+
+    def hottest(self, limit=20):
+        """Returns [(label, self samples, total samples)] ordered by self samples."""
+        own = collections.Counter()
+        cumulative = collections.Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for code in set(stack):
+                cumulative[code] += count
+        return [(frame_label(code), count, cumulative[code]) for code, count in own.most_common(limit)]
+
+    def report(self, limit=20):
+        elapsed = (self.ended or time.perf_counter()) - self.started
+        busy = sum(self.stacks.values())
+        lines = [
+            f"{self.total} samples over {elapsed:.1f}s ({self.overhead / max(elapsed, 1e-9) * 100:.2f}% overhead)"
+            + (f", filtered to {self.cog_name}" if self.cog_name else ""),
+            f"idle {self.idle} | busy {busy}" + (f" | other code {self.filtered}" if self.cog_name else ""),
+        ]
+        if not busy:
+            lines.append("No busy samples: the loop was idle.")
+            return "\n".join(lines)
+        lines.append(f"{'self':>6} {'total':>6}  function")
+        for label, own, cumulative in self.hottest(limit):
+            lines.append(f"{own / busy * 100:>5.1f}% {cumulative / busy * 100:>5.1f}%  {label}")
+        return "\n".join(lines)
+
+    def collapsed(self):
+        """Stacks in the folded format read by flamegraph.pl, speedscope and similar tools."""
+        return "\n".join(
+            ";".join(frame_label(code) for code in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        ) + "\n"
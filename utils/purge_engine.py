@@ -0,0 +1,171 @@
+import asyncio
+import datetime
+import gzip
+import json
+import os
+import time
+import discord
+from utils.transcript import message_record
+
+ARCHIVE_DIR = os.path.join('data', 'purge_archives')
+
+# Discord only bulk-deletes messages younger than 14 days; keep a margin for long runs
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=10)
+BULK_DELETE_SIZE = 100
+OLD_QUEUE_SIZE = 500
+PROGRESS_INTERVAL = 3
+
+def build_check(author=None, bots=False, attachments=False, contains=None, pattern=None):
+    """Combines the purge filters into one predicate. Returns None if no filter is set."""
+    checks = []
+    if author is not None:
+        checks.append(lambda m: m.author.id == author.id)
+    if bots:
+        checks.append(lambda m: m.author.bot)
+    if attachments:
+        checks.append(lambda m: bool(m.attachments))
+    if contains:
+        needle = contains.lower()
+        checks.append(lambda m: needle in m.content.lower())
+    if pattern is not None:
+        checks.append(lambda m: pattern.search(m.content) is not None)
+
+    if not checks:
+        return None
+    return lambda m: all(check(m) for check in checks)
+
+class PurgeJob:
+    """
+    Deletes matching messages from a channel while streaming its history.
+
+    Messages young enough for bulk delete are sent in batches of 100. Older
+    ones are handed to a single worker that deletes them one at a time, so
+    the per-message rate limit only slows that worker down while the scan
+    and bulk deletes continue. `limit` counts matching messages, not scanned ones.
+    """
+    def __init__(self, channel, check=None, limit=None, before=None, after=None, on_progress=None, reason=None, archive=None):
+        self.channel = channel
+        self.check = check
+        self.limit = limit
+        self.before = before
+        self.after = after
+        self.on_progress = on_progress
+        self.reason = reason
+        self.archive = archive
+
+        self.scanned = 0
+        self.matched = 0
+        self.deleted = 0
+        self.failed = 0
+        self.done = False
+        self._last_progress = 0
+
+    async def run(self):
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        old_messages = asyncio.Queue(maxsize=OLD_QUEUE_SIZE)
+        worker = asyncio.create_task(self._delete_old(old_messages))
+        batch = []
+
+        try:
+            async for message in self.channel.history(limit=None, before=self.before, after=self.after):
+                self.scanned += 1
+                if self.check is None or self.check(message):
+                    self.matched += 1
+                    if self.archive:
+                        self.archive.write(message)
+                    if message.created_at < cutoff:
+                        # Blocks when the worker falls behind, so memory stays bounded
+                        await old_messages.put(message)
+                    else:
+                        batch.append(message)
+                        if len(batch) == BULK_DELETE_SIZE:
+                            await self._delete_batch(batch)
+                            batch = []
+                    if self.limit is not None and self.matched >= self.limit:
+                        break
+                await self._report()
+
+            if batch:
+                await self._delete_batch(batch)
+            await old_messages.put(None)
+            await worker
+        except BaseException:
+            worker.cancel()
+            raise
+        finally:
+            self.done = True
+
+        await self._report(force=True)
+        return self
+
+    async def _delete_batch(self, batch):
+        try:
+            await self.channel.delete_messages(batch, reason=self.reason)
+            self.deleted += len(batch)
+        except discord.NotFound:
+            # Somebody else deleted one of them; fall back to deleting individually
+            for message in batch:
+                await self._delete_one(message)
+        except discord.HTTPException as e:
+            print(f"Bulk delete failed: {e}")
+            self.failed += len(batch)
+
+    async def _delete_one(self, message):
+        try:
+            await message.delete()
+            self.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            print(f"Delete failed: {e}")
+            self.failed += 1
+
+    async def _delete_old(self, queue):
+        # discord.py waits out the route's rate limit bucket before each request
+        while True:
+            message = await queue.get()
+            if message is None:
+                return
+            await self._delete_one(message)
+            await self._report()
+
+    async def _report(self, force=False):
+        if not self.on_progress:
+            return
+        now = time.monotonic()
+        if force or now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            try:
+                await self.on_progress(self)
+            except discord.HTTPException:
+                pass
+
+class PurgeArchive:
+    """
+    Gzip-compressed JSONL record of purged messages, written one line per
+    message as the purge streams through them, so memory use stays flat.
+    """
+    def __init__(self, channel, path=None):
+        if path is None:
+            stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+            directory = os.path.join(ARCHIVE_DIR, str(channel.guild.id))
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{channel.id}-{stamp}.jsonl.gz")
+        self.path = path
+        self.count = 0
+        self.f = gzip.open(path, 'wt', encoding='utf-8')
+
+    def write(self, message):
+        self.f.write(json.dumps(message_record(message), ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        self.f.close()
+        return os.path.getsize(self.path)
+
+async def clone_and_delete(channel, reason=None):
+    """Replaces a channel with an empty copy in the same position. Returns the new channel."""
+    new_channel = await channel.clone(reason=reason, category=channel.category)
+    await new_channel.edit(position=channel.position)
+    await channel.delete(reason=reason)
+    return new_channel
@@ -0,0 +1,150 @@
+import collections
+import os
+import re
+import sys
+import threading
+import time
+from utils import metrics
+
+# Statements at or above this many milliseconds are printed and kept in SLOW_QUERIES
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+# Durations kept per statement for the rolling percentiles
+SAMPLES_PER_STATEMENT = 500
+MAX_STATEMENTS = 500
+NORMALIZE_CACHE_SIZE = 1000
+
+_WHITESPACE = re.compile(r'\s+')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|%\(\w+\)s")
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_REPEATED_LISTS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+_normalized = {}
+
+class StatementStats:
+    __slots__ = ('calls', 'errors', 'total', 'rows', 'slowest', 'samples', 'origins')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.rows = 0
+        self.slowest = 0.0
+        self.samples = collections.deque(maxlen=SAMPLES_PER_STATEMENT)
+        # origin -> calls
+        self.origins = collections.Counter()
+
+    def percentile(self, fraction):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[int(fraction * (len(ordered) - 1))]
+
+# normalized statement -> StatementStats; queries also run in worker threads (asyncio.to_thread),
+# so anything that adds to or iterates over it holds _lock
+STATEMENTS = {}
+_lock = threading.Lock()
+# (unix time, milliseconds, rows, origin, statement) of recent slow statements
+SLOW_QUERIES = collections.deque(maxlen=50)
+
+def normalize(query):
+    """
+    Reduces a statement to its shape so calls that differ only in values
+    share one entry: literals and placeholders become ?, and value lists
+    (execute_values, IN (...)) collapse to (...).
+    """
+    cached = _normalized.get(query)
+    if cached is not None:
+        return cached
+
+    text = _WHITESPACE.sub(' ', query).strip()
+    text = _LITERALS.sub('?', text)
+    text = _PLACEHOLDER_LIST.sub('(...)', text)
+    text = _REPEATED_LISTS.sub('(...)', text)
+
+    # Templates repeat, statements with inlined values (execute_values) do not
+    if len(query) < 2000:
+        if len(_normalized) >= NORMALIZE_CACHE_SIZE:
+            _normalized.clear()
+        _normalized[query] = text
+    return text
+
+def caller():
+    """The first frame outside the database layer, as 'module:function'."""
+    frame = sys._getframe(1)
+    while frame:
+        module = frame.f_globals.get('__name__', '')
+        if module not in (__name__, 'db') and not module.startswith('psycopg2'):
+            return f"{module}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+def record(query, seconds, rows, cursor=None, failed=False):
+    """Called by db's cursor after every execute(), executemany() and copy_expert()."""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    elif not isinstance(query, str):
+        # psycopg2.sql.Composed
+        try:
+            query = query.as_string(cursor)
+        except Exception:
+            query = str(query)
+
+    statement = normalize(query)
+    origin = metrics.current_origin.get()
+    milliseconds = seconds * 1000
+    if origin is None and milliseconds >= SLOW_QUERY_MS:
+        # Only walk the stack when it is worth reporting
+        origin = caller()
+
+    rows = max(rows, 0)
+    with _lock:
+        stats = STATEMENTS.get(statement)
+        if stats is None:
+            if len(STATEMENTS) >= MAX_STATEMENTS:
+                # Drop the statement that costs the least so far
+                del STATEMENTS[min(STATEMENTS, key=lambda s: STATEMENTS[s].total)]
+            stats = STATEMENTS[statement] = StatementStats()
+        stats.calls += 1
+        stats.total += seconds
+        stats.rows += rows
+        stats.slowest = max(stats.slowest, seconds)
+        stats.samples.append(seconds)
+        stats.origins[origin or 'background'] += 1
+        if failed:
+            stats.errors += 1
+
+    operation = statement.split(' ', 1)[0].upper() or 'OTHER'
+    metrics.DB_QUERY_SECONDS.observe(seconds, operation)
+    metrics.DB_QUERIES.inc(operation, 'error' if failed else 'ok')
+
+    if milliseconds >= SLOW_QUERY_MS:
+        SLOW_QUERIES.append((time.time(), milliseconds, rows, origin, statement))
+        print(f"Slow query ({milliseconds:.0f}ms, {rows} rows) from {origin}: {statement[:300]}")
+
+SORT_KEYS = {
+    'total': lambda s: s.total,
+    'calls': lambda s: s.calls,
+    'rows': lambda s: s.rows,
+    'p99': lambda s: s.percentile(0.99),
+    'max': lambda s: s.slowest,
+}
+
+def top(limit=10, sort='total'):
+    """Returns [(statement, StatementStats)] ordered by the given SORT_KEYS key."""
+    key = SORT_KEYS[sort]
+    with _lock:
+        return sorted(STATEMENTS.items(), key=lambda item: key(item[1]), reverse=True)[:limit]
+
+def summary():
+    """Returns (statements, calls, total seconds) across everything recorded."""
+    with _lock:
+        return (
+            len(STATEMENTS),
+            sum(stats.calls for stats in STATEMENTS.values()),
+            sum(stats.total for stats in STATEMENTS.values())
+        )
+
+def reset():
+    with _lock:
+        STATEMENTS.clear()
+    SLOW_QUERIES.clear()
@@ -0,0 +1,166 @@
+import ast
+import graphlib
+import hashlib
+import importlib
+import os
+import sys
+import time
+from utils.extension_loader import EXTENSION_PACKAGES, discover_extensions, is_enabled
+
+class ReloadPlanner:
+    """
+    Works out which project modules changed on disk since they were last
+    loaded and reloads only those plus the modules that import them.
+
+    Each file is fingerprinted by (mtime, size, sha256); the hash is only
+    recomputed when mtime or size moved, so a scan is one stat() per file.
+    Dependency edges come from the import statements in each module's
+    source, and affected modules are reloaded dependencies first, so a
+    dependent always picks up the new version of what it imports.
+    """
+    def __init__(self, root='.', packages=EXTENSION_PACKAGES):
+        self.root = os.path.abspath(root)
+        self.packages = packages
+        # module name -> (mtime_ns, size, sha256) as of the last successful load
+        self.state = {}
+        # file -> (sha256, imported names), so unchanged files are not parsed again
+        self.imports = {}
+        for name, path in self.local_modules().items():
+            fingerprint = self.fingerprint(name, path)
+            if fingerprint:
+                self.state[name] = fingerprint
+
+    def local_modules(self):
+        """Returns {module name: file} for imported project modules and every extension file."""
+        modules = {}
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, '__file__', None)
+            if name == '__main__' or not path or not path.endswith('.py'):
+                continue
+            path = os.path.abspath(path)
+            if path.startswith(self.root + os.sep) and 'site-packages' not in path:
+                modules[name] = path
+        for name in discover_extensions(self.packages):
+            modules.setdefault(name, os.path.join(self.root, *name.split('.')) + '.py')
+        return modules
+
+    def fingerprint(self, name, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        previous = self.state.get(name)
+        if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+            return previous
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return (stat.st_mtime_ns, stat.st_size, digest)
+
+    def dependencies(self, path, known, fingerprint=None):
+        """Project modules imported anywhere in a file (including inside functions)."""
+        cached = self.imports.get(path)
+        if cached and fingerprint and cached[0] == fingerprint[2]:
+            return cached[1] & known.keys()
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError):
+            return set()
+
+        found = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                found.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                found.add(node.module)
+                found.update(f"{node.module}.{alias.name}" for alias in node.names)
+        if fingerprint:
+            self.imports[path] = (fingerprint[2], found)
+        return found & known.keys()
+
+    def plan(self, force=False, missing=()):
+        """
+        Returns (order, changed, removed): modules to reload in dependency
+        order, the ones whose files changed, and tracked files that are gone.
+        `missing` are extensions that should be loaded but are not (e.g. they
+        failed at startup); they are planned even if their files are unchanged.
+        """
+        modules = self.local_modules()
+        changed = set()
+        fingerprints = {}
+        removed = {name for name in self.state if name not in modules or not os.path.exists(modules[name])}
+        for name, path in modules.items():
+            if name in removed:
+                continue
+            fingerprints[name] = self.fingerprint(name, path)
+            if force or name in missing or fingerprints[name] != self.state.get(name):
+                changed.add(name)
+
+        graph = {
+            name: self.dependencies(path, modules, fingerprints[name]) - {name}
+            for name, path in modules.items() if name not in removed
+        }
+        dependents = {}
+        for name, deps in graph.items():
+            for dep in deps:
+                dependents.setdefault(dep, set()).add(name)
+
+        affected = set()
+        stack = list(changed)
+        while stack:
+            name = stack.pop()
+            if name not in affected:
+                affected.add(name)
+                stack.extend(dependents.get(name, ()))
+
+        sorter = graphlib.TopologicalSorter({name: graph[name] & affected for name in affected})
+        try:
+            order = list(sorter.static_order())
+        except graphlib.CycleError:
+            order = sorted(affected)
+        return order, changed, removed
+
+    async def apply(self, bot, force=False):
+        """
+        Reloads what plan() returns and loads enabled extensions that are not
+        loaded, including ones that failed before. Extensions go through
+        discord.py, other modules through importlib.reload. Returns a list of
+        (module, seconds, error) and the removed modules.
+        """
+        # Set by bot.py from EXTENSIONS_ALLOW / EXTENSIONS_DENY
+        allow, deny = getattr(bot, 'extension_filters', ((), ()))
+        missing = {
+            name for name in discover_extensions(self.packages)
+            if name not in bot.extensions and is_enabled(name, allow, deny)
+        }
+        order, changed, removed = self.plan(force, missing)
+        modules = self.local_modules()
+        results = []
+
+        for name in order:
+            start = time.perf_counter()
+            error = None
+            try:
+                if name in bot.extensions:
+                    await bot.reload_extension(name)
+                elif name.split('.')[0] in self.packages:
+                    # Disabled extensions stay unloaded
+                    if name not in missing:
+                        self.state[name] = self.fingerprint(name, modules[name])
+                        continue
+                    await bot.load_extension(name)
+                elif name in sys.modules:
+                    importlib.reload(sys.modules[name])
+            except Exception as e:
+                error = str(e.__cause__ or e)
+            else:
+                self.state[name] = self.fingerprint(name, modules[name])
+            results.append((name, time.perf_counter() - start, error))
+
+        for name in removed:
+            self.state.pop(name, None)
+            if name in bot.extensions:
+                await bot.unload_extension(name)
+
+        return results, sorted(removed)
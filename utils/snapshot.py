@@ -0,0 +1,287 @@
+import argparse
+import datetime
+import io
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import db
+from utils.lazy_import import lazy_import
+
+sql = lazy_import('psycopg2.sql')
+
+SNAPSHOT_FORMAT_VERSION = 1
+BACKUP_DIR = os.path.join('data', 'backups')
+MANIFEST_NAME = 'manifest.json'
+
+def get_connection():
+    return db.get_connection()
+
+def default_snapshot_path():
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    return os.path.join(BACKUP_DIR, f"snapshot-{stamp}.tar.gz")
+
+class _LineCounter:
+    """Write-through wrapper that counts rows (lines) of COPY text output."""
+    def __init__(self, f):
+        self.f = f
+        self.rows = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.rows += data.count(b'\n')
+        return self.f.write(data)
+
+def list_tables(cur):
+    cur.execute("""
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema = 'public' AND table_type = 'BASE TABLE'
+        ORDER BY table_name
+    """)
+    return [row[0] for row in cur.fetchall()]
+
+def list_columns(cur, table):
+    cur.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = %s
+        ORDER BY ordinal_position
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+def create_snapshot(path=None, tables=None):
+    """
+    Dumps every table (or the given ones) with COPY inside a single
+    REPEATABLE READ transaction, so all tables come from the same point in
+    time, and writes them to a gzip-compressed tar archive with a manifest.
+    Returns (path, manifest) or (None, None) on failure.
+    """
+    path = path or default_snapshot_path()
+    conn = get_connection()
+    if not conn:
+        return None, None
+
+    spools = []
+    try:
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        cur = conn.cursor()
+        tables = tables or list_tables(cur)
+
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'schema_version': None,
+            'tables': []
+        }
+        if 'schema_version' in tables:
+            cur.execute("SELECT MAX(version) FROM schema_version")
+            manifest['schema_version'] = cur.fetchone()[0]
+
+        # Table data is spooled to disk, so the manifest can lead the archive
+        # and restore can read everything in one sequential pass.
+        for table in tables:
+            columns = list_columns(cur, table)
+            spool = tempfile.TemporaryFile()
+            spools.append(spool)
+            counter = _LineCounter(spool)
+            query = sql.SQL("COPY {} ({}) TO STDOUT").format(
+                sql.Identifier(table),
+                sql.SQL(', ').join(map(sql.Identifier, columns))
+            )
+            cur.copy_expert(query.as_string(conn), counter)
+            manifest['tables'].append({
+                'name': table,
+                'file': f"{table}.copy",
+                'columns': columns,
+                'rows': counter.rows
+            })
+        conn.commit()
+
+        with tarfile.open(path, 'w:gz') as tar:
+            manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(manifest_bytes)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(manifest_bytes))
+
+            for entry, spool in zip(manifest['tables'], spools):
+                info = tarfile.TarInfo(entry['file'])
+                info.size = spool.tell()
+                info.mtime = int(time.time())
+                spool.seek(0)
+                tar.addfile(info, spool)
+
+        return path, manifest
+    except Exception as e:
+        print(f"Error creating snapshot: {e}")
+        return None, None
+    finally:
+        for spool in spools:
+            spool.close()
+        conn.close()
+
+def _defer_foreign_keys(cur, tables):
+    """
+    Drops every foreign key on or referencing the given tables, returning
+    the statements that recreate them. Primary keys cannot be dropped and
+    tables cannot be truncated while a foreign key depends on them, so
+    these go first and come back once every table is loaded.
+    """
+    restore = []
+    cur.execute("""
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND (conrelid = ANY(%s::regclass[]) OR confrelid = ANY(%s::regclass[]))
+    """, ([sql.Identifier(t).as_string(cur) for t in tables],) * 2)
+    for owner, name, definition in cur.fetchall():
+        # regclass::text is already quoted where needed
+        cur.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(sql.SQL(owner), sql.Identifier(name)))
+        restore.append(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} ").format(sql.SQL(owner), sql.Identifier(name)) + sql.SQL(definition))
+    return restore
+
+def _defer_indexes(cur, table):
+    """
+    Drops the table's primary key, unique constraints and secondary indexes,
+    returning the statements that recreate them. Building an index once after
+    the load is much cheaper than maintaining it for every copied row.
+    """
+    restore = []
+    cur.execute("""
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+    """, (sql.Identifier(table).as_string(cur),))
+    for name, definition in cur.fetchall():
+        cur.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(sql.Identifier(table), sql.Identifier(name)))
+        restore.append(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} ").format(sql.Identifier(table), sql.Identifier(name)) + sql.SQL(definition))
+
+    cur.execute("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = 'public' AND i.tablename = %s
+    """, (table,))
+    for name, definition in cur.fetchall():
+        cur.execute(sql.SQL("DROP INDEX {}").format(sql.Identifier(name)))
+        restore.append(sql.SQL(definition))
+    return restore
+
+def _reset_sequences(cur, table, columns):
+    for column in columns:
+        cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (sql.Identifier(table).as_string(cur), column))
+        sequence = cur.fetchone()[0]
+        if sequence:
+            cur.execute(sql.SQL("SELECT setval(%s, COALESCE(MAX({col}), 1), MAX({col}) IS NOT NULL) FROM {table}").format(
+                col=sql.Identifier(column), table=sql.Identifier(table)
+            ), (sequence,))
+
+def restore_snapshot(path):
+    """
+    Replaces the contents of every table in the snapshot in one transaction.
+    Foreign keys touching those tables are dropped first, all of them are
+    truncated in a single statement, and indexes and key constraints are
+    dropped before the tables are loaded with COPY. Everything is rebuilt
+    once all tables are loaded, foreign keys last, so they are checked
+    against the complete data. Tables missing from the database are skipped.
+    Returns a list of (table, rows) that were restored, or None on failure.
+    """
+    conn = get_connection()
+    if not conn:
+        return None
+
+    try:
+        cur = conn.cursor()
+        existing = set(list_tables(cur))
+        restored = []
+        rebuild = []
+        foreign_keys = []
+
+        # 'r|gz' reads the archive as a stream, member by member
+        with tarfile.open(path, 'r|gz') as tar:
+            manifest = None
+            entries = {}
+            for member in tar:
+                if manifest is None:
+                    if member.name != MANIFEST_NAME:
+                        raise ValueError("Snapshot is missing its manifest")
+                    manifest = json.load(tar.extractfile(member))
+                    if manifest.get('format_version', 0) > SNAPSHOT_FORMAT_VERSION:
+                        raise ValueError(f"Snapshot format {manifest['format_version']} is newer than supported ({SNAPSHOT_FORMAT_VERSION})")
+                    entries = {entry['file']: entry for entry in manifest['tables']}
+                    cur.execute("SET LOCAL maintenance_work_mem = '256MB'")
+
+                    tables = [entry['name'] for entry in manifest['tables'] if entry['name'] in existing]
+                    for entry in manifest['tables']:
+                        if entry['name'] not in existing:
+                            print(f"Skipping {entry['name']}: table does not exist")
+                    if tables:
+                        foreign_keys = _defer_foreign_keys(cur, tables)
+                        cur.execute(sql.SQL("TRUNCATE {}").format(sql.SQL(', ').join(map(sql.Identifier, tables))))
+                        for table in tables:
+                            rebuild.extend(_defer_indexes(cur, table))
+                    continue
+
+                entry = entries.get(member.name)
+                if not entry or entry['name'] not in existing:
+                    continue
+                table = entry['name']
+
+                columns = sql.SQL(', ').join(map(sql.Identifier, entry['columns']))
+                start = time.monotonic()
+                cur.copy_expert(
+                    sql.SQL("COPY {} ({}) FROM STDIN").format(sql.Identifier(table), columns).as_string(conn),
+                    tar.extractfile(member)
+                )
+                _reset_sequences(cur, table, entry['columns'])
+                print(f"Restored {table}: {entry['rows']} rows in {time.monotonic() - start:.1f}s")
+                restored.append((table, entry['rows']))
+
+        start = time.monotonic()
+        for statement in rebuild + foreign_keys:
+            cur.execute(statement)
+        print(f"Rebuilt {len(rebuild)} indexes and {len(foreign_keys)} foreign keys in {time.monotonic() - start:.1f}s")
+
+        conn.commit()
+        return restored
+    except Exception as e:
+        conn.rollback()
+        print(f"Error restoring snapshot: {e}")
+        return None
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or restore consistent database snapshots.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = sub.add_parser('create', help="Snapshot all tables into a .tar.gz archive.")
+    create_parser.add_argument('path', nargs='?', help=f"Output path (default: {BACKUP_DIR}/snapshot-<time>.tar.gz).")
+    create_parser.add_argument('--table', action='append', dest='tables', help="Only snapshot this table (repeatable).")
+
+    restore_parser = sub.add_parser('restore', help="Replace table contents with a snapshot.")
+    restore_parser.add_argument('path')
+    restore_parser.add_argument('--yes', action='store_true', help="Do not ask for confirmation.")
+
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        path, manifest = create_snapshot(args.path, args.tables)
+        if not path:
+            sys.exit(1)
+        total = sum(entry['rows'] for entry in manifest['tables'])
+        print(f"Wrote {path}: {len(manifest['tables'])} tables, {total} rows.")
+    else:
+        if not args.yes:
+            answer = input(f"This will REPLACE the contents of every table in {args.path}. Type 'yes' to continue: ")
+            if answer.strip().lower() != 'yes':
+                print("Cancelled.")
+                return
+        restored = restore_snapshot(args.path)
+        if restored is None:
+            sys.exit(1)
+        print(f"Restored {len(restored)} tables.")
+
+if __name__ == "__main__":
+    main()
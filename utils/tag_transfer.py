@@ -0,0 +1,200 @@
+import argparse
+import gzip
+import io
+import sys
+import db
+
+TAG_COLUMNS = "name, content, author_id, created_at"
+
+# row_to_json escapes every control character, so \x01/\x02 can never appear
+# in its output. Using them as CSV quote/delimiter makes COPY pass each JSON
+# document through byte for byte instead of applying text-format escaping.
+JSONL_COPY_OPTIONS = "(FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+
+FORMATS = ('jsonl', 'csv')
+
+def get_connection():
+    return db.get_connection()
+
+def detect_format(filename):
+    name = filename.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith('.jsonl') or name.endswith('.json'):
+        return 'jsonl'
+    return None
+
+def open_maybe_gzip(fileobj):
+    """Wraps a binary file object in a gzip reader if it starts with the gzip magic bytes."""
+    if not hasattr(fileobj, 'peek'):
+        fileobj = io.BufferedReader(fileobj)
+    if fileobj.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    return fileobj
+
+def export_tags(fileobj, fmt='jsonl'):
+    """
+    Streams every tag into a binary file object using COPY TO STDOUT.
+    Returns the number of exported tags, or None on database error.
+    """
+    conn = get_connection()
+    if not conn:
+        return None
+
+    try:
+        # Count and COPY see the same snapshot
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM tags")
+        count = cur.fetchone()[0]
+        if fmt == 'csv':
+            cur.copy_expert(f"COPY (SELECT {TAG_COLUMNS} FROM tags ORDER BY name) TO STDOUT WITH (FORMAT csv, HEADER)", fileobj)
+        else:
+            cur.copy_expert(f"COPY (SELECT row_to_json(t) FROM (SELECT {TAG_COLUMNS} FROM tags ORDER BY name) t) TO STDOUT WITH {JSONL_COPY_OPTIONS}", fileobj)
+        conn.commit()
+        return count
+    except Exception as e:
+        print(f"Error exporting tags: {e}")
+        return None
+    finally:
+        conn.close()
+
+def import_tags(fileobj, fmt='jsonl', overwrite=False):
+    """
+    Bulk-loads tags from a binary file object (plain or gzip) with COPY FROM STDIN
+    into a staging table, then merges the staged rows into tags in one transaction.
+
+    Returns a dict with 'staged', 'inserted', 'updated' and 'conflicts' (names that
+    already exist with different content), or None on error.
+    """
+    conn = get_connection()
+    if not conn:
+        return None
+
+    try:
+        cur = conn.cursor()
+        # Column types only: LIKE would copy NOT NULL and reject bad rows during COPY
+        cur.execute(f"CREATE TEMP TABLE tag_import ON COMMIT DROP AS SELECT {TAG_COLUMNS} FROM tags WITH NO DATA")
+
+        reader = open_maybe_gzip(fileobj)
+        if fmt == 'csv':
+            cur.copy_expert(f"COPY tag_import ({TAG_COLUMNS}) FROM STDIN WITH (FORMAT csv, HEADER)", reader)
+            # Rows without a name cannot be merged
+            cur.execute("DELETE FROM tag_import WHERE name IS NULL OR name = ''")
+        else:
+            cur.execute("CREATE TEMP TABLE tag_import_raw (doc JSONB) ON COMMIT DROP")
+            cur.copy_expert(f"COPY tag_import_raw (doc) FROM STDIN WITH {JSONL_COPY_OPTIONS}", reader)
+            cur.execute(f"""
+                INSERT INTO tag_import ({TAG_COLUMNS})
+                SELECT doc->>'name', doc->>'content', (doc->>'author_id')::BIGINT, doc->>'created_at'
+                FROM tag_import_raw
+                WHERE doc->>'name' <> ''
+            """)
+
+        # Keep the last occurrence of duplicate names
+        cur.execute("""
+            DELETE FROM tag_import a USING tag_import b
+            WHERE a.name = b.name AND a.ctid < b.ctid
+        """)
+        cur.execute("SELECT COUNT(*) FROM tag_import")
+        staged = cur.fetchone()[0]
+
+        cur.execute("""
+            SELECT s.name FROM tag_import s
+            JOIN tags t ON t.name = s.name
+            WHERE t.content IS DISTINCT FROM s.content
+            ORDER BY s.name
+        """)
+        conflicts = [row[0] for row in cur.fetchall()]
+
+        if overwrite:
+            cur.execute(f"""
+                INSERT INTO tags ({TAG_COLUMNS})
+                SELECT {TAG_COLUMNS} FROM tag_import
+                ON CONFLICT (name) DO UPDATE SET
+                    content = EXCLUDED.content,
+                    author_id = EXCLUDED.author_id,
+                    created_at = EXCLUDED.created_at
+                WHERE tags.content IS DISTINCT FROM EXCLUDED.content
+                RETURNING (xmax = 0)
+            """)
+            results = [row[0] for row in cur.fetchall()]
+            inserted = sum(1 for is_insert in results if is_insert)
+            updated = len(results) - inserted
+        else:
+            cur.execute(f"""
+                INSERT INTO tags ({TAG_COLUMNS})
+                SELECT {TAG_COLUMNS} FROM tag_import
+                ON CONFLICT (name) DO NOTHING
+            """)
+            inserted = cur.rowcount
+            updated = 0
+
+        conn.commit()
+        return {
+            'staged': staged,
+            'inserted': inserted,
+            'updated': updated,
+            'conflicts': conflicts
+        }
+    except Exception as e:
+        conn.rollback()
+        print(f"Error importing tags: {e}")
+        return None
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk export/import tags using Postgres COPY.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = sub.add_parser('export', help="Export all tags to a file ('-' for stdout).")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--format', choices=FORMATS)
+    export_parser.add_argument('--gzip', action='store_true', help="Compress the output (implied by a .gz path).")
+
+    import_parser = sub.add_parser('import', help="Import tags from a file ('-' for stdin).")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=FORMATS)
+    import_parser.add_argument('--overwrite', action='store_true', help="Replace existing tags whose content differs.")
+
+    args = parser.parse_args()
+    fmt = args.format or detect_format(args.path) or 'jsonl'
+
+    if args.command == 'export':
+        if args.path == '-':
+            out = sys.stdout.buffer
+        else:
+            out = open(args.path, 'wb')
+        try:
+            if args.gzip or args.path.endswith('.gz'):
+                with gzip.GzipFile(fileobj=out, mode='wb') as gz:
+                    count = export_tags(gz, fmt)
+            else:
+                count = export_tags(out, fmt)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+
+        if count is None:
+            sys.exit(1)
+        print(f"Exported {count} tags as {fmt}.", file=sys.stderr)
+    else:
+        src = sys.stdin.buffer if args.path == '-' else open(args.path, 'rb')
+        try:
+            result = import_tags(src, fmt, overwrite=args.overwrite)
+        finally:
+            if src is not sys.stdin.buffer:
+                src.close()
+
+        if result is None:
+            sys.exit(1)
+        print(f"Staged {result['staged']} tags: {result['inserted']} inserted, {result['updated']} updated, "
+              f"{len(result['conflicts'])} conflicts.", file=sys.stderr)
+        for name in result['conflicts']:
+            print(f"conflict: {name}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import db
+import time
+from utils.lazy_import import lazy_import
+
+extras = lazy_import('psycopg2.extras')
+
+TOP_TAGS_LIMIT = 10
+
+def get_connection():
+    return db.get_connection()
+
+def write_usage_counts(counts):
+    """
+    Adds pending usage counts to tag_usage in one batched statement.
+    `counts` maps (guild_id, name) -> number of uses since the last flush.
+    Returns {(guild_id, name): stored uses} for the written tags, or None on errors.
+    """
+    if not counts:
+        return {}
+
+    conn = get_connection()
+    if not conn:
+        return None
+
+    try:
+        cur = conn.cursor()
+        now = time.time()
+        rows = [(guild_id, name, uses, now) for (guild_id, name), uses in counts.items()]
+        # page_size covers every row so the whole batch is a single round trip
+        stored = extras.execute_values(cur, """
+            INSERT INTO tag_usage (guild_id, name, uses, last_used)
+            VALUES %s
+            ON CONFLICT (guild_id, name) DO UPDATE SET
+                uses = tag_usage.uses + EXCLUDED.uses,
+                last_used = EXCLUDED.last_used
+            RETURNING guild_id, name, uses
+        """, rows, page_size=len(rows), fetch=True)
+        conn.commit()
+        return {(guild_id, name): uses for guild_id, name, uses in stored}
+    except Exception as e:
+        print(f"Error writing tag usage: {e}")
+        return None
+    finally:
+        conn.close()
+
+def get_usage_stats(guild_ids=None, limit=TOP_TAGS_LIMIT):
+    """
+    Returns {guild_id: {'top': [(name, uses), ...], 'total': int, 'distinct': int}}
+    for the given guilds, or for every guild when guild_ids is None.
+    """
+    conn = get_connection()
+    if not conn:
+        return {}
+
+    try:
+        cur = conn.cursor()
+        query = """
+            SELECT guild_id, name, uses, total, distinct_tags FROM (
+                SELECT guild_id, name, uses,
+                       SUM(uses) OVER (PARTITION BY guild_id) AS total,
+                       COUNT(*) OVER (PARTITION BY guild_id) AS distinct_tags,
+                       ROW_NUMBER() OVER (PARTITION BY guild_id ORDER BY uses DESC, name) AS rn
+                FROM tag_usage
+                {where}
+            ) AS ranked
+            WHERE rn <= %s
+            ORDER BY guild_id, rn
+        """
+        if guild_ids is None:
+            cur.execute(query.format(where=""), (limit,))
+        else:
+            cur.execute(query.format(where="WHERE guild_id = ANY(%s)"), (list(guild_ids), limit))
+
+        stats = {}
+        for guild_id, name, uses, total, distinct_tags in cur.fetchall():
+            entry = stats.setdefault(guild_id, {'top': [], 'total': int(total), 'distinct': distinct_tags})
+            entry['top'].append((name, uses))
+        return stats
+    except Exception as e:
+        print(f"Error getting tag usage stats: {e}")
+        return {}
+    finally:
+        conn.close()
+
+def get_stored_uses(guild_id, names):
+    """Returns {name: uses} for the given tags that have flushed usage, or None on errors."""
+    conn = get_connection()
+    if not conn:
+        return None
+
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT name, uses FROM tag_usage WHERE guild_id = %s AND name = ANY(%s)", (guild_id, list(names)))
+        return dict(cur.fetchall())
+    except Exception as e:
+        print(f"Error getting tag usage: {e}")
+        return None
+    finally:
+        conn.close()
+
+def delete_usage(name):
+    conn = get_connection()
+    if not conn:
+        return
+
+    try:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM tag_usage WHERE name = %s", (name,))
+        conn.commit()
+    except Exception as e:
+        print(f"Error deleting tag usage: {e}")
+    finally:
+        conn.close()
@@ -0,0 +1,68 @@
+import datetime
+import gzip
+import json
+import os
+
+TRANSCRIPT_DIR = os.path.join('data', 'transcripts')
+
+def transcript_path(channel):
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    directory = os.path.join(TRANSCRIPT_DIR, str(channel.guild.id))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{channel.id}-{stamp}.jsonl.gz")
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def message_record(message):
+    return {
+        'type': 'message',
+        'id': message.id,
+        'author_id': message.author.id,
+        'author': str(message.author),
+        'bot': message.author.bot,
+        'created_at': _isoformat(message.created_at),
+        'edited_at': _isoformat(message.edited_at),
+        'content': message.content,
+        'attachments': [{'filename': att.filename, 'url': att.url, 'size': att.size} for att in message.attachments],
+        'embeds': [embed.to_dict() for embed in message.embeds]
+    }
+
+async def write_transcript(channel, path=None):
+    """
+    Streams a channel's full history, oldest first, into a gzip-compressed
+    JSONL file. The first line describes the channel, every following line
+    is one message. Messages are written as each history page arrives, so
+    memory use does not grow with the size of the channel.
+
+    Returns a dict with path, size, message_count, first_message_at and
+    last_message_at. A partially written file is removed on failure.
+    """
+    path = path or transcript_path(channel)
+    stats = {'path': path, 'message_count': 0, 'first_message_at': None, 'last_message_at': None}
+
+    try:
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            header = {
+                'type': 'channel',
+                'guild_id': channel.guild.id,
+                'channel_id': channel.id,
+                'name': channel.name,
+                'topic': getattr(channel, 'topic', None),
+                'created_at': _isoformat(channel.created_at)
+            }
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+            async for message in channel.history(limit=None, oldest_first=True):
+                f.write(json.dumps(message_record(message), ensure_ascii=False) + "\n")
+                if stats['first_message_at'] is None:
+                    stats['first_message_at'] = message.created_at
+                stats['last_message_at'] = message.created_at
+                stats['message_count'] += 1
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    stats['size'] = os.path.getsize(path)
+    return stats